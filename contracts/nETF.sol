@@ -8,6 +8,20 @@ import {ContextUpgradeable} from "../node_modules/@openzeppelin/contracts-upgrad
 import {PausableUpgradeable} from "../node_modules/@openzeppelin/contracts-upgradeable/security/PausableUpgradeable.sol";
 import {Initializable} from "../node_modules/@openzeppelin/contracts-upgradeable/proxy/utils/Initializable.sol";
 import {OwnableUpgradeable} from "../node_modules/@openzeppelin/contracts-upgradeable/access/OwnableUpgradeable.sol";
+import {SafeCastUpgradeable} from "../node_modules/@openzeppelin/contracts-upgradeable/utils/math/SafeCastUpgradeable.sol";
+import {MerkleProofUpgradeable} from "../node_modules/@openzeppelin/contracts-upgradeable/utils/cryptography/MerkleProofUpgradeable.sol";
+
+/// @notice Calibration only opens for the first cycleLength seconds of each cycle (reason 401).
+error CalibrationClosed();
+
+/// @notice The user already calibrated the asset (address(0) for MYNT) in this calibration cycle (reason 402).
+error AlreadyAllocated(address asset);
+
+/// @notice The user deposited or withdrew within the last cycle period (reason 403).
+error DepositTooRecent();
+
+/// @notice The user has no bonds (reason 404).
+error NoDeposit();
 
 contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, PausableUpgradeable {
 
@@ -17,24 +31,55 @@ contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, Pa
     event CalibrateMynt(address indexed user, uint timestamp, uint amount);
     event SubmitToken(address indexed provider, uint timestamp, address indexed tokenAddress, uint amount);
     event SubmitMynt(address indexed provider, uint timestamp, uint amount);
-
-    nETFStructs.nFundManager private fundManager;
+    event MerkleRootPublished(uint indexed distributionId, uint timestamp, address indexed tokenAddress, uint cycle, uint amount, bytes32 root);
+    event ClaimMerkle(address indexed user, uint timestamp, uint indexed distributionId, address indexed tokenAddress, uint amount);
+    //Accumulator claims; tokenAddress is address(0) for MYNT
+    event Claim(address indexed user, uint timestamp, address indexed tokenAddress, uint amount);
+
+    //v1 (unpacked) layout; only read by the migration functions of upgraded proxies
+    nETFStructs.nFundManager private legacyFundManager;
+    nETFStructs.nPackedFundManager private fundManager;
+    nETFStructs.nAccumulator private accumulator;
+    nETFStructs.nMerkleDistributor private merkle;
+    mapping(address => nETFStructs.nTokenMetadata) private tokenMetadata;
+    mapping(address => nETFStructs.nCheckpoint[]) private bondCheckpoints;
+    nETFStructs.nCheckpoint[] private totalBondCheckpoints;
+    address[] private accumulatorAssets;
+    mapping(address => bool) private isAccumulatorAsset;
+    //60x18 amounts submitted while nobody held bonds, spread by the asset's next accrual
+    mapping(address => uint) private unaccrued;
+
+    //Deposits & withdrawals settle every accumulator asset, so the owner-managed list is bounded
+    uint public constant MAX_ACCUMULATOR_ASSETS = 32;
 
 
     function initialize(uint cyclePeriod, uint cycleLength) initializer public payable {
-        
+        _initialize(_msgSender(), cyclePeriod, cycleLength);
+    }
+
+    //For networkETFFactory clones: the initial bond & the ownership go to owner_ instead of the caller
+    function initializeFor(address owner_, uint cyclePeriod, uint cycleLength) initializer public payable {
+        _initialize(owner_, cyclePeriod, cycleLength);
+    }
+
+    //For networkETFFactory: locks an implementation so that nobody can initialize & own it; leaves it without owner
+    function lockImplementation() initializer public {
+    }
+
+    function _initialize(address owner_, uint cyclePeriod, uint cycleLength) internal {
+
         require(msg.value > 0, "400: Initialization requires a non-zero deposit");
 
-        fundManager.cyclePeriod = cyclePeriod;
-        fundManager.cycleLength = cycleLength;
+        fundManager.cyclePeriod = SafeCastUpgradeable.toUint64(cyclePeriod);
+        fundManager.cycleLength = SafeCastUpgradeable.toUint64(cycleLength);
 
          //Set bonds for fund & user
-        fundManager.users[_msgSender()].deposit =  fMathPool.from_base_to_60x18(msg.value);
-        fundManager.users[_msgSender()].lastUpdated = block.timestamp;
+        _setUserBonds(owner_, fundManager.users[owner_], fMathPool.from_base_to_60x18(msg.value));
+        _setTotalBonds(fMathPool.from_base_to_60x18(msg.value));
 
-        fundManager.myntDeposited =  fMathPool.from_base_to_60x18(msg.value);
-
-        __Ownable_init();
+        //Same as __Ownable_init, with a single OwnershipTransferred(0, owner_) for the indexer
+        __Context_init();
+        _transferOwnership(owner_);
     }
 
     function pause() public onlyOwner {
@@ -50,12 +95,30 @@ contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, Pa
         require(msg.value > 0, "400: Invalid amount");
 
         //Set bonds for fund & user
-        fundManager.users[_msgSender()].deposit = fMathUD60x18.add(fundManager.users[_msgSender()].deposit, fMathPool.from_base_to_60x18(msg.value));
-        fundManager.users[_msgSender()].lastUpdated = block.timestamp;
-        fundManager.myntDeposited = fMathUD60x18.add(fundManager.myntDeposited, fMathPool.from_base_to_60x18(msg.value));
+        _setTotalBonds(fMathUD60x18.add(fMath.UD60x18.wrap(fundManager.myntDeposited), _creditBonds(_msgSender(), msg.value)));
 
-        //Log event
-        emit Deposit(_msgSender(), block.timestamp, msg.value);
+        return true;
+    }
+
+    /*
+    @notice Credits bonds to many beneficiaries at once, e.g. a custodian onboarding its clients; msg.value must
+            be the sum of amounts. Each beneficiary gets its own Deposit event & a fresh deposit timestamp (403).
+    */
+    function depositFor(address[] calldata beneficiaries, uint[] calldata amounts) whenNotPaused() public payable returns(bool) {
+
+        require(beneficiaries.length > 0, "400: Invalid amount");
+        require(beneficiaries.length == amounts.length, "400: Length mismatch");
+
+        //Set bonds for every user, then for the fund once
+        uint total;
+        fMath.UD60x18 bonds;
+        for (uint i = 0; i < beneficiaries.length; i++) {
+            require(amounts[i] > 0, "400: Invalid amount");
+            total += amounts[i];
+            bonds = fMathUD60x18.add(bonds, _creditBonds(beneficiaries[i], amounts[i]));
+        }
+        require(total == msg.value, "400: Invalid amount");
+        _setTotalBonds(fMathUD60x18.add(fMath.UD60x18.wrap(fundManager.myntDeposited), bonds));
 
         return true;
     }
@@ -63,12 +126,9 @@ contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, Pa
     function withdraw(uint amount_) whenNotPaused() public payable returns(bool){
 
         require(amount_ > 0, "400: Invalid amount");
-        require(amount_ <= fMathPool.to_uint(fundManager.users[_msgSender()].deposit), "401: Insufficient amount deposited");
 
         //Set bonds for fund & user
-        fundManager.users[_msgSender()].deposit = fMathUD60x18.sub(fundManager.users[_msgSender()].deposit, fMathPool.from_base_to_60x18(amount_));
-        fundManager.users[_msgSender()].lastUpdated = block.timestamp;
-        fundManager.myntDeposited = fMathUD60x18.sub(fundManager.myntDeposited, fMathPool.from_base_to_60x18(amount_));
+        _setTotalBonds(fMathUD60x18.sub(fMath.UD60x18.wrap(fundManager.myntDeposited), _debitBonds(_msgSender(), amount_)));
 
         // Send funds to user
         payable(_msgSender()).transfer(amount_);
@@ -79,59 +139,73 @@ contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, Pa
         return true;
     }
 
+    /*
+    @notice Withdraws from the caller's bonds to many recipients at once, e.g. a custodian paying out its clients.
+            Only the caller's own record is debited, so one Withdraw event of the caller logs the whole debit.
+    */
+    function withdrawTo(address payable[] calldata recipients, uint[] calldata amounts) whenNotPaused() public returns(bool) {
 
-    function calibrateToken(address user, address token) whenNotPaused() public {
+        require(recipients.length == amounts.length, "400: Length mismatch");
 
-        // Check & update token data if necessary
-        // Update token data for cycle
-        uint tokenLastUpdated = fundManager.tokenLastUpdated[token];
-        //If cycle bonds have not been allocated for this token yet, set to 0
-        if (tokenLastUpdated < (block.timestamp - fundManager.cycleLength)) {
-            fundManager.tokenBondsUsed[token] = fMathUD60x18.fromUint(0);
+        uint total;
+        for (uint i = 0; i < amounts.length; i++) {
+            require(amounts[i] > 0, "400: Invalid amount");
+            total += amounts[i];
         }
-        fundManager.tokenLastUpdated[token] = block.timestamp;
-
-        //Ensure withdrawable is true
-        (fMath.UD60x18 memory userWithdrawableAmount, bool isWithdrawable, string memory reason) = _getUserExpectedTokenCalibration( user,  token);
-        require(isWithdrawable, reason);
+        require(total > 0, "400: Invalid amount");
 
-        IERC20(token).transfer(user, fMathPool.to_uint(userWithdrawableAmount) );
+        //Set bonds for fund & user once
+        _setTotalBonds(fMathUD60x18.sub(fMath.UD60x18.wrap(fundManager.myntDeposited), _debitBonds(_msgSender(), total)));
 
-        // Update user's time token allocated & token data
-        fundManager.users[user].timeTokenAllocated[token] = block.timestamp;    
-        fundManager.tokenBondsUsed[token] = fMathUD60x18.add(fundManager.tokenBondsUsed[token], fundManager.users[user].deposit);
-        fundManager.tokenBalances[token] = fMathUD60x18.sub(fundManager.tokenBalances[token], userWithdrawableAmount);
+        // Send funds to recipients
+        for (uint i = 0; i < recipients.length; i++) {
+            recipients[i].transfer(amounts[i]);
+        }
 
         //Log event
-        emit CalibrateToken(user, block.timestamp, token, fMathPool.to_uint(userWithdrawableAmount));
+        emit Withdraw(_msgSender(), block.timestamp, total);
+
+        return true;
+    }
+
+    function calibrateToken(address user, address token) whenNotPaused() whenCycleDistribution() public {
 
+        //Ensure the user can calibrate before doing any math
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        uint32 epoch = currentEpoch();
+        _requireCanCalibrate(userData, userData.tokenAllocatedEpoch[token], epoch, token);
+
+        _calibrateToken(user, token, fMath.UD60x18.wrap(userData.deposit), epoch);
     } 
 
-    function calibrateMynt(address payable user) whenNotPaused() public payable {
+    function calibrateMynt(address payable user) whenNotPaused() whenCycleDistribution() public payable {
 
-        // Check & update MYNT data if necessary
-        // Update MYNT data for cycle
-        uint myntLastUpdated = fundManager.myntLastUpdated;
-        //If cycle bonds have not been allocated for this token yet, set to 0
-        if (myntLastUpdated < (block.timestamp - fundManager.cycleLength)) {
-            fundManager.myntBondsUsed = fMathUD60x18.fromUint(0);
-        }
-        fundManager.myntLastUpdated = block.timestamp;
+        //Ensure the user can calibrate before doing any math
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        uint32 epoch = currentEpoch();
+        _requireCanCalibrate(userData, userData.myntAllocatedEpoch, epoch, address(0));
 
-        //Ensure withdrawable is true
-        (fMath.UD60x18 memory userWithdrawableAmount, bool isWithdrawable, string memory reason) =_getUserExpectedMyntCalibration( user);
-        require(isWithdrawable, reason);
+        _calibrateMynt(user, fMath.UD60x18.wrap(userData.deposit), epoch);
+    }
 
-        //Return user the tokens based on existing bonds, and update their timeTokenAllocated
-        user.transfer(fMathPool.to_uint(userWithdrawableAmount));
+    function calibrateMany(address payable user, address[] calldata tokens, bool includeMynt) whenNotPaused() whenCycleDistribution() public {
 
-        //Update user's time MYNT allocated & MYNT data
-        fundManager.users[user].timeMyntAllocated = block.timestamp;
-        fundManager.myntBondsUsed = fMathUD60x18.add(fundManager.myntBondsUsed, fundManager.users[user].deposit);
-        fundManager.myntBalance = fMathUD60x18.sub(fundManager.myntBalance, userWithdrawableAmount);
+        // Read the cycle & user data once for every asset
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        uint32 epoch = currentEpoch();
+        fMath.UD60x18 userBonds = fMath.UD60x18.wrap(userData.deposit);
+        uint16 userReason = _getUserCalibrationReason(userData);
 
-        //Log event
-        emit CalibrateMynt(user, block.timestamp, fMathPool.to_uint(userWithdrawableAmount));
+        // Only the asset's allocation epoch is left to check per asset
+        for (uint i = 0; i < tokens.length; i++) {
+            _requireCanCalibrateAsset(userReason, userData.tokenAllocatedEpoch[tokens[i]], epoch, tokens[i]);
+            _calibrateToken(user, tokens[i], userBonds, epoch);
+        }
+
+        if (includeMynt) {
+            _requireCanCalibrateAsset(userReason, userData.myntAllocatedEpoch, epoch, address(0));
+            _calibrateMynt(user, userBonds, epoch);
+        }
     }
 
     function submitToken(address token, uint amount) whenNotPaused() public {
@@ -139,32 +213,44 @@ contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, Pa
         //Require amount > 0
         require(amount > 0, "401: Amount must be greater than 0");
 
-        // Ensure token has 18 
-        require(IERC20(token).decimals() == 18, "402: Token must have 18 decimals");
+        //Check if tokenExists, if not add to total & give uint
+        if (!fundManager.tokenExists[token]) _registerToken(token);
 
         //Transfer the token from the protocol
         IERC20(token).transferFrom(_msgSender(), address(this), amount);
 
-        //Check if tokenExists, if not add to total & give uint
-        if (!fundManager.tokenExists[token]) {
-            fundManager.tokenExists[token] = true;
-            fundManager.tokenNumberToAddress[fundManager.totalTokensAvailable]= token;
-            fundManager.totalTokensAvailable += 1;  
-        } 
-
         //Update token data
-        fundManager.tokenBalances[token] = fMathUD60x18.add(fundManager.tokenBalances[token], fMathPool.from_base_to_60x18(amount));
+        fMath.UD60x18 scaledAmount = fMathPool.from_scaled_to_60x18(amount, _getTokenScale(token));
+        fundManager.tokens[token].balance = _toPackedAmount(fMathUD60x18.add(fMath.UD60x18.wrap(fundManager.tokens[token].balance), scaledAmount));
+
+        if (accumulator.mode == nETFStructs.DISTRIBUTION.ACCUMULATOR) {
+            require(isAccumulatorAsset[token], "416: Token is not distributed by the accumulator");
+            _accrue(token, fMathPool.to_uint(scaledAmount));
+        }
 
         //Log event
         emit SubmitToken(_msgSender(), block.timestamp, token, amount);
     }
 
+    // Decimals are only read here
+    function _registerToken(address token) internal {
+        uint8 decimals = IERC20(token).decimals();
+        require(decimals <= 18, "402: Token must have at most 18 decimals");
+        tokenMetadata[token] = nETFStructs.nTokenMetadata(decimals, uint64(fMathPool.to_uint(fMathPool.from_decimal_to_60x18(1, decimals))));
+
+        fundManager.tokenExists[token] = true;
+        fundManager.tokenNumberToAddress[fundManager.totalTokensAvailable]= token;
+        fundManager.totalTokensAvailable += 1;
+    }
+
     function submitMynt() whenNotPaused() public payable {
         //Require msg value > 0
         require(msg.value > 0, "401: Amount must be greater than 0");
 
         //Update MYNT data
-        fundManager.myntBalance = fMathUD60x18.add(fundManager.myntBalance, fMathPool.from_base_to_60x18(msg.value));
+        fundManager.mynt.balance = _toPackedAmount(fMathUD60x18.add(fMath.UD60x18.wrap(fundManager.mynt.balance), fMathPool.from_base_to_60x18(msg.value)));
+
+        if (accumulator.mode == nETFStructs.DISTRIBUTION.ACCUMULATOR) _accrue(address(0), msg.value);
 
         //Log event
         emit SubmitMynt(_msgSender(), block.timestamp, msg.value);
@@ -172,6 +258,353 @@ contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, Pa
 
 
     ////////////////////////////////////////////////////////////////////////////////
+    // Accumulator distribution. Instead of racing for a share in each calibration window, every submission
+    // raises the asset's reward per bond & users claim what their bonds accrued at any time. Claims are O(1);
+    // deposits & withdrawals settle every accumulator asset first, so they are O(accumulator assets). Tokens are
+    // only distributed once the owner added them to that list, which is capped at MAX_ACCUMULATOR_ASSETS so that
+    // registering junk tokens cannot push deposits & withdrawals past the block gas limit. MYNT always is.
+
+    modifier whenCycleDistribution() {
+        require(accumulator.mode == nETFStructs.DISTRIBUTION.CYCLE, "409: Calibration cycles are disabled in accumulator mode");
+        _;
+    }
+
+    /*
+    @notice Switches an ETF from calibration cycles to the accumulator. Balances not yet calibrated are spread
+            over the current bonds, so holders can claim their pro-rata share straight away.
+            Same conditions as migrateStorage: paused & outside a calibration cycle.
+    */
+    function enableAccumulator() public onlyOwner whenPaused {
+
+        require(accumulator.mode == nETFStructs.DISTRIBUTION.CYCLE, "410: Accumulator distribution is already enabled");
+        require((block.timestamp % fundManager.cyclePeriod) >= fundManager.cycleLength, "406: Cannot migrate during a calibration cycle");
+
+        accumulator.mode = nETFStructs.DISTRIBUTION.ACCUMULATOR;
+
+        uint totalAssets = accumulatorAssets.length;
+        for (uint i = 0; i < totalAssets; i++) {
+            address token = accumulatorAssets[i];
+            if (fundManager.tokens[token].balance > 0) _accrue(token, fundManager.tokens[token].balance);
+        }
+        if (fundManager.mynt.balance > 0) _accrue(address(0), fundManager.mynt.balance);
+    }
+
+    /*
+    @notice Lets the accumulator distribute a token, registering it if needed. Assets cannot be removed, as users'
+            accruals are only settled for listed assets. Added in accumulator mode, the token's balance is spread at once.
+    */
+    function addAccumulatorAsset(address token) public onlyOwner {
+
+        if (isAccumulatorAsset[token]) return;
+        require(accumulatorAssets.length < MAX_ACCUMULATOR_ASSETS, "415: Too many accumulator assets");
+        if (!fundManager.tokenExists[token]) _registerToken(token);
+
+        accumulatorAssets.push(token);
+        isAccumulatorAsset[token] = true;
+
+        if (accumulator.mode == nETFStructs.DISTRIBUTION.ACCUMULATOR && fundManager.tokens[token].balance > 0) {
+            _accrue(token, fundManager.tokens[token].balance);
+        }
+    }
+
+    function getAccumulatorAssets() public view returns (address[] memory) {
+        return accumulatorAssets;
+    }
+
+    function claimToken(address user, address token) whenNotPaused() public {
+
+        uint amount = _claim(user, token, _getTokenScale(token));
+        IERC20(token).transfer(user, amount);
+
+        //Log event
+        emit Claim(user, block.timestamp, token, amount);
+    }
+
+    function claimMynt(address payable user) whenNotPaused() public {
+
+        uint amount = _claim(user, address(0), 1);
+        user.transfer(amount);
+
+        //Log event
+        emit Claim(user, block.timestamp, address(0), amount);
+    }
+
+    function getDistributionMode() public view returns (nETFStructs.DISTRIBUTION) {
+        return accumulator.mode;
+    }
+
+    // Amount of a token (or MYNT for address(0)) the user can claim, in the asset's units
+    function getAccrued(address user, address asset) public view returns (uint) {
+        uint accrued = accumulator.accrued[user][asset] + _getAccruedSinceSettle(user, asset, fundManager.users[user].deposit);
+        return asset == address(0) ? accrued : accrued / _getTokenScale(asset);
+    }
+
+    // Spreads amount (as a 60x18) over every bond; without bonds it waits for the asset's next accrual
+    function _accrue(address asset, uint amount) internal {
+        if (fundManager.myntDeposited == 0) {
+            unaccrued[asset] += amount;
+            return;
+        }
+        if (unaccrued[asset] > 0) {
+            amount += unaccrued[asset];
+            delete unaccrued[asset];
+        }
+        fMath.UD60x18 increase = fMathUD60x18.div(fMathPool.from_base_to_60x18(amount), fMath.UD60x18.wrap(fundManager.myntDeposited));
+        accumulator.rewardPerBond[asset] += fMathPool.to_uint(increase);
+    }
+
+    // Rounds down (unlike fMathUD60x18.mul) so that claims never add up to more than was submitted
+    function _getAccruedSinceSettle(address user, address asset, uint bonds) internal view returns (uint) {
+        uint indexIncrease = accumulator.rewardPerBond[asset] - accumulator.rewardPerBondPaid[user][asset];
+        return fMath.mulDiv(bonds, indexIncrease, fMathUD60x18.SCALE);
+    }
+
+    // Adds amount (wei) to the user's bonds & returns it in 60x18; the caller updates the fund total
+    function _creditBonds(address user, uint amount) internal returns (fMath.UD60x18 bonds) {
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        bonds = fMathPool.from_base_to_60x18(amount);
+
+        _settleAllIfAccumulating(user, userData.deposit);
+        _setUserBonds(user, userData, fMathUD60x18.add(fMath.UD60x18.wrap(userData.deposit), bonds));
+
+        //Log event
+        emit Deposit(user, block.timestamp, amount);
+    }
+
+    // Removes amount (wei) from the user's bonds & returns it in 60x18; the caller updates the fund total & pays out
+    function _debitBonds(address user, uint amount) internal returns (fMath.UD60x18 bonds) {
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        require(amount <= userData.deposit, "401: Insufficient amount deposited");
+        bonds = fMathPool.from_base_to_60x18(amount);
+
+        _settleAllIfAccumulating(user, userData.deposit);
+        _setUserBonds(user, userData, fMathUD60x18.sub(fMath.UD60x18.wrap(userData.deposit), bonds));
+    }
+
+    // Sets the user's bonds & deposit timestamp & checkpoints them
+    function _setUserBonds(address user, nETFStructs.nETFUser storage userData, fMath.UD60x18 bonds) internal {
+        nETFStructs.nCheckpoint[] storage checkpoints = bondCheckpoints[user];
+
+        //Users from before checkpoints held their bond unchanged since their last update
+        if (checkpoints.length == 0 && userData.deposit > 0) {
+            checkpoints.push(nETFStructs.nCheckpoint(userData.lastUpdated, userData.deposit));
+        }
+
+        userData.deposit = _toPackedAmount(bonds);
+        userData.lastUpdated = uint64(block.timestamp);
+        _writeCheckpoint(checkpoints, userData.deposit);
+    }
+
+    function _setTotalBonds(fMath.UD60x18 bonds) internal {
+        //Totals from before checkpoints are the base of the history
+        if (totalBondCheckpoints.length == 0 && fundManager.myntDeposited > 0) {
+            totalBondCheckpoints.push(nETFStructs.nCheckpoint(0, fundManager.myntDeposited));
+        }
+
+        fundManager.myntDeposited = _toPackedTotal(bonds);
+        _writeCheckpoint(totalBondCheckpoints, fundManager.myntDeposited);
+    }
+
+    // Several changes in one block (or second) share a checkpoint holding the last value
+    function _writeCheckpoint(nETFStructs.nCheckpoint[] storage checkpoints, uint bonds) internal {
+        uint length = checkpoints.length;
+        if (length > 0 && checkpoints[length - 1].timestamp == block.timestamp) {
+            checkpoints[length - 1].bonds = uint128(bonds);
+        } else {
+            checkpoints.push(nETFStructs.nCheckpoint(uint64(block.timestamp), uint128(bonds)));
+        }
+    }
+
+    // Bonds of the last checkpoint at or before timestamp; 0 before the first one
+    function _checkpointLookup(nETFStructs.nCheckpoint[] storage checkpoints, uint timestamp) internal view returns (uint) {
+        require(timestamp <= block.timestamp, "414: Timestamp is in the future");
+
+        //Binary search for the first checkpoint after timestamp
+        uint low = 0;
+        uint high = checkpoints.length;
+        while (low < high) {
+            uint mid = (low + high) / 2;
+            if (checkpoints[mid].timestamp > timestamp) {
+                high = mid;
+            } else {
+                low = mid + 1;
+            }
+        }
+        return high == 0 ? 0 : checkpoints[high - 1].bonds;
+    }
+
+    // Books what the user's bonds accrued so far; must run before the user's bonds change
+    function _settle(address user, address asset, uint bonds) internal returns (uint accrued) {
+        accrued = accumulator.accrued[user][asset] + _getAccruedSinceSettle(user, asset, bonds);
+        accumulator.accrued[user][asset] = accrued;
+        accumulator.rewardPerBondPaid[user][asset] = accumulator.rewardPerBond[asset];
+    }
+
+    function _settleAllIfAccumulating(address user, uint bonds) internal {
+        if (accumulator.mode != nETFStructs.DISTRIBUTION.ACCUMULATOR) return;
+
+        uint totalAssets = accumulatorAssets.length;
+        for (uint i = 0; i < totalAssets; i++) {
+            _settle(user, accumulatorAssets[i], bonds);
+        }
+        _settle(user, address(0), bonds);
+    }
+
+    // Pays out what the user accrued in the asset's units; digits the asset cannot represent stay accrued
+    function _claim(address user, address asset, uint scale) internal returns (uint amount) {
+
+        require(accumulator.mode == nETFStructs.DISTRIBUTION.ACCUMULATOR, "408: Accumulator distribution is not enabled");
+
+        uint accrued = _settle(user, asset, fundManager.users[user].deposit);
+        amount = accrued / scale;
+        accumulator.accrued[user][asset] = accrued - amount * scale;
+
+        nETFStructs.nETFAsset storage assetData = asset == address(0) ? fundManager.mynt : fundManager.tokens[asset];
+        assetData.balance = _toPackedAmount(fMathUD60x18.sub(fMath.UD60x18.wrap(assetData.balance), fMathPool.from_scaled_to_60x18(amount, scale)));
+    }
+
+
+    ////////////////////////////////////////////////////////////////////////////////
+    // Merkle distribution. For tokens paid out to many holders, the operator reserves an amount of the
+    // token & publishes a root of (index, user, amount) leaves computed off-chain (scripts/merkle.py).
+    // Users or the keeper claim with a proof; claims are marked in a bitmap, so claim gas only grows with
+    // the proof length.
+
+    function publishMerkleRoot(address token, uint cycle, uint amount, bytes32 root) public onlyOwner whenCycleDistribution returns (uint distributionId) {
+
+        uint reserved = fMathPool.to_uint(fMathPool.from_scaled_to_60x18(amount, _getTokenScale(token)));
+        require(reserved <= fundManager.tokens[token].balance, "413: Distribution exceeds the token balance");
+
+        //The reserved amount can no longer be calibrated
+        fundManager.tokens[token].balance -= SafeCastUpgradeable.toUint128(reserved);
+
+        distributionId = merkle.totalDistributions++;
+        nETFStructs.nMerkleDistribution storage distribution = merkle.distributions[distributionId];
+        distribution.token = token;
+        distribution.cycle = SafeCastUpgradeable.toUint64(cycle);
+        distribution.remaining = SafeCastUpgradeable.toUint128(amount);
+        distribution.root = root;
+
+        //Log event
+        emit MerkleRootPublished(distributionId, block.timestamp, token, cycle, amount, root);
+    }
+
+    function claimMerkle(uint distributionId, uint index, address user, uint amount, bytes32[] calldata proof) whenNotPaused() public {
+
+        nETFStructs.nMerkleDistribution storage distribution = merkle.distributions[distributionId];
+        require(!isMerkleClaimed(distributionId, index), "411: Allocation has already been claimed");
+
+        bytes32 leaf = keccak256(bytes.concat(keccak256(abi.encode(index, user, amount))));
+        require(MerkleProofUpgradeable.verify(proof, distribution.root, leaf), "412: Invalid Merkle proof");
+
+        distribution.claimed[index >> 8] |= 1 << (index & 0xff);
+        distribution.remaining -= SafeCastUpgradeable.toUint128(amount);
+
+        address token = distribution.token;
+        IERC20(token).transfer(user, amount);
+
+        //Log event
+        emit ClaimMerkle(user, block.timestamp, distributionId, token, amount);
+    }
+
+    function isMerkleClaimed(uint distributionId, uint index) public view returns (bool) {
+        return merkle.distributions[distributionId].claimed[index >> 8] & (1 << (index & 0xff)) != 0;
+    }
+
+    function getTotalMerkleDistributions() public view returns (uint) {
+        return merkle.totalDistributions;
+    }
+
+    function getMerkleDistribution(uint distributionId) public view 
+    returns (address token, uint cycle, uint remaining, bytes32 root) {
+        nETFStructs.nMerkleDistribution storage distribution = merkle.distributions[distributionId];
+        return (distribution.token, distribution.cycle, distribution.remaining, distribution.root);
+    }
+
+
+    ////////////////////////////////////////////////////////////////////////////////
+    // Migration from the v1 storage layout. After upgrading a v1 proxy, while paused & outside a
+    // calibration cycle, the owner calls migrateStorage, then migrateTokens until every token is
+    // copied & migrateUsers for every depositor. Bonds used by MYNT & every token are copied with the
+    // epoch they were used in, & users keep the epoch of their last MYNT allocation. Users' per token
+    // allocations are not copied: they can no longer block a calibration once the cycle has closed.
+
+    function migrateStorage() public onlyOwner whenPaused {
+
+        uint cyclePeriod = legacyFundManager.cyclePeriod;
+        uint cycleLength = legacyFundManager.cycleLength;
+        require(cyclePeriod > 0, "405: Storage has already been migrated");
+        require((block.timestamp % cyclePeriod) >= cycleLength, "406: Cannot migrate during a calibration cycle");
+
+        fundManager.cyclePeriod = SafeCastUpgradeable.toUint64(cyclePeriod);
+        fundManager.cycleLength = SafeCastUpgradeable.toUint64(cycleLength);
+        //v1 did not record when the total last changed, so the migrated total is the base of its history
+        fundManager.myntDeposited = _toPackedTotal(legacyFundManager.myntDeposited);
+        totalBondCheckpoints.push(nETFStructs.nCheckpoint(0, fundManager.myntDeposited));
+        fundManager.totalTokensAvailable = SafeCastUpgradeable.toUint32(legacyFundManager.totalTokensAvailable);
+        fundManager.mynt = _toPackedAsset(legacyFundManager.myntBalance, legacyFundManager.myntBondsUsed, legacyFundManager.myntLastUpdated);
+
+        delete legacyFundManager.cyclePeriod;
+        delete legacyFundManager.cycleLength;
+        delete legacyFundManager.myntDeposited;
+        delete legacyFundManager.totalTokensAvailable;
+        delete legacyFundManager.myntBalance;
+        delete legacyFundManager.myntBondsUsed;
+        delete legacyFundManager.myntLastUpdated;
+    }
+
+    function migrateTokens(uint offset, uint limit) public onlyOwner whenPaused {
+
+        uint end = offset + limit;
+        if (end > fundManager.totalTokensAvailable) end = fundManager.totalTokensAvailable;
+
+        for (uint i = offset; i < end; i++) {
+            address token = legacyFundManager.tokenNumberToAddress[i];
+            //Skip tokens that were already migrated
+            if (token == address(0)) continue;
+
+            fundManager.tokenNumberToAddress[i] = token;
+            fundManager.tokenExists[token] = true;
+            fundManager.tokens[token] = _toPackedAsset(legacyFundManager.tokenBalances[token], legacyFundManager.tokenBondsUsed[token], legacyFundManager.tokenLastUpdated[token]);
+
+            delete legacyFundManager.tokenNumberToAddress[i];
+            delete legacyFundManager.tokenExists[token];
+            delete legacyFundManager.tokenBalances[token];
+            delete legacyFundManager.tokenBondsUsed[token];
+            delete legacyFundManager.tokenLastUpdated[token];
+        }
+    }
+
+    function migrateUsers(address[] calldata users) public onlyOwner whenPaused {
+
+        for (uint i = 0; i < users.length; i++) {
+            nETFStructs.nETFToken storage legacyUser = legacyFundManager.users[users[i]];
+            //Skip users that were already migrated or never deposited
+            if (legacyUser.lastUpdated == 0) continue;
+
+            fundManager.users[users[i]].deposit = _toPackedAmount(legacyUser.deposit);
+            fundManager.users[users[i]].lastUpdated = SafeCastUpgradeable.toUint64(legacyUser.lastUpdated);
+            //Per token allocations stay behind: migrations run after the window closed, so they cannot block anything
+            fundManager.users[users[i]].myntAllocatedEpoch = _toEpoch(legacyUser.timeMyntAllocated);
+            bondCheckpoints[users[i]].push(nETFStructs.nCheckpoint(SafeCastUpgradeable.toUint64(legacyUser.lastUpdated), fundManager.users[users[i]].deposit));
+
+            delete legacyUser.deposit;
+            delete legacyUser.lastUpdated;
+            delete legacyUser.timeMyntAllocated;
+        }
+    }
+
+
+    ////////////////////////////////////////////////////////////////////////////////
+
+    //v1 timestamps become epochs; 0 (never) stays 0
+    function _toEpoch(uint timestamp) internal view returns (uint32) {
+        return timestamp == 0 ? 0 : SafeCastUpgradeable.toUint32(timestamp / fundManager.cyclePeriod);
+    }
+
+    function _toPackedAsset(fMath.UD60x18 balance, fMath.UD60x18 bondsUsed, uint lastUpdated) internal view returns (nETFStructs.nETFAsset memory) {
+        return nETFStructs.nETFAsset(_toPackedAmount(balance), _toPackedTotal(bondsUsed), _toEpoch(lastUpdated));
+    }
 
     function getTotalTokens() public view returns (uint) {
         return fundManager.totalTokensAvailable;
@@ -182,143 +615,348 @@ contract networkETF is Initializable, ContextUpgradeable, OwnableUpgradeable, Pa
     }
 
     function getTotalMyntDeposit() public view returns (uint) {
-        return fMathPool.to_uint(fundManager.myntDeposited);
+        return fundManager.myntDeposited;
     }
 
+    /*
+    @notice The user's bonds at the end of timestamp (after every transaction of that second), found by binary search
+            over their checkpoints. Bonds when epoch N started are getBondAt(user, N * cyclePeriod - 1).
+            Users of upgraded proxies have history from their last deposit or withdrawal before the upgrade.
+    */
+    function getBondAt(address user, uint timestamp) public view returns (uint) {
+        return _checkpointLookup(bondCheckpoints[user], timestamp);
+    }
+
+    //Same as getBondAt for getTotalMyntDeposit; on upgraded proxies every timestamp before the upgrade reads the upgraded total
+    function getTotalBondAt(uint timestamp) public view returns (uint) {
+        return _checkpointLookup(totalBondCheckpoints, timestamp);
+    }
+
+    // In token units; the ETF keeps 60x18 balances, so digits the token cannot represent are left out
     function getTokenBalance(address token) public view returns (uint) {
-        return fMathPool.to_uint(fundManager.tokenBalances[token]);
+        return fundManager.tokens[token].balance / _getTokenScale(token);
+    }
+
+    function getTokenDecimals(address token) public view returns (uint8) {
+        return tokenMetadata[token].scale == 0 ? 18 : tokenMetadata[token].decimals;
     }
 
     function getMyntBalance() public view returns (uint) {
-        return fMathPool.to_uint(fundManager.myntBalance);
+        return fundManager.mynt.balance;
     }
 
     function isCalibrationOpen() public view returns (bool) {
         return (block.timestamp % fundManager.cyclePeriod) < fundManager.cycleLength;
     }
 
+    // Cycles are numbered by how many cycle periods have passed since the unix epoch; epoch 0 is never live
+    function currentEpoch() public view returns (uint32) {
+        return SafeCastUpgradeable.toUint32(block.timestamp / fundManager.cyclePeriod);
+    }
+
+    // When the calibration window of the next epoch opens
+    function nextWindowStart() public view returns (uint) {
+        return (uint(currentEpoch()) + 1) * fundManager.cyclePeriod;
+    }
+
+    // Epochs of the user's last MYNT & token allocations (0: never)
+    function getUserAllocations(address user, address[] calldata tokens) public view returns (uint32 myntEpoch, uint32[] memory tokenEpochs) {
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        myntEpoch = userData.myntAllocatedEpoch;
+        tokenEpochs = new uint32[](tokens.length);
+        for (uint i = 0; i < tokens.length; i++) {
+            tokenEpochs[i] = userData.tokenAllocatedEpoch[tokens[i]];
+        }
+    }
+
+    // Packed state of a token (MYNT for address(0)): balance & bonds used in 60x18, & the epoch bonds were used in
+    function getAssetState(address asset) public view returns (uint balance, uint bondsUsed, uint32 epoch) {
+        nETFStructs.nETFAsset storage assetData = asset == address(0) ? fundManager.mynt : fundManager.tokens[asset];
+        return (assetData.balance, assetData.bondsUsed, assetData.epoch);
+    }
+
     function getUserData(address user) public view returns (uint, uint) {
-        return (fMathPool.to_uint(fundManager.users[user].deposit), fundManager.users[user].lastUpdated);
+        return (fundManager.users[user].deposit, fundManager.users[user].lastUpdated);
     }
 
     function getUserExpectedTokenCalibration(address user, address token) public view 
     returns (uint amount, bool canWithdraw, string memory reason) {
-        fMath.UD60x18 memory amount_ud60x18;
-        (amount_ud60x18, canWithdraw, reason) = _getUserExpectedTokenCalibration(user, token);
-        return (fMathPool.to_uint(amount_ud60x18), canWithdraw, reason);
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        return _getUserExpectedCalibration(userData, userData.tokenAllocatedEpoch[token], fundManager.tokens[token], _getTokenScale(token));
     }
 
     function getUserExpectedMyntCalibration(address user) public view 
     returns (uint amount, bool canWithdraw, string memory reason) {
-        fMath.UD60x18 memory amount_ud60x18;
-        (amount_ud60x18, canWithdraw, reason) = _getUserExpectedMyntCalibration(user);
-        return (fMathPool.to_uint(amount_ud60x18), canWithdraw, reason);
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        return _getUserExpectedCalibration(userData, userData.myntAllocatedEpoch, fundManager.mynt, 0);
     }
 
+    ////////////////////////////////////////////////////////////////////////////////
+    // Batched views: one call per page of users/tokens instead of one per (user, token)
+
+    function getTokens(uint offset, uint limit) public view returns (address[] memory tokens) {
+        uint total = fundManager.totalTokensAvailable;
+        if (offset >= total) return new address[](0);
+        if (limit > total - offset) limit = total - offset;
 
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    function _getUserExpectedTokenCalibration(address user, address token) internal view 
+        tokens = new address[](limit);
+        for (uint i = 0; i < limit; i++) {
+            tokens[i] = fundManager.tokenNumberToAddress[offset + i];
+        }
+    }
+
+    function getTokenBalances(address[] calldata tokens) public view returns (uint[] memory balances) {
+        balances = new uint[](tokens.length);
+        for (uint i = 0; i < tokens.length; i++) {
+            balances[i] = fundManager.tokens[tokens[i]].balance / _getTokenScale(tokens[i]);
+        }
+    }
+
+    function getUsersData(address[] calldata users) public view 
+    returns (uint[] memory deposits, uint[] memory lastUpdated) {
+        deposits = new uint[](users.length);
+        lastUpdated = new uint[](users.length);
+        for (uint i = 0; i < users.length; i++) {
+            nETFStructs.nETFUser storage userData = fundManager.users[users[i]];
+            (deposits[i], lastUpdated[i]) = (userData.deposit, userData.lastUpdated);
+        }
+    }
+
+    /*
+    @notice Expected calibrations of a page of users for a page of tokens & MYNT
+    @returns amounts[user][token] & myntAmounts[user]; 0 where the user has no deposit or already calibrated the asset
+    @returns reasons[user][token] & myntReasons[user]; 0 if the user can calibrate, else the code of the revert they
+             would get (401-404, same precedence as getUserExpectedTokenCalibration)
+    */
+    function getCalibrationMatrix(address[] calldata users, address[] calldata tokens) public view 
     returns (
-        fMath.UD60x18 memory amount,
-        bool canWithdraw, 
-        string memory reason
+        uint[][] memory amounts,
+        uint16[][] memory reasons,
+        uint[] memory myntAmounts,
+        uint16[] memory myntReasons
     ) {
+        uint32 epoch = currentEpoch();
 
-        // Check & update token data if necessary
-        // Update token data for cycle
-        uint tokenLastUpdated = fundManager.tokenLastUpdated[token];
-        fMath.UD60x18 memory tokenBondsUsed = fundManager.tokenBondsUsed[token];
-        //If cycle bonds have not been allocated for this token yet, set to 0
-        if (tokenLastUpdated < (block.timestamp - fundManager.cycleLength)) {
-            tokenBondsUsed = fMathUD60x18.fromUint(0);
+        //Assets are read once for the whole page
+        nETFStructs.nETFAsset[] memory assets = new nETFStructs.nETFAsset[](tokens.length);
+        for (uint j = 0; j < tokens.length; j++) {
+            assets[j] = fundManager.tokens[tokens[j]];
         }
-        
-        canWithdraw = true;
-        //Ensure calibration cycle is open
-        if (!isCalibrationOpen()) {
-            canWithdraw = false;
-            reason = "401: Calibration cycle is closed";
+        nETFStructs.nETFAsset memory mynt = fundManager.mynt;
+
+        amounts = new uint[][](users.length);
+        reasons = new uint16[][](users.length);
+        myntAmounts = new uint[](users.length);
+        myntReasons = new uint16[](users.length);
+        for (uint i = 0; i < users.length; i++) {
+            (amounts[i], reasons[i], myntAmounts[i], myntReasons[i]) = _getUserCalibrationRow(users[i], tokens, assets, mynt, epoch);
         }
-        //Ensure user has deposited before the previous calibration cycle
-        if( fundManager.users[user].lastUpdated >(block.timestamp - fundManager.cyclePeriod)){
-            canWithdraw = false;
-            reason = "403: User has not deposited before the previous calibration cycle";
+    }
+
+
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    function _getUserExpectedCalibration(
+        nETFStructs.nETFUser storage userData,
+        uint32 allocatedEpoch,
+        nETFStructs.nETFAsset memory asset,
+        uint scale //0 for MYNT
+    ) internal view returns (uint amount, bool canWithdraw, string memory reason) {
+
+        uint32 epoch = currentEpoch();
+        uint16 reasonCode = _getCalibrationReason(userData, allocatedEpoch, epoch);
+        amount = _getExpectedAmount(reasonCode, asset, fMath.UD60x18.wrap(userData.deposit), epoch);
+        if (scale > 1) amount /= scale;
+
+        return (amount, reasonCode == 0, _getReasonMessage(reasonCode, scale == 0));
+    }
+
+    function _getUserCalibrationRow(
+        address user,
+        address[] calldata tokens,
+        nETFStructs.nETFAsset[] memory assets,
+        nETFStructs.nETFAsset memory mynt,
+        uint32 epoch
+    ) internal view returns (uint[] memory amounts, uint16[] memory reasons, uint myntAmount, uint16 myntReason) {
+
+        nETFStructs.nETFUser storage userData = fundManager.users[user];
+        fMath.UD60x18 userBonds = fMath.UD60x18.wrap(userData.deposit);
+        uint16 userReason = _getUserCalibrationReason(userData);
+
+        amounts = new uint[](tokens.length);
+        reasons = new uint16[](tokens.length);
+        for (uint j = 0; j < tokens.length; j++) {
+            reasons[j] = _getAssetCalibrationReason(userReason, userData.tokenAllocatedEpoch[tokens[j]], epoch);
+            amounts[j] = _getExpectedAmount(reasons[j], assets[j], userBonds, epoch) / _getTokenScale(tokens[j]);
         }
 
-        //Ensure time timeTokenAllocated is before the previous calibration length
-        if(fundManager.users[user].timeTokenAllocated[token] > 
-        (block.timestamp - fundManager.cycleLength)){
-            canWithdraw = false;
-            reason = "402: User has allocated tokens before in this calibration cycle";
+        myntReason = _getAssetCalibrationReason(userReason, userData.myntAllocatedEpoch, epoch);
+        myntAmount = _getExpectedAmount(myntReason, mynt, userBonds, epoch);
+    }
+
+    /*
+    @notice Why the user cannot calibrate an asset, checked in order of precedence & stopping at the first hit
+    @param allocatedEpoch epoch in which the user last calibrated the asset
+    @returns 404 (no deposit), 402 (already allocated), 403 (deposit too recent), 401 (window closed) or 0
+    */
+    function _getCalibrationReason(
+        nETFStructs.nETFUser storage userData,
+        uint32 allocatedEpoch,
+        uint32 epoch
+    ) internal view returns (uint16) {
+        return _getAssetCalibrationReason(_getUserCalibrationReason(userData), allocatedEpoch, epoch);
+    }
+
+    // Checks that don't depend on the asset: 404, 403 & 401, in that order
+    function _getUserCalibrationReason(nETFStructs.nETFUser storage userData) internal view returns (uint16) {
+        if (userData.deposit == 0) return 404;
+        if (userData.lastUpdated > (block.timestamp - fundManager.cyclePeriod)) return 403;
+        if (!isCalibrationOpen()) return 401;
+        return 0;
+    }
+
+    // An allocation in this epoch (402) comes before everything but a missing deposit
+    function _getAssetCalibrationReason(uint16 userReason, uint32 allocatedEpoch, uint32 epoch) internal pure returns (uint16) {
+        if (userReason == 404) return 404;
+        if (allocatedEpoch == epoch) return 402;
+        return userReason;
+    }
+
+    function _requireCanCalibrate(
+        nETFStructs.nETFUser storage userData,
+        uint32 allocatedEpoch,
+        uint32 epoch,
+        address asset
+    ) internal view {
+        _requireCanCalibrateAsset(_getUserCalibrationReason(userData), allocatedEpoch, epoch, asset);
+    }
+
+    function _requireCanCalibrateAsset(uint16 userReason, uint32 allocatedEpoch, uint32 epoch, address asset) internal pure {
+        uint16 reasonCode = _getAssetCalibrationReason(userReason, allocatedEpoch, epoch);
+        if (reasonCode == 0) return;
+        if (reasonCode == 404) revert NoDeposit();
+        if (reasonCode == 402) revert AlreadyAllocated(asset);
+        if (reasonCode == 403) revert DepositTooRecent();
+        revert CalibrationClosed();
+    }
+
+    // Left at 0 where there are no bonds (404) or the user's bonds were already used in this cycle (402)
+    function _getExpectedAmount(
+        uint16 reasonCode,
+        nETFStructs.nETFAsset memory asset,
+        fMath.UD60x18 userBonds,
+        uint32 epoch
+    ) internal view returns (uint) {
+        if (reasonCode == 402 || reasonCode == 404) return 0;
+        return fMathPool.to_uint(_getCalibrationAmount(asset, userBonds, epoch));
+    }
+
+    // Messages of the reason codes, as the views have always returned them
+    function _getReasonMessage(uint16 reasonCode, bool isMynt) internal pure returns (string memory) {
+        if (reasonCode == 404) return "404: User has not deposited any MYNT";
+        if (reasonCode == 402) {
+            return isMynt
+                ? "402: User has allocated MYNT before in this calibration cycle"
+                : "402: User has allocated tokens before in this calibration cycle";
         }
+        if (reasonCode == 403) return "403: User has not deposited before the previous calibration cycle";
+        if (reasonCode == 401) return "401: Calibration cycle is closed";
+        return "";
+    }
+
+    // Pro-rata share of an asset for the user's bonds, out of the bonds not yet used in this cycle
+    function _getCalibrationAmount(
+        nETFStructs.nETFAsset memory asset,
+        fMath.UD60x18 userBonds,
+        uint32 epoch
+    ) internal view returns (fMath.UD60x18) {
 
-        // Ensure user has deposited > 0
-        if ( fMathPool.to_uint(fundManager.users[user].deposit) == 0) {
-            canWithdraw = false;
-            reason = "404: User has not deposited any MYNT";
+        //Bonds used in an earlier epoch no longer count
+        fMath.UD60x18 bondsUsed = fMath.UD60x18.wrap(asset.epoch == epoch ? asset.bondsUsed : 0);
+        fMath.UD60x18 totalBonds = fMathUD60x18.sub(fMath.UD60x18.wrap(fundManager.myntDeposited), bondsUsed);
+
+        return fMathUD60x18.div(fMathUD60x18.mul(userBonds, fMath.UD60x18.wrap(asset.balance)), totalBonds);
+    }
+
+    // Asset data after the user's bonds were used to allocate amount in this cycle
+    function _spendAsset(
+        nETFStructs.nETFAsset memory asset,
+        fMath.UD60x18 userBonds,
+        fMath.UD60x18 amount,
+        uint32 epoch
+    ) internal pure returns (nETFStructs.nETFAsset memory) {
+
+        //Bonds used are only reset by the first calibration of the asset in an epoch
+        if (asset.epoch != epoch) {
+            asset.bondsUsed = 0;
+            asset.epoch = epoch;
         }
 
-        //Return user the tokens based on existing bonds, and update their timeTokenAllocated
-        fMath.UD60x18 memory userBonds = fundManager.users[user].deposit;
-        fMath.UD60x18 memory totalTokenBonds = fMathUD60x18.sub(fundManager.myntDeposited, tokenBondsUsed);
-        fMath.UD60x18 memory tokenAvailable = fundManager.tokenBalances[token];
-        
-        amount = fMathUD60x18.div(fMathUD60x18.mul(userBonds, tokenAvailable), totalTokenBonds);  
+        asset.bondsUsed = SafeCastUpgradeable.toUint96(fMathPool.to_uint(fMathUD60x18.add(fMath.UD60x18.wrap(asset.bondsUsed), userBonds)));
+        asset.balance = _toPackedAmount(fMathUD60x18.sub(fMath.UD60x18.wrap(asset.balance), amount));
+        return asset;
+    }
+
+    // Allocates the user's share of a token for this cycle; eligibility must already be checked
+    function _calibrateToken(
+        address user,
+        address token,
+        fMath.UD60x18 userBonds,
+        uint32 epoch
+    ) internal {
+
+        nETFStructs.nETFAsset memory tokenData = fundManager.tokens[token];
+        uint scale = _getTokenScale(token);
 
-        return (amount, canWithdraw, reason);
+        //Only what the token can represent is spent; the remaining digits stay in the balance
+        uint amount = fMathPool.to_scaled(_getCalibrationAmount(tokenData, userBonds, epoch), scale);
 
+        // Update user's token allocation epoch & token data
+        fundManager.users[user].tokenAllocatedEpoch[token] = epoch;
+        fundManager.tokens[token] = _spendAsset(tokenData, userBonds, fMathPool.from_scaled_to_60x18(amount, scale), epoch);
+
+        IERC20(token).transfer(user, amount);
+
+        //Log event
+        emit CalibrateToken(user, block.timestamp, token, amount);
     }
 
-    function _getUserExpectedMyntCalibration(address user) internal view
-    returns (
-        fMath.UD60x18 memory amount,
-        bool canWithdraw,
-        string memory reason
-    ) {
-            // Check & update token data if necessary
-            // Update token data for cycle
-            uint tokenLastUpdated = fundManager.myntLastUpdated;
-            fMath.UD60x18 memory myntBondsUsed = fundManager.myntBondsUsed;
-            //If cycle bonds have not been allocated for this token yet, set to 0
-            if (tokenLastUpdated < (block.timestamp - fundManager.cycleLength)) {
-                myntBondsUsed = fMathUD60x18.fromUint(0);
-            }
+    // Allocates the user's share of MYNT for this cycle; eligibility must already be checked
+    function _calibrateMynt(
+        address payable user,
+        fMath.UD60x18 userBonds,
+        uint32 epoch
+    ) internal {
 
-            canWithdraw = true; 
-            //Ensure calibration cycle is open
-            if (!isCalibrationOpen()) {
-                canWithdraw = false;
-                reason = "401: Calibration cycle is closed";
-            }
-            //Ensure user has deposited before the previous calibration cycle
-            if( fundManager.users[user].lastUpdated >
-            (block.timestamp - fundManager.cyclePeriod)){
-                canWithdraw = false;
-                reason = "403: User has not deposited before the previous calibration cycle";
-            }
-            //Ensure time timeTokenAllocated is before the previous calibration length
-            if(fundManager.users[user].timeMyntAllocated >
-            (block.timestamp - fundManager.cycleLength)){
-                canWithdraw = false;
-                reason = "402: User has allocated MYNT before in this calibration cycle";
-            }
+        nETFStructs.nETFAsset memory myntData = fundManager.mynt;
+        fMath.UD60x18 amount = _getCalibrationAmount(myntData, userBonds, epoch);
 
-            // Ensure user has deposited > 0
-            if ( fMathPool.to_uint(fundManager.users[user].deposit) == 0) {
-                canWithdraw = false;
-                reason = "404: User has not deposited any MYNT";
-            }
+        // Update user's MYNT allocation epoch & MYNT data
+        fundManager.users[user].myntAllocatedEpoch = epoch;
+        fundManager.mynt = _spendAsset(myntData, userBonds, amount, epoch);
 
-            //Return user the tokens based on existing bonds, and update their timeTokenAllocated
-            fMath.UD60x18 memory userBonds = fundManager.users[user].deposit;
-            fMath.UD60x18 memory totalMYNTBonds = fMathUD60x18.sub(fundManager.myntDeposited, myntBondsUsed);
-            fMath.UD60x18 memory myntAvailable = fundManager.myntBalance;
+        user.transfer(fMathPool.to_uint(amount));
+
+        //Log event
+        emit CalibrateMynt(user, block.timestamp, fMathPool.to_uint(amount));
+    }
+
+    // 10**(18 - decimals) of a registered token; 1 for tokens registered before decimals were cached (18 decimals)
+    function _getTokenScale(address token) internal view returns (uint scale) {
+        scale = tokenMetadata[token].scale;
+        if (scale == 0) scale = 1;
+    }
+
+    // Packed amounts revert instead of truncating; user bonds are also bounded by the uint96 total deposit
+    function _toPackedAmount(fMath.UD60x18 x) internal pure returns (uint128) {
+        return SafeCastUpgradeable.toUint128(fMathPool.to_uint(x));
+    }
 
-            amount = fMathUD60x18.div(fMathUD60x18.mul(userBonds, myntAvailable), totalMYNTBonds);
-            
-            return (amount, canWithdraw, reason);
+    function _toPackedTotal(fMath.UD60x18 x) internal pure returns (uint96) {
+        return SafeCastUpgradeable.toUint96(fMathPool.to_uint(x));
     }
 
-    uint[50] __gap;
+    //Slots taken by the packed fund manager, the accumulator, the Merkle distributor, token metadata, bond checkpoints,
+    //accumulator assets & unaccrued amounts come out of the gap
+    uint[32] __gap;
 
 }
\ No newline at end of file
@@ -0,0 +1,81 @@
+// SPDX-License-Identifier: BUSL-1.1
+pragma solidity ^0.8.4;
+
+import {networkETF} from "./nETF.sol";
+import {Clones} from "../node_modules/@openzeppelin/contracts/proxy/Clones.sol";
+import {Ownable} from "../node_modules/@openzeppelin/contracts/access/Ownable.sol";
+
+/*
+@notice Deploys networkETF instances as EIP-1167 minimal proxies of one implementation, initialized in the same
+        transaction & kept in an on-chain registry. Addresses are deterministic (CREATE2) for a creator, a salt
+        & the implementation at the time of creation. Clones are not upgradeable: setImplementation only changes
+        what later clones point to. Implementations are locked when set, so nobody can initialize & own them.
+*/
+contract networkETFFactory is Ownable {
+
+    event InstanceCreated(address indexed instance, address indexed implementation, address indexed owner, bytes32 salt, uint cyclePeriod, uint cycleLength);
+    event ImplementationChanged(address indexed implementation);
+
+    address public implementation;
+
+    address[] private instances;
+    mapping(address => bool) public isInstance;
+
+
+    constructor(address implementation_) {
+        setImplementation(implementation_);
+    }
+
+    function setImplementation(address implementation_) public onlyOwner {
+        require(implementation_.code.length > 0, "Factory: implementation is not a contract");
+
+        //Lock the implementation; one locked before (e.g. when rolling back) has no owner either
+        try networkETF(payable(implementation_)).lockImplementation() {} catch {}
+        require(networkETF(payable(implementation_)).owner() == address(0), "Factory: implementation is initialized");
+        implementation = implementation_;
+
+        //Log event
+        emit ImplementationChanged(implementation_);
+    }
+
+    /*
+    @notice Deploys & initializes an ETF owned by the caller, whose initial bond is msg.value
+    @param salt any value; salts are namespaced by creator, so nobody else can take the caller's address
+    */
+    function createETF(bytes32 salt, uint cyclePeriod, uint cycleLength) public payable returns (address instance) {
+
+        instance = Clones.cloneDeterministic(implementation, _getSalt(_msgSender(), salt));
+        networkETF(payable(instance)).initializeFor{value: msg.value}(_msgSender(), cyclePeriod, cycleLength);
+
+        instances.push(instance);
+        isInstance[instance] = true;
+
+        //Log event
+        emit InstanceCreated(instance, implementation, _msgSender(), salt, cyclePeriod, cycleLength);
+    }
+
+    // Address createETF will deploy to for this creator & salt, with the current implementation
+    function predictAddress(address creator, bytes32 salt) public view returns (address) {
+        return Clones.predictDeterministicAddress(implementation, _getSalt(creator, salt));
+    }
+
+    function getTotalInstances() public view returns (uint) {
+        return instances.length;
+    }
+
+    function getInstances(uint offset, uint limit) public view returns (address[] memory page) {
+        uint total = instances.length;
+        if (offset >= total) return new address[](0);
+        if (limit > total - offset) limit = total - offset;
+
+        page = new address[](limit);
+        for (uint i = 0; i < limit; i++) {
+            page[i] = instances[offset + i];
+        }
+    }
+
+    function _getSalt(address creator, bytes32 salt) internal pure returns (bytes32) {
+        return keccak256(abi.encode(creator, salt));
+    }
+
+}
@@ -0,0 +1,221 @@
+// SPDX-License-Identifier: BUSL-1.1
+pragma solidity ^0.8.4;
+
+import {IERC20} from "../utils/interfaces/IERC20.sol";
+import {fMath, fMathUD60x18, fMathPool} from "../utils/math/fMathPool.sol";
+import {nETFStructs} from "../utils/struct/fStruct.sol";
+import {ContextUpgradeable} from "../../node_modules/@openzeppelin/contracts-upgradeable/utils/ContextUpgradeable.sol";
+import {PausableUpgradeable} from "../../node_modules/@openzeppelin/contracts-upgradeable/security/PausableUpgradeable.sol";
+import {Initializable} from "../../node_modules/@openzeppelin/contracts-upgradeable/proxy/utils/Initializable.sol";
+import {OwnableUpgradeable} from "../../node_modules/@openzeppelin/contracts-upgradeable/access/OwnableUpgradeable.sol";
+
+//The v1 networkETF (unpacked nFundManager layout) on the value-type math; only the migration tests use it to
+//build v1 storage behind a proxy before upgrading it to networkETF
+contract networkETFv1 is Initializable, ContextUpgradeable, OwnableUpgradeable, PausableUpgradeable {
+
+    event Deposit(address indexed user,uint timestamp, uint amount);
+    event Withdraw(address indexed user, uint timestamp, uint amount);
+    event CalibrateToken(address indexed user, uint timestamp, address indexed tokenAddress, uint amount);
+    event CalibrateMynt(address indexed user, uint timestamp, uint amount);
+    event SubmitToken(address indexed provider, uint timestamp, address indexed tokenAddress, uint amount);
+    event SubmitMynt(address indexed provider, uint timestamp, uint amount);
+
+    nETFStructs.nFundManager private fundManager;
+
+
+    function initialize(uint cyclePeriod, uint cycleLength) initializer public payable {
+
+        require(msg.value > 0, "400: Initialization requires a non-zero deposit");
+
+        fundManager.cyclePeriod = cyclePeriod;
+        fundManager.cycleLength = cycleLength;
+
+         //Set bonds for fund & user
+        fundManager.users[_msgSender()].deposit =  fMathPool.from_base_to_60x18(msg.value);
+        fundManager.users[_msgSender()].lastUpdated = block.timestamp;
+
+        fundManager.myntDeposited =  fMathPool.from_base_to_60x18(msg.value);
+
+        __Ownable_init();
+    }
+
+    function pause() public onlyOwner {
+        _pause();
+    }
+
+    function unpause() public onlyOwner {
+        _unpause();
+    }
+
+    function deposit() whenNotPaused() public payable returns(bool) {
+
+        require(msg.value > 0, "400: Invalid amount");
+
+        //Set bonds for fund & user
+        fundManager.users[_msgSender()].deposit = fMathUD60x18.add(fundManager.users[_msgSender()].deposit, fMathPool.from_base_to_60x18(msg.value));
+        fundManager.users[_msgSender()].lastUpdated = block.timestamp;
+        fundManager.myntDeposited = fMathUD60x18.add(fundManager.myntDeposited, fMathPool.from_base_to_60x18(msg.value));
+
+        //Log event
+        emit Deposit(_msgSender(), block.timestamp, msg.value);
+
+        return true;
+    }
+
+    function withdraw(uint amount_) whenNotPaused() public payable returns(bool){
+
+        require(amount_ > 0, "400: Invalid amount");
+        require(amount_ <= fMathPool.to_uint(fundManager.users[_msgSender()].deposit), "401: Insufficient amount deposited");
+
+        //Set bonds for fund & user
+        fundManager.users[_msgSender()].deposit = fMathUD60x18.sub(fundManager.users[_msgSender()].deposit, fMathPool.from_base_to_60x18(amount_));
+        fundManager.users[_msgSender()].lastUpdated = block.timestamp;
+        fundManager.myntDeposited = fMathUD60x18.sub(fundManager.myntDeposited, fMathPool.from_base_to_60x18(amount_));
+
+        // Send funds to user
+        payable(_msgSender()).transfer(amount_);
+
+        //Log event
+        emit Withdraw(_msgSender(), block.timestamp, amount_);
+
+        return true;
+    }
+
+    function calibrateToken(address user, address token) whenNotPaused() public {
+
+        //If cycle bonds have not been allocated for this token yet, set to 0
+        if (fundManager.tokenLastUpdated[token] < (block.timestamp - fundManager.cycleLength)) {
+            fundManager.tokenBondsUsed[token] = fMathUD60x18.fromUint(0);
+        }
+        fundManager.tokenLastUpdated[token] = block.timestamp;
+
+        (fMath.UD60x18 amount, bool canWithdraw, string memory reason) = _getExpected(user, fundManager.users[user].timeTokenAllocated[token], fundManager.tokenBalances[token], fundManager.tokenBondsUsed[token]);
+        require(canWithdraw, reason);
+
+        IERC20(token).transfer(user, fMathPool.to_uint(amount));
+
+        fundManager.users[user].timeTokenAllocated[token] = block.timestamp;
+        fundManager.tokenBondsUsed[token] = fMathUD60x18.add(fundManager.tokenBondsUsed[token], fundManager.users[user].deposit);
+        fundManager.tokenBalances[token] = fMathUD60x18.sub(fundManager.tokenBalances[token], amount);
+
+        //Log event
+        emit CalibrateToken(user, block.timestamp, token, fMathPool.to_uint(amount));
+    }
+
+    function calibrateMynt(address payable user) whenNotPaused() public payable {
+
+        //If cycle bonds have not been allocated for MYNT yet, set to 0
+        if (fundManager.myntLastUpdated < (block.timestamp - fundManager.cycleLength)) {
+            fundManager.myntBondsUsed = fMathUD60x18.fromUint(0);
+        }
+        fundManager.myntLastUpdated = block.timestamp;
+
+        (fMath.UD60x18 amount, bool canWithdraw, string memory reason) = _getExpected(user, fundManager.users[user].timeMyntAllocated, fundManager.myntBalance, fundManager.myntBondsUsed);
+        require(canWithdraw, reason);
+
+        user.transfer(fMathPool.to_uint(amount));
+
+        fundManager.users[user].timeMyntAllocated = block.timestamp;
+        fundManager.myntBondsUsed = fMathUD60x18.add(fundManager.myntBondsUsed, fundManager.users[user].deposit);
+        fundManager.myntBalance = fMathUD60x18.sub(fundManager.myntBalance, amount);
+
+        //Log event
+        emit CalibrateMynt(user, block.timestamp, fMathPool.to_uint(amount));
+    }
+
+    function submitToken(address token, uint amount) whenNotPaused() public {
+
+        require(amount > 0, "401: Amount must be greater than 0");
+        require(IERC20(token).decimals() == 18, "402: Token must have 18 decimals");
+
+        IERC20(token).transferFrom(_msgSender(), address(this), amount);
+
+        if (!fundManager.tokenExists[token]) {
+            fundManager.tokenExists[token] = true;
+            fundManager.tokenNumberToAddress[fundManager.totalTokensAvailable]= token;
+            fundManager.totalTokensAvailable += 1;
+        }
+
+        fundManager.tokenBalances[token] = fMathUD60x18.add(fundManager.tokenBalances[token], fMathPool.from_base_to_60x18(amount));
+
+        //Log event
+        emit SubmitToken(_msgSender(), block.timestamp, token, amount);
+    }
+
+    function submitMynt() whenNotPaused() public payable {
+
+        require(msg.value > 0, "401: Amount must be greater than 0");
+
+        fundManager.myntBalance = fMathUD60x18.add(fundManager.myntBalance, fMathPool.from_base_to_60x18(msg.value));
+
+        //Log event
+        emit SubmitMynt(_msgSender(), block.timestamp, msg.value);
+    }
+
+    ////////////////////////////////////////////////////////////////////////////////
+
+    function getTotalTokens() public view returns (uint) {
+        return fundManager.totalTokensAvailable;
+    }
+
+    function getTotalMyntDeposit() public view returns (uint) {
+        return fMathPool.to_uint(fundManager.myntDeposited);
+    }
+
+    function getTokenBalance(address token) public view returns (uint) {
+        return fMathPool.to_uint(fundManager.tokenBalances[token]);
+    }
+
+    function getMyntBalance() public view returns (uint) {
+        return fMathPool.to_uint(fundManager.myntBalance);
+    }
+
+    function isCalibrationOpen() public view returns (bool) {
+        return (block.timestamp % fundManager.cyclePeriod) < fundManager.cycleLength;
+    }
+
+    function getUserData(address user) public view returns (uint, uint) {
+        return (fMathPool.to_uint(fundManager.users[user].deposit), fundManager.users[user].lastUpdated);
+    }
+
+    //Not in v1: exposes the allocation state the migration tests compare
+    function getAllocationTimes(address user, address token) public view returns (uint myntAllocated, uint tokenAllocated) {
+        return (fundManager.users[user].timeMyntAllocated, fundManager.users[user].timeTokenAllocated[token]);
+    }
+
+    function getBondsUsed(address token) public view returns (uint bondsUsed, uint lastUpdated) {
+        if (token == address(0)) return (fMathPool.to_uint(fundManager.myntBondsUsed), fundManager.myntLastUpdated);
+        return (fMathPool.to_uint(fundManager.tokenBondsUsed[token]), fundManager.tokenLastUpdated[token]);
+    }
+
+    ////////////////////////////////////////////////////////////////////////////////
+
+    //v1's checks in v1's order: the last failing one sets the reason
+    function _getExpected(address user, uint timeAllocated, fMath.UD60x18 available, fMath.UD60x18 bondsUsed) internal view
+    returns (fMath.UD60x18 amount, bool canWithdraw, string memory reason) {
+
+        canWithdraw = true;
+        if (!isCalibrationOpen()) {
+            canWithdraw = false;
+            reason = "401: Calibration cycle is closed";
+        }
+        if (fundManager.users[user].lastUpdated > (block.timestamp - fundManager.cyclePeriod)) {
+            canWithdraw = false;
+            reason = "403: User has not deposited before the previous calibration cycle";
+        }
+        if (timeAllocated > (block.timestamp - fundManager.cycleLength)) {
+            canWithdraw = false;
+            reason = "402: User has allocated tokens before in this calibration cycle";
+        }
+        if (fMathPool.to_uint(fundManager.users[user].deposit) == 0) {
+            canWithdraw = false;
+            reason = "404: User has not deposited any MYNT";
+        }
+
+        fMath.UD60x18 totalBonds = fMathUD60x18.sub(fundManager.myntDeposited, bondsUsed);
+        amount = fMathUD60x18.div(fMathUD60x18.mul(fundManager.users[user].deposit, available), totalBonds);
+    }
+
+    uint[50] __gap;
+
+}
@@ -0,0 +1,122 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.10;
+
+import {fMath, fMathUD60x18, fMathPool} from "../utils/math/fMathPool.sol";
+import {fMathUD60x18__FromUintOverflow, fMathUD60x18__AddOverflow, fMathUD60x18__SubUnderflow} from "../utils/math/fMath.sol";
+
+//Struct based copy of the math the ETF used before UD60x18 became a value type; only the differential tests use it
+library legacyMath {
+    struct UD60x18 {
+        uint256 value;
+    }
+
+    uint256 internal constant SCALE = 1e18;
+    uint256 internal constant MAX_UD60x18 =
+        115792089237316195423570985008687907853269984665640564039457_584007913129639935;
+
+    function fromUint(uint256 x) internal pure returns (UD60x18 memory result) {
+        unchecked {
+            if (x > MAX_UD60x18 / SCALE) {
+                revert fMathUD60x18__FromUintOverflow(x);
+            }
+            result = UD60x18({ value: x * SCALE });
+        }
+    }
+
+    function scale() internal pure returns (UD60x18 memory result) {
+        result = UD60x18({ value: SCALE });
+    }
+
+    function add(UD60x18 memory x, UD60x18 memory y) internal pure returns (UD60x18 memory result) {
+        unchecked {
+            uint256 rValue = x.value + y.value;
+            if (rValue < x.value) {
+                revert fMathUD60x18__AddOverflow(x.value, y.value);
+            }
+            result = UD60x18({ value: rValue });
+        }
+    }
+
+    function sub(UD60x18 memory x, UD60x18 memory y) internal pure returns (UD60x18 memory result) {
+        unchecked {
+            if (x.value < y.value) {
+                revert fMathUD60x18__SubUnderflow(x.value, y.value);
+            }
+            result = UD60x18({ value: x.value - y.value });
+        }
+    }
+
+    function mul(UD60x18 memory x, UD60x18 memory y) internal pure returns (UD60x18 memory result) {
+        result = UD60x18({ value: fMath.mulDivFixedPoint(x.value, y.value) });
+    }
+
+    function div(UD60x18 memory x, UD60x18 memory y) internal pure returns (UD60x18 memory result) {
+        result = UD60x18({ value: fMath.mulDiv(x.value, SCALE, y.value) });
+    }
+
+    function powu(UD60x18 memory x, uint256 y) internal pure returns (UD60x18 memory result) {
+        uint256 xValue = x.value;
+        uint256 rValue = y & 1 > 0 ? xValue : SCALE;
+        for (y >>= 1; y > 0; y >>= 1) {
+            xValue = fMath.mulDivFixedPoint(xValue, xValue);
+            if (y & 1 > 0) {
+                rValue = fMath.mulDivFixedPoint(rValue, xValue);
+            }
+        }
+        result = UD60x18({ value: rValue });
+    }
+
+    function from_base_to_60x18(uint256 number_) internal pure returns (UD60x18 memory) {
+        return div(fromUint(number_), fromUint(10**18));
+    }
+
+    function from_decimal_to_60x18(uint256 number_, uint decimals_) internal pure returns (UD60x18 memory) {
+        return div(fromUint(number_), fromUint(10**decimals_));
+    }
+
+    function get_price_from_space(int256 space_) internal pure returns (UD60x18 memory) {
+        UD60x18 memory num_1_0001;
+        num_1_0001.value = 1000100000000000000;
+
+        UD60x18 memory result = powu(num_1_0001, fMathPool.get_abs_value(space_));
+        if (bool(0 > space_)) result = div(scale(), result);
+        return result;
+    }
+}
+
+contract MathHarness {
+    //Same expression as nETF's calibration amount: userBonds * balance / (deposited - bondsUsed)
+    function calibrationAmount(uint userBonds, uint balance, uint deposited, uint bondsUsed) public pure returns (uint) {
+        fMath.UD60x18 totalBonds = fMathUD60x18.sub(fMathPool.from_base_to_60x18(deposited), fMathPool.from_base_to_60x18(bondsUsed));
+        return fMathPool.to_uint(fMathUD60x18.div(fMathUD60x18.mul(fMathPool.from_base_to_60x18(userBonds), fMathPool.from_base_to_60x18(balance)), totalBonds));
+    }
+
+    function legacyCalibrationAmount(uint userBonds, uint balance, uint deposited, uint bondsUsed) public pure returns (uint) {
+        legacyMath.UD60x18 memory totalBonds = legacyMath.sub(legacyMath.from_base_to_60x18(deposited), legacyMath.from_base_to_60x18(bondsUsed));
+        return legacyMath.div(legacyMath.mul(legacyMath.from_base_to_60x18(userBonds), legacyMath.from_base_to_60x18(balance)), totalBonds).value;
+    }
+
+    function fromBase(uint number_) public pure returns (uint) {
+        return fMathPool.to_uint(fMathPool.from_base_to_60x18(number_));
+    }
+
+    function legacyFromBase(uint number_) public pure returns (uint) {
+        return legacyMath.from_base_to_60x18(number_).value;
+    }
+
+    function fromDecimal(uint number_, uint decimals_) public pure returns (uint) {
+        return fMathPool.to_uint(fMathPool.from_decimal_to_60x18(number_, decimals_));
+    }
+
+    function legacyFromDecimal(uint number_, uint decimals_) public pure returns (uint) {
+        return legacyMath.from_decimal_to_60x18(number_, decimals_).value;
+    }
+
+    function priceFromSpace(int space_) public pure returns (uint) {
+        return fMathPool.to_uint(fMathPool.get_price_from_space(space_));
+    }
+
+    function legacyPriceFromSpace(int space_) public pure returns (uint) {
+        return legacyMath.get_price_from_space(space_).value;
+    }
+}
@@ -17,6 +17,20 @@ contract Token is Initializable, ERC20Upgradeable, OwnableUpgradeable {
     function mintTo(address to, uint256 amount) public onlyOwner {
         _mint(to, amount);
     }
+    // Test fixtures fund many accounts per transaction instead of one mintTo each
+    function mintBatch(address[] calldata to, uint256[] calldata amounts) public onlyOwner {
+        require(to.length == amounts.length, "Token: length mismatch");
+        for (uint i = 0; i < to.length; i++) {
+            _mint(to[i], amounts[i]);
+        }
+    }
+
+    // Test-only: sets allowances on behalf of the holders, so fixtures need no approve per account
+    function approveBatch(address[] calldata holders, address spender, uint256 amount) public onlyOwner {
+        for (uint i = 0; i < holders.length; i++) {
+            _approve(holders[i], spender, amount);
+        }
+    }
     ///////////////////////////////////////////////////////////////////////////////////////////
     function getTime() public view returns (uint) {
         return block.timestamp;
@@ -25,4 +39,17 @@ contract Token is Initializable, ERC20Upgradeable, OwnableUpgradeable {
     function setTest(bool test_) public {
         test = test_;
     }
-}
\ No newline at end of file
+}
+
+// Token with configurable decimals, for assets that are not 18-decimal
+contract DecimalsToken is Token {
+    uint8 private _decimals;
+
+    function setDecimals(uint8 decimals_) public onlyOwner {
+        _decimals = decimals_;
+    }
+
+    function decimals() public view override returns (uint8) {
+        return _decimals;
+    }
+}
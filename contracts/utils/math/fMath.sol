@@ -4,7 +4,7 @@
 		express permission of Fragmynt, Inc.
 */
 
-pragma solidity >=0.8.4;
+pragma solidity >=0.8.8;
 
 /// @notice Emitted when the result overflows uint256.
 error fMath__MulDivFixedPointOverflow(uint256 prod1);
@@ -99,15 +99,11 @@ error fMathUD60x18__SubUnderflow(uint256 x, uint256 y);
 /// @dev Common mathematical functions used in both fMathSD59x18 and fMathUD60x18. Note that this shared library
 /// credits Paul Razvan Berg
 library fMath {
-    /// STRUCTS ///
+    /// TYPES ///
 
-    struct SD59x18 {
-        int256 value;
-    }
+    type SD59x18 is int256;
 
-    struct UD60x18 {
-        uint256 value;
-    }
+    type UD60x18 is uint256;
 
     /// STORAGE ///
 
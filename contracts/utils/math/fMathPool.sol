@@ -7,25 +7,76 @@
 pragma solidity ^0.8.10;
 
 import {fMathUD60x18, fMath} from "./fMathUD60x18.sol";
+import {fMathUD60x18__FromUintOverflow} from "./fMath.sol";
+
+/// @notice Emitted when |space| is above fMathPool.MAX_SPACE, where the price would overflow.
+error fMathPool__SpaceOutOfBounds(int256 space);
 
 library fMathPool {
 
+    /// @dev Largest |space| whose price fits in a UD60x18; generated by scripts/generate_space_table.py.
+    uint256 internal constant MAX_SPACE = 1360059;
+
+    /// @dev 1.0001^(2^i), each the previous one squared with mulDivFixedPoint rounding, i.e. the values powu
+    /// reaches while squaring. Generated by scripts/generate_space_table.py.
+    uint256 internal constant POW_1_0001_2_0 = 1000100000000000000;
+    uint256 internal constant POW_1_0001_2_1 = 1000200010000000000;
+    uint256 internal constant POW_1_0001_2_2 = 1000400060004000100;
+    uint256 internal constant POW_1_0001_2_3 = 1000800280056007001;
+    uint256 internal constant POW_1_0001_2_4 = 1001601200560182045;
+    uint256 internal constant POW_1_0001_2_5 = 1003204964963598017;
+    uint256 internal constant POW_1_0001_2_6 = 1006420201727613925;
+    uint256 internal constant POW_1_0001_2_7 = 1012881622445451107;
+    uint256 internal constant POW_1_0001_2_8 = 1025929181087729364;
+    uint256 internal constant POW_1_0001_2_9 = 1052530684607338990;
+    uint256 internal constant POW_1_0001_2_10 = 1107820842039993701;
+    uint256 internal constant POW_1_0001_2_11 = 1227267018058200675;
+    uint256 internal constant POW_1_0001_2_12 = 1506184333613467862;
+    uint256 internal constant POW_1_0001_2_13 = 2268591246822646254;
+    uint256 internal constant POW_1_0001_2_14 = 5146506245160328697;
+    uint256 internal constant POW_1_0001_2_15 = 26486526531474265306;
+    uint256 internal constant POW_1_0001_2_16 = 701536087702490175181;
+    uint256 internal constant POW_1_0001_2_17 = 492152882348915986798339;
+    uint256 internal constant POW_1_0001_2_18 = 242214459604345941079095349169;
+    uint256 internal constant POW_1_0001_2_19 = 58667844441425331699871928915548256592782;
+    uint256 internal constant POW_1_0001_2_20 = 3441915971403281190489005757534905832644049113869684997170708597;
+
     /*
     @notice Takes in a space & gives it's price based on 1.0001^space
-    @param space_ int space
-    @param negative_number if space is a negative number
+    @dev Multiplies the precomputed 1.0001^(2^i) of every set bit of |space| in ascending order, which is what
+         powu does after squaring, so results are identical to powu while the gas no longer depends on space
+    @param space_ int space, |space_| <= MAX_SPACE
     @returns price at space in uint256 60x18
     */
-    function get_price_from_space( int256 space_) internal pure returns(fMath.UD60x18 memory) {
+    function get_price_from_space( int256 space_) internal pure returns(fMath.UD60x18) {
         
-        uint256 _abs_space= get_abs_value(space_) ;
+        uint256 abs_space = get_abs_value(space_);
+        if (abs_space > MAX_SPACE) revert fMathPool__SpaceOutOfBounds(space_);
 
-        fMath.UD60x18 memory num_1_0001;
-        num_1_0001.value = 1000100000000000000;
+        uint256 result = abs_space & 0x1 != 0 ? POW_1_0001_2_0 : fMathUD60x18.SCALE;
+        if (abs_space & 0x2 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_1);
+        if (abs_space & 0x4 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_2);
+        if (abs_space & 0x8 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_3);
+        if (abs_space & 0x10 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_4);
+        if (abs_space & 0x20 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_5);
+        if (abs_space & 0x40 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_6);
+        if (abs_space & 0x80 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_7);
+        if (abs_space & 0x100 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_8);
+        if (abs_space & 0x200 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_9);
+        if (abs_space & 0x400 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_10);
+        if (abs_space & 0x800 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_11);
+        if (abs_space & 0x1000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_12);
+        if (abs_space & 0x2000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_13);
+        if (abs_space & 0x4000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_14);
+        if (abs_space & 0x8000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_15);
+        if (abs_space & 0x10000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_16);
+        if (abs_space & 0x20000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_17);
+        if (abs_space & 0x40000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_18);
+        if (abs_space & 0x80000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_19);
+        if (abs_space & 0x100000 != 0) result = fMath.mulDivFixedPoint(result, POW_1_0001_2_20);
 
-        fMath.UD60x18 memory result = fMathUD60x18.powu(num_1_0001,_abs_space);
-        if (bool(0>space_)) result = fMathUD60x18.div(fMathUD60x18.scale(), result);
-        return result;
+        if (space_ < 0) return fMathUD60x18.div(fMathUD60x18.scale(), fMath.UD60x18.wrap(result));
+        return fMath.UD60x18.wrap(result);
     }
 
     /*
@@ -43,9 +94,9 @@ library fMathPool {
 	@param y value 2
 	@return is_greater bool true if x > y
     */
-	function is_greater(fMath.UD60x18 memory x, fMath.UD60x18 memory y) internal pure returns(bool) {
-        uint x_replica = uint(x.value);
-        uint y_replica = uint(y.value);
+	function is_greater(fMath.UD60x18 x, fMath.UD60x18 y) internal pure returns(bool) {
+        uint x_replica = fMath.UD60x18.unwrap(x);
+        uint y_replica = fMath.UD60x18.unwrap(y);
         if (x_replica > y_replica) return true;
         else return false;
 	}
@@ -57,8 +108,8 @@ library fMathPool {
 	@param y value 2
 	@return is_greater bool true if x > y
     */
-	function is_greater_or_equal(fMath.UD60x18 memory x, fMath.UD60x18 memory y) internal pure returns(bool greater) {
-		return (x.value >= y.value);
+	function is_greater_or_equal(fMath.UD60x18 x, fMath.UD60x18 y) internal pure returns(bool greater) {
+		return (fMath.UD60x18.unwrap(x) >= fMath.UD60x18.unwrap(y));
 	}
 
     /* 
@@ -67,8 +118,8 @@ library fMathPool {
 	@param y value 2
 	@return is_greater bool true if x > y
     */
-	function is_equal(fMath.UD60x18 memory x, fMath.UD60x18 memory y) internal pure returns(bool greater) {
-		return (x.value == y.value); 
+	function is_equal(fMath.UD60x18 x, fMath.UD60x18 y) internal pure returns(bool greater) {
+		return (fMath.UD60x18.unwrap(x) == fMath.UD60x18.unwrap(y)); 
 	}
 
 
@@ -77,19 +128,56 @@ library fMathPool {
     @param number_ the number to convert
     @returns a uint256 as a 60x18
     */ 
-    function from_uint_to_60x18(uint256 number_) internal pure returns(fMath.UD60x18 memory) {
+    function from_uint_to_60x18(uint256 number_) internal pure returns(fMath.UD60x18) {
         return fMathUD60x18.fromUint( number_ );
     }
 
-    function from_base_to_60x18(uint256 number_) internal pure returns(fMath.UD60x18 memory) {
-        return fMathUD60x18.div(fMathUD60x18.fromUint( number_ ), fMathUD60x18.fromUint( 10**18 ));
+    /*
+    @notice converts an 18 decimal amount (e.g. wei) into a 60x18 number. This is the identity, so the value is
+            wrapped as is; the bound matches the one fromUint enforced when this went through div(fromUint, fromUint)
+    @param number_ the amount to convert
+    @returns the amount as a 60x18
+    */
+    function from_base_to_60x18(uint256 number_) internal pure returns(fMath.UD60x18) {
+        if (number_ > fMathUD60x18.MAX_UD60x18 / fMathUD60x18.SCALE) revert fMathUD60x18__FromUintOverflow(number_);
+        return fMath.UD60x18.wrap(number_);
     }
-	
-    function from_decimal_to_60x18(uint256 number_, uint decimals_) internal pure returns(fMath.UD60x18 memory) {
+
+    /*
+    @notice converts an amount with `decimals_` decimals into a 60x18 number, flooring extra decimals
+    @param number_ the amount to convert
+    @param decimals_ the decimals of the amount
+    @returns the amount as a 60x18
+    */
+    function from_decimal_to_60x18(uint256 number_, uint decimals_) internal pure returns(fMath.UD60x18) {
+        if (decimals_ == 18) return from_base_to_60x18(number_);
+        if (number_ > fMathUD60x18.MAX_UD60x18 / fMathUD60x18.SCALE) revert fMathUD60x18__FromUintOverflow(number_);
+        // Scaling up is exact, so it needs no mulDiv
+        if (decimals_ < 18) return fMath.UD60x18.wrap(number_ * 10**(18 - decimals_));
         return fMathUD60x18.div(fMathUD60x18.fromUint( number_ ), fMathUD60x18.fromUint( 10**decimals_ ));
     }
 
-    function to_uint(fMath.UD60x18 memory x) internal pure returns (uint){
-        return x.value;
+    /*
+    @notice converts an amount of a token with at most 18 decimals into a 60x18 number, given the token's
+            scale 10**(18 - decimals) (from_decimal_to_60x18(1, decimals), cached at registration). Exact
+    @param number_ the amount to convert
+    @param scale_ 10**(18 - decimals) of the token
+    @returns the amount as a 60x18
+    */
+    function from_scaled_to_60x18(uint256 number_, uint scale_) internal pure returns(fMath.UD60x18) {
+        if (number_ > fMathUD60x18.MAX_UD60x18 / fMathUD60x18.SCALE) revert fMathUD60x18__FromUintOverflow(number_);
+        return fMath.UD60x18.wrap(number_ * scale_);
+    }
+
+    /*
+    @notice converts a 60x18 number back into an amount of a token with the given scale, flooring the digits the
+            token cannot represent
+    */
+    function to_scaled(fMath.UD60x18 x, uint scale_) internal pure returns (uint) {
+        return fMath.UD60x18.unwrap(x) / scale_;
+    }
+
+    function to_uint(fMath.UD60x18 x) internal pure returns (uint){
+        return fMath.UD60x18.unwrap(x);
     }
 }
\ No newline at end of file
@@ -4,13 +4,14 @@
 		express permission of Fragmynt, Inc.
 */
 
-pragma solidity >=0.8.4;
+pragma solidity >=0.8.8;
 
 import "./fMath.sol";
 
 /// @title fMathUD60x18Typed
 /// credits Paul Razvan Berg
-/// @dev This is the same as fMathUD59x18, except that it works with structs instead of raw uint256s.
+/// @dev This is the same as fMathUD59x18, except that it works with the fMath.UD60x18 value type instead of raw
+/// uint256s. The type wraps a uint256 with no memory allocation, so wrap/unwrap cost nothing at runtime.
 library fMathUD60x18 {
     /// STORAGE ///
 
@@ -36,17 +37,19 @@ library fMathUD60x18 {
     /// @param x The first summand as an unsigned 60.18-decimal fixed-point number.
     /// @param y The second summand as an unsigned 60.18-decimal fixed-point number.
     /// @param result The sum as an unsigned 59.18 decimal fixed-point number.
-    function add(fMath.UD60x18 memory x, fMath.UD60x18 memory y)
+    function add(fMath.UD60x18 x, fMath.UD60x18 y)
         internal
         pure
-        returns (fMath.UD60x18 memory result)
+        returns (fMath.UD60x18 result)
     {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
+        uint256 yValue = fMath.UD60x18.unwrap(y);
         unchecked {
-            uint256 rValue = x.value + y.value;
-            if (rValue < x.value) {
-                revert fMathUD60x18__AddOverflow(x.value, y.value);
+            uint256 rValue = xValue + yValue;
+            if (rValue < xValue) {
+                revert fMathUD60x18__AddOverflow(xValue, yValue);
             }
-            result = fMath.UD60x18({ value: rValue });
+            result = fMath.UD60x18.wrap(rValue);
         }
     }
 
@@ -54,17 +57,19 @@ library fMathUD60x18 {
     /// @param x The first operand as an unsigned 60.18-decimal fixed-point number.
     /// @param y The second operand as an unsigned 60.18-decimal fixed-point number.
     /// @return result The arithmetic average as an unsigned 60.18-decimal fixed-point number.
-    function avg(fMath.UD60x18 memory x, fMath.UD60x18 memory y)
+    function avg(fMath.UD60x18 x, fMath.UD60x18 y)
         internal
         pure
-        returns (fMath.UD60x18 memory result)
+        returns (fMath.UD60x18 result)
     {
         // The operations can never overflow.
         unchecked {
             // The last operand checks if both x and y are odd and if that is the case, we add 1 to the result. We need
             // to do this because if both numbers are odd, the 0.5 remainder gets truncated twice.
-            uint256 rValue = (x.value >> 1) + (y.value >> 1) + (x.value & y.value & 1);
-            result = fMath.UD60x18({ value: rValue });
+            uint256 xValue = fMath.UD60x18.unwrap(x);
+            uint256 yValue = fMath.UD60x18.unwrap(y);
+            uint256 rValue = (xValue >> 1) + (yValue >> 1) + (xValue & yValue & 1);
+            result = fMath.UD60x18.wrap(rValue);
         }
     }
 
@@ -78,8 +83,8 @@ library fMathUD60x18 {
     ///
     /// @param x The unsigned 60.18-decimal fixed-point number to ceil.
     /// @param result The least integer greater than or equal to x, as an unsigned 60.18-decimal fixed-point number.
-    function ceil(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
-        uint256 xValue = x.value;
+    function ceil(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
         if (xValue > MAX_WHOLE_UD60x18) {
             revert fMathUD60x18__CeilOverflow(xValue);
         }
@@ -95,7 +100,7 @@ library fMathUD60x18 {
             // Equivalent to "x + delta * (remainder > 0 ? 1 : 0)" but faster.
             rValue := add(xValue, mul(delta, gt(remainder, 0)))
         }
-        result = fMath.UD60x18({ value: rValue });
+        result = fMath.UD60x18.wrap(rValue);
     }
 
     /// @notice Divides two unsigned 60.18-decimal fixed-point numbers, returning a new unsigned 60.18-decimal fixed-point number.
@@ -108,18 +113,18 @@ library fMathUD60x18 {
     /// @param x The numerator as an unsigned 60.18-decimal fixed-point number.
     /// @param y The denominator as an unsigned 60.18-decimal fixed-point number.
     /// @param result The quotient as an unsigned 60.18-decimal fixed-point number.
-    function div(fMath.UD60x18 memory x, fMath.UD60x18 memory y)
+    function div(fMath.UD60x18 x, fMath.UD60x18 y)
         internal
         pure
-        returns (fMath.UD60x18 memory result)
+        returns (fMath.UD60x18 result)
     {
-        result = fMath.UD60x18({ value: fMath.mulDiv(x.value, SCALE, y.value) });
+        result = fMath.UD60x18.wrap(fMath.mulDiv(fMath.UD60x18.unwrap(x), SCALE, fMath.UD60x18.unwrap(y)));
     }
 
     /// @notice Returns Euler's number as an unsigned 60.18-decimal fixed-point number.
     /// @dev See https://en.wikipedia.org/wiki/E_(mathematical_constant).
-    function e() internal pure returns (fMath.UD60x18 memory result) {
-        result = fMath.UD60x18({ value: 2_718281828459045235 });
+    function e() internal pure returns (fMath.UD60x18 result) {
+        result = fMath.UD60x18.wrap(2_718281828459045235);
     }
 
     /// @notice Calculates the natural exponent of x.
@@ -132,8 +137,8 @@ library fMathUD60x18 {
     ///
     /// @param x The exponent as an unsigned 60.18-decimal fixed-point number.
     /// @return result The result as an unsigned 60.18-decimal fixed-point number.
-    function exp(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
-        uint256 xValue = x.value;
+    function exp(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
 
         // Without this check, the value passed to "exp2" would be greater than 192.
         if (xValue >= 133_084258667509499441) {
@@ -142,8 +147,8 @@ library fMathUD60x18 {
 
         // Do the fixed-point multiplication inline to save gas.
         unchecked {
-            uint256 doubleScaleProduct = x.value * LOG2_E;
-            fMath.UD60x18 memory exponent = fMath.UD60x18({ value: (doubleScaleProduct + HALF_SCALE) / SCALE });
+            uint256 doubleScaleProduct = xValue * LOG2_E;
+            fMath.UD60x18 exponent = fMath.UD60x18.wrap((doubleScaleProduct + HALF_SCALE) / SCALE);
             result = exp2(exponent);
         }
     }
@@ -158,18 +163,19 @@ library fMathUD60x18 {
     ///
     /// @param x The exponent as an unsigned 60.18-decimal fixed-point number.
     /// @return result The result as an unsigned 60.18-decimal fixed-point number.
-    function exp2(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
+    function exp2(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
         // 2^192 doesn't fit within the 192.64-bit format used internally in this function.
-        if (x.value >= 192e18) {
-            revert fMathUD60x18__Exp2InputTooBig(x.value);
+        uint256 xValue = fMath.UD60x18.unwrap(x);
+        if (xValue >= 192e18) {
+            revert fMathUD60x18__Exp2InputTooBig(xValue);
         }
 
         unchecked {
             // Convert x to the 192.64-bit fixed-point format.
-            uint256 x192x64 = (x.value << 64) / SCALE;
+            uint256 x192x64 = (xValue << 64) / SCALE;
 
             // Pass x to the fMath.exp2 function, which uses the 192.64-bit fixed-point number representation.
-            result = fMath.UD60x18({ value: fMath.exp2(x192x64) });
+            result = fMath.UD60x18.wrap(fMath.exp2(x192x64));
         }
     }
 
@@ -178,8 +184,8 @@ library fMathUD60x18 {
     /// See https://en.wikipedia.org/wiki/Floor_and_ceiling_functions.
     /// @param x The unsigned 60.18-decimal fixed-point number to floor.
     /// @param result The greatest integer less than or equal to x, as an unsigned 60.18-decimal fixed-point number.
-    function floor(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
-        uint256 xValue = x.value;
+    function floor(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
         uint256 rValue;
         assembly {
             // Equivalent to "x % SCALE" but faster.
@@ -188,20 +194,20 @@ library fMathUD60x18 {
             // Equivalent to "x - remainder * (remainder > 0 ? 1 : 0)" but faster.
             rValue := sub(xValue, mul(remainder, gt(remainder, 0)))
         }
-        result = fMath.UD60x18({ value: rValue });
+        result = fMath.UD60x18.wrap(rValue);
     }
 
     /// @notice Yields the excess beyond the floor of x.
     /// @dev Based on the odd function definition https://en.wikipedia.org/wiki/Fractional_part.
     /// @param x The unsigned 60.18-decimal fixed-point number to get the fractional part of.
     /// @param result The fractional part of x as an unsigned 60.18-decimal fixed-point number.
-    function frac(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
-        uint256 xValue = x.value;
+    function frac(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
         uint256 rValue;
         assembly {
             rValue := mod(xValue, SCALE)
         }
-        result = fMath.UD60x18({ value: rValue });
+        result = fMath.UD60x18.wrap(rValue);
     }
 
     /// @notice Converts a number from basic integer form to unsigned 60.18-decimal fixed-point representation.
@@ -211,12 +217,12 @@ library fMathUD60x18 {
     ///
     /// @param x The basic integer to convert.
     /// @param result The same number in unsigned 60.18-decimal fixed-point representation.
-    function fromUint(uint256 x) internal pure returns (fMath.UD60x18 memory result) {
+    function fromUint(uint256 x) internal pure returns (fMath.UD60x18 result) {
         unchecked {
             if (x > MAX_UD60x18 / SCALE) {
                 revert fMathUD60x18__FromUintOverflow(x);
             }
-            result = fMath.UD60x18({ value: x * SCALE });
+            result = fMath.UD60x18.wrap(x * SCALE);
         }
     }
 
@@ -228,25 +234,27 @@ library fMathUD60x18 {
     /// @param x The first operand as an unsigned 60.18-decimal fixed-point number.
     /// @param y The second operand as an unsigned 60.18-decimal fixed-point number.
     /// @return result The result as an unsigned 60.18-decimal fixed-point number.
-    function gm(fMath.UD60x18 memory x, fMath.UD60x18 memory y)
+    function gm(fMath.UD60x18 x, fMath.UD60x18 y)
         internal
         pure
-        returns (fMath.UD60x18 memory result)
+        returns (fMath.UD60x18 result)
     {
-        if (x.value == 0) {
-            return fMath.UD60x18({ value: 0 });
+        uint256 xValue = fMath.UD60x18.unwrap(x);
+        uint256 yValue = fMath.UD60x18.unwrap(y);
+        if (xValue == 0) {
+            return fMath.UD60x18.wrap(0);
         }
 
         unchecked {
             // Checking for overflow this way is faster than letting Solidity do it.
-            uint256 xy = x.value * y.value;
-            if (xy / x.value != y.value) {
-                revert fMathUD60x18__GmOverflow(x.value, y.value);
+            uint256 xy = xValue * yValue;
+            if (xy / xValue != yValue) {
+                revert fMathUD60x18__GmOverflow(xValue, yValue);
             }
 
             // We don't need to multiply by the SCALE here because the x*y product had already picked up a factor of SCALE
             // during multiplication. See the comments within the "sqrt" function.
-            result = fMath.UD60x18({ value: fMath.sqrt(xy) });
+            result = fMath.UD60x18.wrap(fMath.sqrt(xy));
         }
     }
 
@@ -257,10 +265,10 @@ library fMathUD60x18 {
     ///
     /// @param x The unsigned 60.18-decimal fixed-point number for which to calculate the inverse.
     /// @return result The inverse as an unsigned 60.18-decimal fixed-point number.
-    function inv(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
+    function inv(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
         unchecked {
             // 1e36 is SCALE * SCALE.
-            result = fMath.UD60x18({ value: 1e36 / x.value });
+            result = fMath.UD60x18.wrap(1e36 / fMath.UD60x18.unwrap(x));
         }
     }
 
@@ -277,12 +285,12 @@ library fMathUD60x18 {
     ///
     /// @param x The unsigned 60.18-decimal fixed-point number for which to calculate the natural logarithm.
     /// @return result The natural logarithm as an unsigned 60.18-decimal fixed-point number.
-    function ln(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
+    function ln(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
         // Do the fixed-point multiplication inline to save gas. This is overflow-safe because the maximum value that log2(x)
         // can return is 196205294292027477728.
         unchecked {
-            uint256 rValue = (log2(x).value * SCALE) / LOG2_E;
-            result = fMath.UD60x18({ value: rValue });
+            uint256 rValue = (fMath.UD60x18.unwrap(log2(x)) * SCALE) / LOG2_E;
+            result = fMath.UD60x18.wrap(rValue);
         }
     }
 
@@ -299,8 +307,8 @@ library fMathUD60x18 {
     ///
     /// @param x The unsigned 60.18-decimal fixed-point number for which to calculate the common logarithm.
     /// @return result The common logarithm as an unsigned 60.18-decimal fixed-point number.
-    function log10(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
-        uint256 xValue = x.value;
+    function log10(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
         if (xValue < SCALE) {
             revert fMathUD60x18__LogInputTooSmall(xValue);
         }
@@ -396,12 +404,12 @@ library fMathUD60x18 {
         }
 
         if (rValue != MAX_UD60x18) {
-            result = fMath.UD60x18({ value: rValue });
+            result = fMath.UD60x18.wrap(rValue);
         } else {
             // Do the fixed-point division inline to save gas. The denominator is log2(10).
             unchecked {
-                rValue = (log2(x).value * SCALE) / 3_321928094887362347;
-                result = fMath.UD60x18({ value: rValue });
+                rValue = (fMath.UD60x18.unwrap(log2(x)) * SCALE) / 3_321928094887362347;
+                result = fMath.UD60x18.wrap(rValue);
             }
         }
     }
@@ -419,8 +427,8 @@ library fMathUD60x18 {
     ///
     /// @param x The unsigned 60.18-decimal fixed-point number for which to calculate the binary logarithm.
     /// @return result The binary logarithm as an unsigned 60.18-decimal fixed-point number.
-    function log2(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
-        uint256 xValue = x.value;
+    function log2(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
         if (xValue < SCALE) {
             revert fMathUD60x18__LogInputTooSmall(xValue);
         }
@@ -437,7 +445,7 @@ library fMathUD60x18 {
 
             // If y = 1, the fractional part is zero.
             if (y == SCALE) {
-                return fMath.UD60x18({ value: rValue });
+                return fMath.UD60x18.wrap(rValue);
             }
 
             // Calculate the fractional part via the iterative approximation.
@@ -454,7 +462,7 @@ library fMathUD60x18 {
                     y >>= 1;
                 }
             }
-            result = fMath.UD60x18({ value: rValue });
+            result = fMath.UD60x18.wrap(rValue);
         }
     }
 
@@ -464,17 +472,17 @@ library fMathUD60x18 {
     /// @param x The multiplicand as an unsigned 60.18-decimal fixed-point number.
     /// @param y The multiplier as an unsigned 60.18-decimal fixed-point number.
     /// @return result The product as an unsigned 60.18-decimal fixed-point number.
-    function mul(fMath.UD60x18 memory x, fMath.UD60x18 memory y)
+    function mul(fMath.UD60x18 x, fMath.UD60x18 y)
         internal
         pure
-        returns (fMath.UD60x18 memory result)
+        returns (fMath.UD60x18 result)
     {
-        result = fMath.UD60x18({ value: fMath.mulDivFixedPoint(x.value, y.value) });
+        result = fMath.UD60x18.wrap(fMath.mulDivFixedPoint(fMath.UD60x18.unwrap(x), fMath.UD60x18.unwrap(y)));
     }
 
     /// @notice Returns PI as an unsigned 60.18-decimal fixed-point number.
-    function pi() internal pure returns (fMath.UD60x18 memory result) {
-        result = fMath.UD60x18({ value: 3_141592653589793238 });
+    function pi() internal pure returns (fMath.UD60x18 result) {
+        result = fMath.UD60x18.wrap(3_141592653589793238);
     }
 
     /// @notice Raises x to the power of y.
@@ -491,13 +499,13 @@ library fMathUD60x18 {
     /// @param x Number to raise to given power y, as an unsigned 60.18-decimal fixed-point number.
     /// @param y Exponent to raise x to, as an unsigned 60.18-decimal fixed-point number.
     /// @return result x raised to power y, as an unsigned 60.18-decimal fixed-point number.
-    function pow(fMath.UD60x18 memory x, fMath.UD60x18 memory y)
+    function pow(fMath.UD60x18 x, fMath.UD60x18 y)
         internal
         pure
-        returns (fMath.UD60x18 memory result)
+        returns (fMath.UD60x18 result)
     {
-        if (x.value == 0) {
-            return fMath.UD60x18({ value: y.value == 0 ? SCALE : uint256(0) });
+        if (fMath.UD60x18.unwrap(x) == 0) {
+            return fMath.UD60x18.wrap(fMath.UD60x18.unwrap(y) == 0 ? SCALE : uint256(0));
         } else {
             result = exp2(mul(log2(x), y));
         }
@@ -518,9 +526,9 @@ library fMathUD60x18 {
     /// @param x The base as an unsigned 60.18-decimal fixed-point number.
     /// @param y The exponent as an uint256.
     /// @return result The result as an unsigned 60.18-decimal fixed-point number.
-    function powu(fMath.UD60x18 memory x, uint256 y) internal pure returns (fMath.UD60x18 memory result) {
+    function powu(fMath.UD60x18 x, uint256 y) internal pure returns (fMath.UD60x18 result) {
         // Calculate the first iteration of the loop in advance.
-        uint256 xValue = x.value;
+        uint256 xValue = fMath.UD60x18.unwrap(x);
         uint256 rValue = y & 1 > 0 ? xValue : SCALE;
 
         // Equivalent to "for(y /= 2; y > 0; y /= 2)" but faster.
@@ -532,12 +540,12 @@ library fMathUD60x18 {
                 rValue = fMath.mulDivFixedPoint(rValue, xValue);
             }
         }
-        result = fMath.UD60x18({ value: rValue });
+        result = fMath.UD60x18.wrap(rValue);
     }
 
     /// @notice Returns 1 as an unsigned 60.18-decimal fixed-point number.
-    function scale() internal pure returns (fMath.UD60x18 memory result) {
-        result = fMath.UD60x18({ value: SCALE });
+    function scale() internal pure returns (fMath.UD60x18 result) {
+        result = fMath.UD60x18.wrap(SCALE);
     }
 
     /// @notice Calculates the square root of x, rounding down.
@@ -548,14 +556,15 @@ library fMathUD60x18 {
     ///
     /// @param x The unsigned 60.18-decimal fixed-point number for which to calculate the square root.
     /// @return result The result as an unsigned 60.18-decimal fixed-point .
-    function sqrt(fMath.UD60x18 memory x) internal pure returns (fMath.UD60x18 memory result) {
+    function sqrt(fMath.UD60x18 x) internal pure returns (fMath.UD60x18 result) {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
         unchecked {
-            if (x.value > MAX_UD60x18 / SCALE) {
-                revert fMathUD60x18__SqrtOverflow(x.value);
+            if (xValue > MAX_UD60x18 / SCALE) {
+                revert fMathUD60x18__SqrtOverflow(xValue);
             }
             // Multiply x by the SCALE to account for the factor of SCALE that is picked up when multiplying two unsigned
             // 60.18-decimal fixed-point numbers together (in this case, those two numbers are both the square root).
-            result = fMath.UD60x18({ value: fMath.sqrt(x.value * SCALE) });
+            result = fMath.UD60x18.wrap(fMath.sqrt(xValue * SCALE));
         }
     }
 
@@ -564,25 +573,27 @@ library fMathUD60x18 {
     /// @param x The minuend as an unsigned 60.18-decimal fixed-point number.
     /// @param y The subtrahend as an unsigned 60.18-decimal fixed-point number.
     /// @param result The difference as an unsigned 60.18 decimal fixed-point number.
-    function sub(fMath.UD60x18 memory x, fMath.UD60x18 memory y)
+    function sub(fMath.UD60x18 x, fMath.UD60x18 y)
         internal
         pure
-        returns (fMath.UD60x18 memory result)
+        returns (fMath.UD60x18 result)
     {
+        uint256 xValue = fMath.UD60x18.unwrap(x);
+        uint256 yValue = fMath.UD60x18.unwrap(y);
         unchecked {
-            if (x.value < y.value) {
-                revert fMathUD60x18__SubUnderflow(x.value, y.value);
+            if (xValue < yValue) {
+                revert fMathUD60x18__SubUnderflow(xValue, yValue);
             }
-            result = fMath.UD60x18({ value: x.value - y.value });
+            result = fMath.UD60x18.wrap(xValue - yValue);
         }
     }
 
     /// @notice Converts a unsigned 60.18-decimal fixed-point number to basic integer form, rounding down in the process.
     /// @param x The unsigned 60.18-decimal fixed-point number to convert.
     /// @return result The same number in basic integer form.
-    function toUint(fMath.UD60x18 memory x) internal pure returns (uint256 result) {
+    function toUint(fMath.UD60x18 x) internal pure returns (uint256 result) {
         unchecked {
-            result = x.value / SCALE;
+            result = fMath.UD60x18.unwrap(x) / SCALE;
         }
     }
 }
\ No newline at end of file
@@ -0,0 +1,6 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.4;
+
+//Compiled for scripts/deploy.py, which puts networkETF behind a transparent proxy owned by a ProxyAdmin
+import {ProxyAdmin} from "../../../node_modules/@openzeppelin/contracts/proxy/transparent/ProxyAdmin.sol";
+import {TransparentUpgradeableProxy} from "../../../node_modules/@openzeppelin/contracts/proxy/transparent/TransparentUpgradeableProxy.sol";
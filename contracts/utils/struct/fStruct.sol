@@ -5,6 +5,7 @@ import {fMath, fMathUD60x18, fMathPool} from "../math/fMathPool.sol";
 
 library nETFStructs {
     
+    //v1 layout: only kept so that upgraded proxies can migrate out of it
     struct nETFToken {
         fMath.UD60x18 deposit;
         uint lastUpdated;
@@ -38,4 +39,80 @@ library nETFStructs {
         mapping(address => uint) tokenLastUpdated;
     }
 
-}
\ No newline at end of file
+    //Packed user data: the bond, its timestamp & the MYNT allocation epoch share one slot
+    //Epochs are block.timestamp / cyclePeriod (networkETF.currentEpoch), so uint32 lasts until 2106 at least
+    struct nETFUser {
+        uint128 deposit;
+        uint64 lastUpdated;
+
+        //Epoch of the user's last allocation of each asset, checked by every calibration
+        uint32 myntAllocatedEpoch;
+        mapping(address => uint32) tokenAllocatedEpoch;
+    }
+
+    //Packed asset data (MYNT or a token): balance, bonds used in the cycle & its epoch share one slot
+    //Bonds never exceed myntDeposited, so uint96 is enough; bondsUsed only counts while epoch is current
+    struct nETFAsset {
+        uint128 balance;
+        uint96 bondsUsed;
+        uint32 epoch;
+    }
+
+    struct nPackedFundManager {
+        //Read by every calibration & written by every deposit/withdraw, so kept in one slot
+        uint64 cyclePeriod;
+        uint64 cycleLength;
+        uint96 myntDeposited;
+        uint32 totalTokensAvailable;
+
+        mapping(address => nETFUser) users;
+
+        //This mynt balance is as received from other contracts for the current cycle
+        nETFAsset mynt;
+        mapping(address => nETFAsset) tokens;
+
+        //This is for contract utility
+        mapping(uint => address) tokenNumberToAddress;
+        mapping(address => bool) tokenExists;
+    }
+
+    //Cached when a token is registered, so submissions & calibrations make no decimals() call
+    //Tokens registered before (which had to have 18 decimals) have none & use a scale of 1
+    struct nTokenMetadata {
+        uint8 decimals;
+        uint64 scale; //10**(18 - decimals): amounts are kept as 60x18 & transferred in token units
+    }
+
+    //Bonds (60x18) from a timestamp on, in the style of ERC20Votes checkpoints; one slot each
+    //A new checkpoint is pushed per second with changes, so lookups binary search by timestamp
+    struct nCheckpoint {
+        uint64 timestamp;
+        uint128 bonds;
+    }
+
+    enum DISTRIBUTION {CYCLE, ACCUMULATOR}
+
+    //Reward per bond distribution: submissions raise the asset's index & users accrue bonds * index growth
+    //Assets are token addresses, MYNT is address(0)
+    struct nAccumulator {
+        DISTRIBUTION mode;
+        mapping(address => uint) rewardPerBond;
+        mapping(address => mapping(address => uint)) rewardPerBondPaid;
+        mapping(address => mapping(address => uint)) accrued;
+    }
+
+    //Allocations of a token published by the operator as a Merkle root & claimed with proofs
+    struct nMerkleDistribution {
+        address token;
+        uint64 cycle;
+        uint128 remaining;
+        bytes32 root;
+        mapping(uint => uint) claimed; //Bitmap of claimed leaf indices, 256 per word
+    }
+
+    struct nMerkleDistributor {
+        uint totalDistributions;
+        mapping(uint => nMerkleDistribution) distributions;
+    }
+
+}
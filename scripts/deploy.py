@@ -1,17 +1,30 @@
-from brownie import Token, networkETF, Contract
+from brownie import Token, networkETF, networkETFFactory, ProxyAdmin, TransparentUpgradeableProxy, Contract, network, web3
 from scripts.utils import  encode_function_data, get_account
-import time
+from collections import namedtuple
+import json, os, time
 
-# Get deployment account & transacting account
-deployment_owner_account = get_account(1)
-test_account = get_account(0)
+# Deploys & upgrades from a manifest per network, reusing whatever did not change:
+#   brownie run scripts/deploy.py main --network goerli                       factory, proxy & a new ETF clone
+#   brownie run scripts/deploy.py main true --network mainnet-fork            dry run against mainnet's manifest
+#   brownie run scripts/deploy.py release_networks false goerli,mainnet       the factory & proxy on several networks
+
+# deployments/<network>.json: every deployed bytecode by hash & the proxies
+DEPLOYMENTS_DIR = "deployments"
+
+CYCLE_PERIOD = 24*60*60
+CYCLE_LENGTH = 60*60
+INITIAL_BOND = 10**18
+GAS_BUFFER = 1.2
+
+# One transaction: estimated from (to, value, data), sent by send(gas_limit) & recorded by done(receipt)
+Step = namedtuple("Step", ["description", "to", "value", "data", "send", "done"])
 
 
 def deploy_token(deployment_account):
     deployed_token = Token.deploy(
         {"from": deployment_account}
     )
-    
+
     print("Token deployed...")
     print("Token: ", deployed_token.address)
     print("\n")
@@ -22,45 +35,225 @@ def deploy_etf(deployment_account):
     deployed_etf = networkETF.deploy(
         {"from": deployment_account}
     )
-    deployed_etf.initialize(24*60*60, 60*60, {"from": deployment_account, "value": 10**18})
-    
+    deployed_etf.initialize(CYCLE_PERIOD, CYCLE_LENGTH, {"from": deployment_account, "value": INITIAL_BOND})
+
     print("ETF deployed...")
     print("ETF: ", deployed_etf.address)
     print("\n")
 
     return deployed_etf
-    pass
 
-def deploy_etf_proxy(deployment_account):
 
-    #Step 1: Deploy etf
-    deployed_etf = deploy_etf(deployment_account)
+def load_deployments(path):
+    deployments = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            deployments = json.load(f)
+    deployments.setdefault("contracts", {})
+    deployments.setdefault("proxies", {})
+    return deployments
 
-    #Step  2: Deploy the admin proxy
-    proxy_admin = ProxyAdmin.deploy(
-       {"from": deployment_account}
-    )
+def save_deployments(deployments, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(deployments, f, indent=2, sort_keys=True)
+        f.write("\n")
 
-    #Step 2: Deploy etf proxy
-    etf_proxy = TransparentUpgradeableProxy.deploy(
-        deployed_etf.address,
-        proxy_admin.address,
-        encode_function_data(deployed_etf.initialize, 86400, 3600, 100),
-        {"from": deployment_account}
-    )
+def bytecode_hash(container):
+    return web3.keccak(hexstr=container.bytecode).hex()
 
-    etf_proxy = Contract.from_abi("etf", etf_proxy.address, deployed_etf.abi)
+def manifest_path(network_name=None):
+    """deployments/<network>.json; a fork (e.g. mainnet-fork) reads the manifest of the network it forks."""
+    network_name = network_name or network.show_active()
+    if network_name.endswith("-fork"):
+        network_name = network_name[:-len("-fork")]
+    return os.path.join(DEPLOYMENTS_DIR, f"{network_name}.json")
 
-    print("Proxies deployed...")
-    print("Admin Proxy: ", proxy_admin.address)
-    print("ETF Proxy: ", etf_proxy.address)
-    print("\n")
 
+class DeploymentPipeline:
+    """Deploys & upgrades the contracts of the active network from its manifest.
+
+    Contracts are recorded by bytecode hash, so unchanged contracts are reused & rolling back reuses the earlier
+    deployment. Each stage of independent transactions is gas estimated, checked against the account balance,
+    then sent at once & confirmed together. A dry run needs a local network (usually a fork): it goes through
+    every step there & reports the gas without writing the manifest.
+    """
+
+    def __init__(self, account, path=None, dry_run=False, required_confs=1):
+        if dry_run and not network.rpc.is_active():
+            raise Exception("Dry runs need a local network, e.g. --network mainnet-fork")
+        self.account = account
+        self.path = path or manifest_path()
+        self.dry_run = dry_run
+        self.required_confs = required_confs
+        self.manifest = load_deployments(self.path)
+        self.transactions = 0
+        self.gas_used = 0
+
+    ############################################################################
+    # Steps
+
+    def existing(self, container):
+        """The deployment of `container`'s current bytecode, or None."""
+        address = self.manifest["contracts"].get(container._name, {}).get(bytecode_hash(container))
+        if address is None or len(web3.eth.get_code(address)) == 0:
+            return None
+        return Contract.from_abi(container._name, address, container.abi)
+
+    def deploy_step(self, container, *args, value=0, done=None):
+        def send(gas_limit):
+            return self.account.deploy(container, *args, amount=value, gas_limit=gas_limit, required_confs=0)
+
+        def record(receipt):
+            self.manifest["contracts"].setdefault(container._name, {})[bytecode_hash(container)] = receipt.contract_address
+
+        return Step(f"deploy {container._name}", None, value, container.deploy.encode_input(*args), send, done or record)
+
+    def call_step(self, fn, *args, value=0, done=None):
+        def send(gas_limit):
+            return fn(*args, {"from": self.account, "value": value, "gas_limit": gas_limit, "required_confs": 0})
+
+        return Step(fn._name, fn._address, value, fn.encode_input(*args), send, done or (lambda receipt: None))
+
+    def run_stage(self, steps):
+        """Estimates, sends & confirms independent steps; nothing is sent if an estimate fails or funds are short."""
+        if not steps:
+            return []
+
+        gas_price = web3.eth.gas_price
+        estimates = [self.account.estimate_gas(step.to, step.value, data=step.data) for step in steps]
+        for step, gas in zip(steps, estimates):
+            print(f"  {step.description:<48}{gas:>10} gas  ~{gas * gas_price / 10**18:.5f} ETH")
+
+        cost = sum(estimates) * gas_price + sum(step.value for step in steps)
+        if self.account.balance() < cost:
+            raise Exception(f"{self.account} holds {self.account.balance()} wei, the stage needs ~{cost}")
+
+        # Nonces are assigned in order, so every transaction of the stage is pending at once
+        sent = [step.send(int(gas * GAS_BUFFER)) for step, gas in zip(steps, estimates)]
+        receipts = []
+        for step, result in zip(steps, sent):
+            receipt = getattr(result, "tx", result)
+            receipt.wait(self.required_confs)
+            if receipt.status != 1:
+                raise Exception(f"{step.description} reverted: {receipt.txid}")
+            step.done(receipt)
+            receipts.append(receipt)
+            self.transactions += 1
+            self.gas_used += receipt.gas_used
+        return receipts
+
+    def save(self):
+        if not self.dry_run:
+            save_deployments(self.manifest, self.path)
+
+    ############################################################################
+    # Releases
+
+    def release(self, factory=True, proxy=True, initial_bond=INITIAL_BOND, cycle_period=CYCLE_PERIOD, cycle_length=CYCLE_LENGTH):
+        """Brings the factory and/or the ETF proxy to the current networkETF bytecode.
+
+        Stage 1 deploys the implementation & a ProxyAdmin if missing; stage 2 deploys the factory or points it at
+        the implementation, & deploys the proxy or upgrades it. Returns (factory, proxy), None for those not asked.
+        """
+        record = self.manifest["proxies"].get("networkETF") if proxy else None
+        if record and len(web3.eth.get_code(record["address"])) == 0:
+            record = None
+
+        stage = []
+        if self.existing(networkETF) is None:
+            stage.append(self.deploy_step(networkETF))
+        if proxy and record is None and self.existing(ProxyAdmin) is None:
+            stage.append(self.deploy_step(ProxyAdmin))
+        self.run_stage(stage)
+        implementation = self.existing(networkETF)
+
+        stage = []
+        factory_contract = self.existing(networkETFFactory) if factory else None
+        if factory and factory_contract is None:
+            stage.append(self.deploy_step(networkETFFactory, implementation))
+        elif factory and factory_contract.implementation() != implementation.address:
+            stage.append(self.call_step(factory_contract.setImplementation, implementation))
+
+        if proxy and record is None:
+            admin = self.existing(ProxyAdmin)
+            initializer = encode_function_data(implementation.initialize, cycle_period, cycle_length)
+
+            def record_proxy(receipt):
+                self.manifest["proxies"]["networkETF"] = {"address": receipt.contract_address, "admin": admin.address}
+
+            stage.append(self.deploy_step(TransparentUpgradeableProxy, implementation, admin, initializer, value=initial_bond, done=record_proxy))
+        elif proxy:
+            admin = Contract.from_abi("ProxyAdmin", record["admin"], ProxyAdmin.abi)
+            if admin.getProxyImplementation(record["address"]) != implementation.address:
+                stage.append(self.call_step(admin.upgrade, record["address"], implementation))
+        self.run_stage(stage)
+
+        self.save()
+        if factory:
+            factory_contract = self.existing(networkETFFactory)
+        proxy_contract = None
+        if proxy:
+            proxy_contract = Contract.from_abi("networkETF", self.manifest["proxies"]["networkETF"]["address"], networkETF.abi)
+        return factory_contract, proxy_contract
+
+    def report(self):
+        gas_price = web3.eth.gas_price
+        mode = "Dry run" if self.dry_run else "Release"
+        print(f"{mode} on {network.show_active()}: {self.transactions} transactions, {self.gas_used} gas, "
+              f"~{self.gas_used * gas_price / 10**18:.5f} ETH at the current gas price")
+        if self.dry_run:
+            print("Manifest not written:", self.path)
+
+
+def deploy_factory(deployment_account, path=None, dry_run=False):
+    """The ETF factory of this network, pointing at the current networkETF implementation."""
+    factory, _ = DeploymentPipeline(deployment_account, path, dry_run).release(proxy=False)
+    return factory
+
+def deploy_etf_proxy(deployment_account, path=None, dry_run=False):
+    """The upgradeable ETF of this network & its ProxyAdmin, upgraded to the current implementation if needed."""
+    pipeline = DeploymentPipeline(deployment_account, path, dry_run)
+    _, etf_proxy = pipeline.release(factory=False)
+    proxy_admin = Contract.from_abi("ProxyAdmin", pipeline.manifest["proxies"]["networkETF"]["admin"], ProxyAdmin.abi)
     return etf_proxy, proxy_admin
 
+def create_etf(deployment_account, factory, salt, cycle_period=CYCLE_PERIOD, cycle_length=CYCLE_LENGTH, value=INITIAL_BOND):
+    """Deploys & initializes an ETF clone in one transaction; `salt` is bytes32 or a string to hash."""
+    if isinstance(salt, str):
+        salt = web3.keccak(text=salt)
+    tx = factory.createETF(salt, cycle_period, cycle_length, {"from": deployment_account, "value": value})
+    etf = Contract.from_abi("networkETF", tx.events["InstanceCreated"]["instance"], networkETF.abi)
+
+    print("ETF deployed...")
+    print("ETF: ", etf.address)
+    print("\n")
+
+    return etf
 
-def main():
+
+def release_networks(dry_run="false", networks=None):
+    """Releases the factory & the ETF proxy on each network in turn (comma separated; default: the active one)."""
+    dry_run = str(dry_run).lower() == "true"
+    for name in (networks.split(",") if networks else [network.show_active()]):
+        if name != network.show_active():
+            network.disconnect()
+            network.connect(name)
+        print("Network: ", name)
+
+        pipeline = DeploymentPipeline(get_account(1), dry_run=dry_run)
+        pipeline.release()
+        pipeline.report()
+
+
+def main(dry_run="false", salt=None):
+    dry_run = str(dry_run).lower() == "true"
+    deployment_owner_account = get_account(1)
+    print("Network: ", network.show_active())
     print("Deployed by: ", deployment_owner_account)
-    etf = deploy_etf(deployment_owner_account)
-    time.sleep(1)
-    pass
\ No newline at end of file
+
+    pipeline = DeploymentPipeline(deployment_owner_account, dry_run=dry_run)
+    factory, _ = pipeline.release()
+    etf = create_etf(deployment_owner_account, factory, salt or f"networkETF-{int(time.time())}")
+    pipeline.report()
+    return etf
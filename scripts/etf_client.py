@@ -0,0 +1,163 @@
+from brownie import web3, Multicall3, Contract
+from scripts.utils import decode_etf_error
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio, time
+
+# Read-through client for networkETF views: concurrent calls are batched into Multicall3 requests &
+# results are cached per block.
+#
+#   client = ETFClient(etf)
+#   deposit, last_updated = await client.call("getUserData", user)
+#   balances = await asyncio.gather(*(client.call("getTokenBalance", t) for t in tokens))
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+class CallFailed(Exception):
+    """A view reverted inside the multicall; `reason` is decoded like the contract's revert strings."""
+
+    def __init__(self, fn_name, args, reason):
+        super().__init__(f"{fn_name}{tuple(args)} reverted: {reason}")
+        self.fn_name = fn_name
+        self.args = args
+        self.reason = reason
+
+
+class BlockCache:
+    """LRU of view results keyed by (block number, function, arguments)."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        value = self._entries.pop(key)
+        self._entries[key] = value
+        return value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ETFClient:
+
+    def __init__(self, etf, multicall=None, cache_size=100_000, batch_size=500, block_ttl=1.0, workers=4):
+        self.etf = etf
+        self.multicall = multicall or Contract.from_abi("Multicall3", MULTICALL3_ADDRESS, Multicall3.abi)
+        self.cache = BlockCache(cache_size)
+        self.batch_size = batch_size
+        self.block_ttl = block_ttl
+        self.stats = {"calls": 0, "cache_hits": 0, "rpc_calls": 0, "multicalls": 0}
+
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = []
+        self._flush_task = None
+        self._latest = (None, 0)
+
+    ############################################################################
+    # Public interface
+
+    async def call(self, fn_name, *args, block=None):
+        """Result of the view at `block` (default: latest), from the cache or the next multicall."""
+        self.stats["calls"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((fn_name, args, block, future))
+
+        # Calls made before the event loop gets back to the flush end up in the same batch
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush())
+        return await future
+
+    async def many(self, calls, block=None):
+        """Results of [(fn_name, args), ...], in order."""
+        return await asyncio.gather(*(self.call(fn_name, *args, block=block) for fn_name, args in calls))
+
+    async def latest_block(self):
+        # Reused for block_ttl seconds so a burst of calls costs one eth_blockNumber
+        number, fetched_at = self._latest
+        if number is None or time.monotonic() - fetched_at > self.block_ttl:
+            number = await self._rpc(lambda: web3.eth.block_number)
+            self._latest = (number, time.monotonic())
+        return number
+
+    # Shorthands for the views services use most
+    async def get_user_data(self, user, block=None):
+        return await self.call("getUserData", user, block=block)
+
+    async def get_token_balance(self, token, block=None):
+        return await self.call("getTokenBalance", token, block=block)
+
+    async def get_expected_token_calibration(self, user, token, block=None):
+        return await self.call("getUserExpectedTokenCalibration", user, token, block=block)
+
+    async def is_calibration_open(self, block=None):
+        return await self.call("isCalibrationOpen", block=block)
+
+    ############################################################################
+    # Batching
+
+    async def _rpc(self, fn):
+        self.stats["rpc_calls"] += 1
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn)
+
+    async def _flush(self):
+        await asyncio.sleep(0)
+        pending, self._pending, self._flush_task = self._pending, [], None
+
+        try:
+            latest = None
+            misses = {}
+            for fn_name, args, block, future in pending:
+                if block is None:
+                    latest = latest if latest is not None else await self.latest_block()
+                    block = latest
+                key = (block, fn_name, tuple(args))
+                if key in self.cache:
+                    self.stats["cache_hits"] += 1
+                    future.set_result(self.cache.get(key))
+                else:
+                    # Identical calls in the batch share one slot in the multicall
+                    misses.setdefault(block, {}).setdefault(key, []).append(future)
+
+            for block, calls in misses.items():
+                keys = list(calls)
+                for i in range(0, len(keys), self.batch_size):
+                    await self._multicall(block, keys[i:i + self.batch_size], calls)
+        except Exception as e:
+            # A failed RPC fails every call of the batch still waiting, instead of leaving its caller hanging
+            for _, _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _multicall(self, block, keys, futures):
+        encoded = [(self.etf.address, True, getattr(self.etf, fn_name).encode_input(*args)) for _, fn_name, args in keys]
+        self.stats["multicalls"] += 1
+        try:
+            results = await self._rpc(lambda: self.multicall.aggregate3.call(encoded, block_identifier=block))
+        except Exception as e:
+            for key in keys:
+                for future in futures[key]:
+                    future.set_exception(e)
+            return
+
+        for key, (success, data) in zip(keys, results):
+            _, fn_name, args = key
+            if success:
+                value = getattr(self.etf, fn_name).decode_output(data)
+                self.cache.put(key, value)
+                for future in futures[key]:
+                    future.set_result(value)
+            else:
+                error = CallFailed(fn_name, args, decode_etf_error(web3.toHex(data)))
+                for future in futures[key]:
+                    future.set_exception(error)
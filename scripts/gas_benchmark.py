@@ -0,0 +1,189 @@
+from brownie import accounts, chain, networkETF, Token
+from scripts.utils import CycleClock
+import json, os
+
+# Run against a local dev chain:
+#   brownie run scripts/gas_benchmark.py                                compare with the baseline (5% tolerance)
+#   brownie run scripts/gas_benchmark.py main check 2                   compare with a 2% tolerance
+#   brownie run scripts/gas_benchmark.py main --update-baseline         record a new baseline
+#   brownie run scripts/gas_benchmark.py main check 5 quick             small sweep for a fast local check
+# Without a recorded baseline a check is skipped. Once one is recorded, a check fails on any entry of the run the
+# baseline does not have: new entry points are recorded on purpose.
+
+BASELINE_PATH = os.path.join("reports", "gas_baseline.json")
+DEFAULT_TOLERANCE = 5
+UPDATE_BASELINE = "--update-baseline"
+
+CYCLE_PERIOD = 24*60*60
+CYCLE_LENGTH = 60*60
+
+SWEEPS = {
+    "full": {"tokens": [1, 10, 50, 100, 500], "users": [1, 10, 100, 1_000, 10_000]},
+    "quick": {"tokens": [1, 10], "users": [1, 10]},
+}
+
+TOKEN_AMOUNT = 10**18
+DEPOSIT_AMOUNT = 10**15
+
+
+def deploy_etf(owner):
+    etf = networkETF.deploy({"from": owner})
+    etf.initialize(CYCLE_PERIOD, CYCLE_LENGTH, {"from": owner, "value": 10**18})
+    return etf
+
+def deploy_token(owner):
+    token = Token.deploy({"from": owner})
+    token.initialize({"from": owner})
+    return token
+
+def submit_token(etf, token, owner, provider):
+    token.mint(provider, TOKEN_AMOUNT, {"from": owner})
+    token.approve(etf.address, TOKEN_AMOUNT, {"from": provider})
+    return etf.submitToken(token, TOKEN_AMOUNT, {"from": provider})
+
+def new_depositor(funder):
+    # Fresh local account holding just enough to make a deposit (dev chain gas price is 0)
+    user = accounts.add()
+    funder.transfer(user, DEPOSIT_AMOUNT)
+    return user
+
+
+def bench_tokens(owner, sweep):
+    """Gas of submitToken & calibrateToken as the number of registered tokens grows."""
+    results = {}
+    clock = CycleClock(CYCLE_PERIOD, CYCLE_LENGTH)
+    first_user, repeat_user, provider = accounts[1], accounts[2], accounts[9]
+
+    clock.next_window(offset=0)
+    etf = deploy_etf(owner)
+    etf.deposit({"from": first_user, "value": DEPOSIT_AMOUNT})
+    etf.deposit({"from": repeat_user, "value": DEPOSIT_AMOUNT})
+
+    tokens = []
+    for count in sweep:
+        while len(tokens) < count:
+            token = deploy_token(owner)
+            submit_token(etf, token, owner, provider)
+            tokens.append(token)
+        token = tokens[-1]
+
+        chain.snapshot()
+        results[f"submitToken:repeat:tokens={count}"] = submit_token(etf, token, owner, provider).gas_used
+        results[f"submitToken:first:tokens={count}"] = submit_token(etf, deploy_token(owner), owner, provider).gas_used
+
+        # The first calibration of a token in a cycle resets its bond usage, later ones only add to it
+        clock.next_window()
+        results[f"calibrateToken:first:tokens={count}"] = etf.calibrateToken(first_user, token, {"from": first_user}).gas_used
+        results[f"calibrateToken:repeat:tokens={count}"] = etf.calibrateToken(repeat_user, token, {"from": repeat_user}).gas_used
+        chain.revert()
+
+    return results
+
+
+def bench_users(owner, sweep):
+    """Gas of deposit, withdraw & calibration as the number of depositors grows."""
+    results = {}
+    clock = CycleClock(CYCLE_PERIOD, CYCLE_LENGTH)
+    first_user, repeat_user, new_user, provider = accounts[1], accounts[2], accounts[3], accounts[9]
+
+    clock.next_window(offset=0)
+    etf = deploy_etf(owner)
+    token = deploy_token(owner)
+    etf.deposit({"from": first_user, "value": DEPOSIT_AMOUNT})
+    etf.deposit({"from": repeat_user, "value": DEPOSIT_AMOUNT})
+
+    population = []
+    for count in sweep:
+        while len(population) < count:
+            user = new_depositor(owner)
+            etf.deposit({"from": user, "value": DEPOSIT_AMOUNT})
+            population.append(user)
+
+        chain.snapshot()
+        submit_token(etf, token, owner, provider)
+        etf.submitMynt({"from": provider, "value": TOKEN_AMOUNT})
+
+        # Two windows guarantee every deposit predates the previous calibration cycle
+        clock.next_window()
+        clock.next_window()
+        results[f"calibrateToken:first:users={count}"] = etf.calibrateToken(first_user, token, {"from": first_user}).gas_used
+        results[f"calibrateToken:repeat:users={count}"] = etf.calibrateToken(repeat_user, token, {"from": repeat_user}).gas_used
+        results[f"calibrateMynt:first:users={count}"] = etf.calibrateMynt(first_user, {"from": first_user}).gas_used
+        results[f"calibrateMynt:repeat:users={count}"] = etf.calibrateMynt(repeat_user, {"from": repeat_user}).gas_used
+
+        results[f"deposit:first:users={count}"] = etf.deposit({"from": new_user, "value": DEPOSIT_AMOUNT}).gas_used
+        results[f"deposit:repeat:users={count}"] = etf.deposit({"from": first_user, "value": DEPOSIT_AMOUNT}).gas_used
+        results[f"withdraw:partial:users={count}"] = etf.withdraw(DEPOSIT_AMOUNT, {"from": first_user}).gas_used
+        results[f"withdraw:full:users={count}"] = etf.withdraw(DEPOSIT_AMOUNT, {"from": repeat_user}).gas_used
+        chain.revert()
+
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    """The recorded gas per entry point; empty when no baseline was recorded yet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["gas"]
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump({"gas": dict(sorted(results.items()))}, f, indent=2)
+        f.write("\n")
+
+def compare(results, baseline, tolerance):
+    """Returns the (key, baseline, current) entries that got more than `tolerance` percent more expensive."""
+    regressions = []
+    for key, gas in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is not None and gas > previous * (1 + tolerance / 100):
+            regressions.append((key, previous, gas))
+    return regressions
+
+def missing_entries(results, baseline):
+    """Returns the entries of the run the baseline does not have."""
+    return sorted(key for key in results if key not in baseline)
+
+
+def run(sweep="full"):
+    owner = accounts[0]
+    results = {}
+    results.update(bench_tokens(owner, SWEEPS[sweep]["tokens"]))
+    results.update(bench_users(owner, SWEEPS[sweep]["users"]))
+    return results
+
+
+def main(mode="check", tolerance=DEFAULT_TOLERANCE, sweep="full"):
+    if mode not in ("check", UPDATE_BASELINE):
+        raise Exception(f"Unknown mode {mode}: use check or {UPDATE_BASELINE}")
+    update_baseline = mode == UPDATE_BASELINE
+    tolerance = float(tolerance)
+    baseline = load_baseline()
+    if not baseline and not update_baseline:
+        print(f"No gas baseline recorded in {BASELINE_PATH}: check skipped. Record one with {UPDATE_BASELINE}")
+        return
+    results = run(sweep)
+
+    print(f"{'entry point':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+    for key, gas in sorted(results.items()):
+        previous = baseline.get(key)
+        change = f"{100 * (gas - previous) / previous:+.2f}%" if previous else "new"
+        print(f"{key:<40}{previous or '-':>12}{gas:>12}{change:>10}")
+
+    if update_baseline:
+        save_baseline({**baseline, **results})
+        print("\nBaseline written to", BASELINE_PATH)
+        return
+
+    missing = missing_entries(results, baseline)
+    if missing:
+        for key in missing:
+            print(f"MISSING {key}")
+        raise Exception(f"{len(missing)} entry points have no baseline; record them with {UPDATE_BASELINE}")
+
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        for key, previous, gas in regressions:
+            print(f"REGRESSION {key}: {previous} -> {gas}")
+        raise Exception(f"{len(regressions)} entry points exceeded the {tolerance}% gas tolerance")
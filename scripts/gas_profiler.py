@@ -0,0 +1,136 @@
+from brownie import accounts
+from scripts.gas_benchmark import CYCLE_LENGTH, CYCLE_PERIOD, DEPOSIT_AMOUNT, TOKEN_AMOUNT, deploy_etf, deploy_token, submit_token
+from scripts.utils import CycleClock
+from collections import Counter, defaultdict
+import os
+
+# Run against a local dev chain (needs debug_traceTransaction):
+#   brownie run scripts/gas_profiler.py                        top 10 functions per entry point
+#   brownie run scripts/gas_profiler.py main 20 opcodes        top 20, with opcodes as the leaf frames
+#
+# Writes reports/gas_profile.folded, one "entry;fn;...;fn gas" line per stack, which flamegraph.pl,
+# inferno or speedscope read as is.
+
+PROFILE_PATH = os.path.join("reports", "gas_profile.folded")
+
+
+def step_costs(trace):
+    """Gas spent by each step of a brownie trace, excluding what calls forward to their callee.
+
+    Steps are charged the gas drop to the next step at the same depth; for a call that drop is the caller's cost
+    plus everything the callee used, so the callee's own steps are taken back out when the call returns.
+    """
+    costs = [0] * len(trace)
+    calls = []  # (index of the call step, total cost of the callee's steps so far)
+    for i, step in enumerate(trace):
+        if i + 1 == len(trace):
+            costs[i] = step["gasCost"]
+        elif trace[i + 1]["depth"] == step["depth"]:
+            costs[i] = step["gas"] - trace[i + 1]["gas"]
+        elif trace[i + 1]["depth"] > step["depth"]:
+            calls.append([i, 0])
+            continue
+        else:
+            # Last step of a call frame: what it leaves is refunded to the caller
+            costs[i] = step["gasCost"]
+
+        if calls and step["depth"] > trace[calls[-1][0]]["depth"]:
+            calls[-1][1] += costs[i]
+
+        # Back in the caller: settle the call step
+        if i + 1 < len(trace) and calls and trace[i + 1]["depth"] == trace[calls[-1][0]]["depth"]:
+            call, callee = calls.pop()
+            costs[call] = trace[call]["gas"] - trace[i + 1]["gas"] - callee
+            if calls:
+                calls[-1][1] += costs[call] + callee
+    return costs
+
+
+def collapse(tx, opcodes=False):
+    """Counter of "fn;fn;...;fn" stacks (internal & external calls) to the gas their own steps spent."""
+    trace = tx.trace
+    stacks = Counter()
+    frames = []  # (depth, jumpDepth, fn)
+
+    for step, cost in zip(trace, step_costs(trace)):
+        key = (step["depth"], step["jumpDepth"])
+        fn = step["fn"] or "<unknown>"
+        while frames and frames[-1][:2] > key:
+            frames.pop()
+        if frames and frames[-1][:2] == key:
+            # Sibling call at the same depth
+            frames[-1] = (*key, fn)
+        else:
+            frames.append((*key, fn))
+
+        stack = ";".join(frame[2] for frame in frames)
+        stacks[f"{stack};{step['op']}" if opcodes else stack] += cost
+    return stacks
+
+
+def profile(txs, opcodes=False):
+    """Stacks of a list of transactions, grouped by entry point (contract function called)."""
+    by_entry = defaultdict(Counter)
+    for tx in txs:
+        by_entry[tx.fn_name or "<transfer>"].update(collapse(tx, opcodes))
+    return by_entry
+
+
+def top(stacks, n=10):
+    """(self gas, inclusive gas) of the n functions with the most self gas."""
+    own, inclusive = Counter(), Counter()
+    for stack, gas in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += gas
+        for fn in set(frames):
+            inclusive[fn] += gas
+    return [(fn, gas, inclusive[fn]) for fn, gas in own.most_common(n)]
+
+
+def write_folded(by_entry, path=PROFILE_PATH):
+    with open(path, "w") as f:
+        for entry, stacks in sorted(by_entry.items()):
+            for stack, gas in sorted(stacks.items()):
+                if gas > 0:
+                    f.write(f"{entry};{stack} {gas}\n")
+
+
+def workload(owner=None):
+    """Transactions of one calibration cycle: deposits, submissions, every calibration entry point & exits."""
+    owner = owner or accounts[0]
+    users, provider = accounts[1:4], accounts[9]
+    clock = CycleClock(CYCLE_PERIOD, CYCLE_LENGTH)
+    txs = []
+
+    clock.next_window(offset=0)
+    etf = deploy_etf(owner)
+    tokens = [deploy_token(owner) for _ in range(2)]
+    for user in users:
+        txs.append(etf.deposit({"from": user, "value": DEPOSIT_AMOUNT}))
+    for token in tokens:
+        txs.append(submit_token(etf, token, owner, provider))
+        txs.append(submit_token(etf, token, owner, provider))
+    txs.append(etf.submitMynt({"from": provider, "value": TOKEN_AMOUNT}))
+
+    # First & repeat calibrations differ by the bond usage reset
+    clock.next_window()
+    for user in users[:2]:
+        txs.append(etf.calibrateToken(user, tokens[0], {"from": user}))
+        txs.append(etf.calibrateMynt(user, {"from": user}))
+    txs.append(etf.calibrateMany(users[2], tokens, True, {"from": users[2]}))
+
+    txs.append(etf.deposit({"from": users[0], "value": DEPOSIT_AMOUNT}))
+    txs.append(etf.withdraw(DEPOSIT_AMOUNT, {"from": users[1]}))
+    return txs
+
+
+def main(n=10, opcodes=""):
+    by_entry = profile(workload(), opcodes == "opcodes")
+    write_folded(by_entry)
+
+    for entry, stacks in sorted(by_entry.items()):
+        print(f"\n{entry}: {sum(stacks.values())} gas")
+        print(f"  {'function':<50}{'self':>10}{'inclusive':>12}")
+        for fn, own, inclusive in top(stacks, int(n)):
+            print(f"  {fn:<50}{own:>10}{inclusive:>12}")
+    print("\nCollapsed stacks written to", PROFILE_PATH)
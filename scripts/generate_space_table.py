@@ -0,0 +1,68 @@
+# Generates the 1.0001^(2^i) constants of fMathPool.get_price_from_space:
+#   python scripts/generate_space_table.py
+#
+# Each constant is the previous one squared with fMath.mulDivFixedPoint's rounding (half up), i.e. exactly the
+# value powu reaches after i squarings. Multiplying the constants of the set bits in ascending order therefore
+# gives the same result as powu, to the wei.
+
+SCALE = 10**18
+MAX_UD60x18 = 2**256 - 1
+BASE = 1000100000000000000  # 1.0001
+BITS = 21
+
+
+def mul_div_fixed_point(x, y):
+    product = x * y
+    if product >> 256 >= SCALE:
+        raise OverflowError("mulDivFixedPoint overflow")
+    return product // SCALE + (product % SCALE >= SCALE // 2)
+
+
+def powers(bits=BITS):
+    table = [BASE]
+    for _ in range(bits - 1):
+        table.append(mul_div_fixed_point(table[-1], table[-1]))
+    return table
+
+
+TABLE = powers()
+
+
+def price(space, table=TABLE):
+    """1.0001^space as a 60.18 fixed point number, computed like fMathPool.get_price_from_space."""
+    abs_space = abs(space)
+    result = table[0] if abs_space & 1 else SCALE
+    for i in range(1, len(table)):
+        if abs_space >> i & 1:
+            result = mul_div_fixed_point(result, table[i])
+    if result > MAX_UD60x18:
+        raise OverflowError("Price overflows UD60x18")
+    return result if space >= 0 else SCALE * SCALE // result
+
+
+def max_space(table=TABLE):
+    """Largest |space| whose price fits in UD60x18 (prices grow with |space|, so a binary search is enough)."""
+    low, high = 0, 2**len(table) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        try:
+            price(mid, table)
+            low = mid
+        except OverflowError:
+            high = mid - 1
+    return low
+
+
+def solidity(table=TABLE):
+    lines = [f"    uint256 internal constant MAX_SPACE = {max_space(table)};", ""]
+    for i, value in enumerate(table):
+        lines.append(f"    uint256 internal constant POW_1_0001_2_{i} = {value};")
+    return "\n".join(lines)
+
+
+def main():
+    print(solidity())
+
+
+if __name__ == "__main__":
+    main()
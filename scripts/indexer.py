@@ -0,0 +1,265 @@
+from brownie import web3, networkETF, Contract
+from scripts.utils import ZERO_ADDRESS
+import sqlite3, time
+
+# Rebuilds the ETF's state from its events into SQLite & follows the chain head:
+#   brownie run scripts/indexer.py main <etf address> [db path] [cycle period]
+#
+# Amounts are stored in wei as decimal TEXT since bonds & balances do not fit in SQLite's 64 bit integers.
+# MYNT is stored as the asset ZERO_ADDRESS next to the tokens. Accumulator claims are not tied to a cycle, so they
+# are kept in their own table instead of allocations & cycle_usage.
+
+EVENTS = [
+    "Deposit", "Withdraw", "CalibrateToken", "CalibrateMynt", "SubmitToken", "SubmitMynt", "MerkleRootPublished",
+    "OwnershipTransferred", "Claim",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    contract TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    user TEXT,
+    asset TEXT,
+    amount TEXT,
+    timestamp INTEGER,
+    PRIMARY KEY (block, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_user ON events (user, block);
+CREATE INDEX IF NOT EXISTS events_asset ON events (asset, block);
+CREATE TABLE IF NOT EXISTS users (
+    address TEXT PRIMARY KEY,
+    deposit TEXT NOT NULL,
+    last_updated INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS assets (
+    address TEXT PRIMARY KEY,
+    balance TEXT NOT NULL,
+    submitted TEXT NOT NULL,
+    calibrated TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS allocations (
+    user TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    PRIMARY KEY (user, asset)
+);
+CREATE TABLE IF NOT EXISTS cycle_usage (
+    cycle INTEGER NOT NULL,
+    asset TEXT NOT NULL,
+    bonds_used TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    calibrations INTEGER NOT NULL,
+    PRIMARY KEY (cycle, asset)
+);
+CREATE TABLE IF NOT EXISTS claims (
+    user TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    claims INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    PRIMARY KEY (user, asset)
+);
+"""
+
+
+class EventIndexer:
+    """Pages through the ETF's logs in block ranges & applies them to a SQLite database.
+
+    Every page is written in one transaction together with its checkpoint, so a restarted indexer resumes from
+    the last complete page without double counting.
+    """
+
+    def __init__(self, etf, db_path, cycle_period=24*60*60, batch_size=5000, confirmations=0, from_block=0):
+        self.etf = etf
+        self.cycle_period = cycle_period
+        self.batch_size = batch_size
+        self.confirmations = confirmations
+
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR IGNORE INTO checkpoints VALUES (?, ?)", (etf.address, from_block - 1))
+        self.db.commit()
+
+        # Decode with the ETF's ABI; every event is fetched in the same eth_getLogs call
+        self._contract = web3.eth.contract(address=etf.address, abi=etf.abi)
+        self._events = {}
+        for abi in etf.abi:
+            if abi["type"] == "event" and abi["name"] in EVENTS:
+                signature = "{}({})".format(abi["name"], ",".join(i["type"] for i in abi["inputs"]))
+                self._events[web3.toHex(web3.keccak(text=signature))] = getattr(self._contract.events, abi["name"])()
+
+    ############################################################################
+    # Paging
+
+    @property
+    def checkpoint(self):
+        return self.db.execute("SELECT block FROM checkpoints WHERE contract = ?", (self.etf.address,)).fetchone()[0]
+
+    def head(self):
+        return web3.eth.block_number - self.confirmations
+
+    def get_logs(self, from_block, to_block):
+        return web3.eth.get_logs({
+            "address": self.etf.address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [list(self._events)],
+        })
+
+    def sync(self, to_block=None):
+        """Indexes every page up to `to_block` (default: the confirmed head) & returns the number of events."""
+        to_block = self.head() if to_block is None else to_block
+        indexed = 0
+        batch_size = self.batch_size
+
+        while self.checkpoint < to_block:
+            start = self.checkpoint + 1
+            end = min(start + batch_size - 1, to_block)
+            try:
+                logs = self.get_logs(start, end)
+            except ValueError:
+                # Nodes cap the logs per request; retry with a smaller range
+                if batch_size == 1:
+                    raise
+                batch_size = max(batch_size // 2, 1)
+                continue
+
+            with self.db:
+                for log in logs:
+                    self.apply(self._decode(log))
+                self.db.execute("UPDATE checkpoints SET block = ? WHERE contract = ?", (end, self.etf.address))
+            indexed += len(logs)
+
+            # Grow back towards the configured size after a busy range
+            batch_size = min(batch_size * 2, self.batch_size)
+
+        return indexed
+
+    def follow(self, poll_interval=15):
+        while True:
+            count = self.sync()
+            if count:
+                print(f"Indexed {count} events up to block {self.checkpoint}")
+            time.sleep(poll_interval)
+
+    ############################################################################
+    # State
+
+    def _decode(self, log):
+        event = self._events[web3.toHex(log["topics"][0])].process_log(log)
+        args = event.args
+        row = {
+            "block": event.blockNumber,
+            "log_index": event.logIndex,
+            "tx_hash": web3.toHex(event.transactionHash),
+            "event": event.event,
+            "user": args.get("user") or args.get("provider"),
+            "asset": args.get("tokenAddress", ZERO_ADDRESS),
+            "amount": args.get("amount"),
+            "timestamp": args.get("timestamp"),
+        }
+
+        if event.event == "OwnershipTransferred":
+            # The initial bond is the value sent to initialize(), which emits no Deposit
+            if args.previousOwner != ZERO_ADDRESS:
+                return None
+            tx = web3.eth.get_transaction(event.transactionHash)
+            block = web3.eth.get_block(event.blockNumber)
+            row.update(user=args.newOwner, amount=tx.value, timestamp=block.timestamp, event="Initialize")
+        return row
+
+    def apply(self, row):
+        if row is None:
+            return
+        self.db.execute(
+            "INSERT INTO events VALUES (:block, :log_index, :tx_hash, :event, :user, :asset, :amount, :timestamp)",
+            {**row, "amount": str(row["amount"])},
+        )
+
+        event, user, asset, amount, timestamp = row["event"], row["user"], row["asset"], row["amount"], row["timestamp"]
+        if event in ("Initialize", "Deposit", "Withdraw"):
+            sign = -1 if event == "Withdraw" else 1
+            self.db.execute(
+                "INSERT OR REPLACE INTO users VALUES (?, ?, ?)",
+                (user, str(self.get_deposit(user) + sign * amount), timestamp),
+            )
+        elif event == "MerkleRootPublished":
+            # The reserved amount leaves the token balance when the root is published, not when it is claimed
+            balance, submitted, calibrated = self.get_asset(asset)
+            self.db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                (asset, str(balance - amount), str(submitted), str(calibrated + amount)),
+            )
+        elif event == "Claim":
+            # Paid out of the accrued rewards, whatever the cycle
+            balance, submitted, calibrated = self.get_asset(asset)
+            self.db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                (asset, str(balance - amount), str(submitted), str(calibrated + amount)),
+            )
+            claimed, claims = self.get_claims(user, asset)
+            self.db.execute(
+                "INSERT OR REPLACE INTO claims VALUES (?, ?, ?, ?, ?)",
+                (user, asset, str(claimed + amount), claims + 1, timestamp),
+            )
+        elif event in ("SubmitToken", "SubmitMynt"):
+            balance, submitted, calibrated = self.get_asset(asset)
+            self.db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                (asset, str(balance + amount), str(submitted + amount), str(calibrated)),
+            )
+        else:
+            # CalibrateToken & CalibrateMynt use the user's whole bond for the cycle
+            balance, submitted, calibrated = self.get_asset(asset)
+            self.db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                (asset, str(balance - amount), str(submitted), str(calibrated + amount)),
+            )
+            self.db.execute("INSERT OR REPLACE INTO allocations VALUES (?, ?, ?)", (user, asset, timestamp))
+
+            cycle = timestamp // self.cycle_period
+            bonds_used, allocated, calibrations = self.get_cycle_usage(cycle, asset)
+            self.db.execute(
+                "INSERT OR REPLACE INTO cycle_usage VALUES (?, ?, ?, ?, ?)",
+                (cycle, asset, str(bonds_used + self.get_deposit(user)), str(allocated + amount), calibrations + 1),
+            )
+
+    ############################################################################
+    # Queries
+
+    def get_deposit(self, user):
+        row = self.db.execute("SELECT deposit FROM users WHERE address = ?", (user,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def get_asset(self, asset):
+        """Returns (balance, submitted, calibrated) of a token or MYNT (ZERO_ADDRESS)."""
+        row = self.db.execute("SELECT balance, submitted, calibrated FROM assets WHERE address = ?", (asset,)).fetchone()
+        return tuple(map(int, row)) if row else (0, 0, 0)
+
+    def get_cycle_usage(self, cycle, asset):
+        """Returns (bonds used, amount allocated, number of calibrations) of an asset in a cycle."""
+        row = self.db.execute(
+            "SELECT bonds_used, amount, calibrations FROM cycle_usage WHERE cycle = ? AND asset = ?", (cycle, asset)
+        ).fetchone()
+        return (int(row[0]), int(row[1]), row[2]) if row else (0, 0, 0)
+
+    def get_claims(self, user, asset):
+        """Returns (amount claimed, number of claims) of a user's accumulator claims of an asset."""
+        row = self.db.execute("SELECT amount, claims FROM claims WHERE user = ? AND asset = ?", (user, asset)).fetchone()
+        return (int(row[0]), row[1]) if row else (0, 0)
+
+    def get_users(self):
+        """Returns every address with a non-zero bond."""
+        return [address for address, in self.db.execute("SELECT address FROM users WHERE deposit != '0'")]
+
+
+def main(etf_address, db_path="reports/etf_events.sqlite", cycle_period=24*60*60):
+    etf = Contract.from_abi("networkETF", etf_address, networkETF.abi)
+    indexer = EventIndexer(etf, db_path, int(cycle_period))
+    indexer.follow()
@@ -0,0 +1,234 @@
+from brownie import web3, networkETF, Contract
+from scripts.utils import get_account, get_depositors
+from concurrent.futures import ThreadPoolExecutor
+from web3.exceptions import TimeExhausted, TransactionNotFound
+import threading, time
+
+# Calibrates every eligible (user, asset) pair while the calibration window is open:
+#   brownie run scripts/keeper.py main <etf address> [cycle period] [cycle length]
+
+
+class NonceManager:
+    """Hands out consecutive nonces for one sender so transactions can be sent concurrently."""
+
+    def __init__(self, address):
+        self.address = address
+        self._lock = threading.Lock()
+        self.sync()
+
+    def sync(self):
+        with self._lock:
+            self._nonce = web3.eth.get_transaction_count(self.address, "pending")
+
+    def next(self):
+        with self._lock:
+            nonce = self._nonce
+            self._nonce += 1
+            return nonce
+
+
+class Keeper:
+
+    def __init__(
+        self,
+        etf,
+        account,
+        cycle_period,
+        cycle_length,
+        workers=16,
+        max_gas_price=None,
+        max_retries=3,
+        receipt_timeout=60,
+        deadline_margin=60,
+        from_block=0,
+        page_size=100,
+    ):
+        self.etf = etf
+        self.account = account
+        self.cycle_period = cycle_period
+        self.cycle_length = cycle_length
+        self.max_gas_price = max_gas_price
+        self.max_retries = max_retries
+        self.receipt_timeout = receipt_timeout
+        self.deadline_margin = deadline_margin
+        self.page_size = page_size
+        self._deadline = float("inf")
+
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.nonces = NonceManager(account.address)
+
+        # Depositors are discovered incrementally from the ETF's events
+        self.users = set()
+        self._next_block = from_block
+
+    ############################################################################
+    # Discovery
+
+    def refresh_users(self):
+        latest = web3.eth.block_number
+        if self._next_block > latest:
+            return self.users
+
+        self.users |= get_depositors(self.etf, self._next_block, latest)
+        self._next_block = latest + 1
+        return self.users
+
+    def tokens(self):
+        # Tokens with nothing left to distribute are not worth a calibration
+        tokens = self.etf.getTokens(0, self.etf.getTotalTokens())
+        balances = self.etf.getTokenBalances(tokens)
+        return [token for token, balance in zip(tokens, balances) if balance > 0]
+
+    def eligible_page(self, users, tokens, block_time, mynt_available):
+        """Returns (user, tokens they can calibrate, whether they can calibrate MYNT) for a page of users."""
+
+        # Deposit & deposit-time checks are shared by every asset, so only users passing them go in the matrix
+        deposits, last_updated = self.etf.getUsersData(users)
+        users = [
+            user for user, deposit, updated in zip(users, deposits, last_updated)
+            if deposit > 0 and updated <= block_time - self.cycle_period
+        ]
+        if not users:
+            return []
+
+        # Reason code 0 means the user can calibrate the asset
+        _, reasons, _, mynt_reasons = self.etf.getCalibrationMatrix(users, tokens)
+        return [
+            (user, [token for token, reason in zip(tokens, row) if reason == 0], mynt_available and mynt_reason == 0)
+            for user, row, mynt_reason in zip(users, reasons, mynt_reasons)
+        ]
+
+    def scan(self, users, tokens):
+        """Returns the (user, tokens, include MYNT) calibrations with work, two calls per page of users."""
+
+        # Shared by every page of the scan
+        block_time = self._block_time()
+        mynt_available = self.etf.getMyntBalance() > 0
+
+        pages = [users[i:i + self.page_size] for i in range(0, len(users), self.page_size)]
+        checks = self.pool.map(lambda page: self.eligible_page(page, tokens, block_time, mynt_available), pages)
+        return [(user, eligible, include_mynt) for page in checks for user, eligible, include_mynt in page if eligible or include_mynt]
+
+    def eligible_assets(self, user, tokens):
+        """Returns the tokens the user can calibrate & whether they can calibrate MYNT."""
+        work = self.scan([user], tokens)
+        return (work[0][1], work[0][2]) if work else ([], False)
+
+    def find_work(self):
+        return self.scan(sorted(self.refresh_users()), self.tokens())
+
+    ############################################################################
+    # Sending
+
+    def gas_price(self):
+        # Returns None while the network gas price is above the configured limit
+        price = web3.eth.gas_price
+        if self.max_gas_price is not None and price > self.max_gas_price:
+            return None
+        return price
+
+    def _send(self, tx):
+        # Unlocked dev chain accounts sign on the node, local accounts sign here
+        if hasattr(self.account, "private_key"):
+            signed = web3.eth.account.sign_transaction(tx, self.account.private_key)
+            return web3.eth.send_raw_transaction(signed.rawTransaction)
+        return web3.eth.send_transaction(tx)
+
+    def calibrate(self, user, tokens, include_mynt):
+        """Sends one calibrateMany for the user, retrying reverted or dropped transactions.
+
+        Returns "calibrated", "skipped" (no longer eligible, gas too expensive or past the deadline) or "failed".
+        """
+        data = self.etf.calibrateMany.encode_input(user, tokens, include_mynt)
+        tx = {"from": self.account.address, "to": self.etf.address, "data": data, "value": 0}
+
+        for attempt in range(self.max_retries + 1):
+            if time.time() > self._deadline:
+                return "skipped"
+
+            # Estimating gas also catches calibrations that would revert before paying for them
+            try:
+                tx["gas"] = web3.eth.estimate_gas(tx)
+            except ValueError:
+                tokens, include_mynt = self.eligible_assets(user, tokens)
+                if not tokens and not include_mynt:
+                    return "skipped"
+                tx["data"] = self.etf.calibrateMany.encode_input(user, tokens, include_mynt)
+                continue
+
+            tx["gasPrice"] = self.gas_price()
+            if tx["gasPrice"] is None:
+                return "skipped"
+            tx["nonce"] = self.nonces.next()
+            try:
+                tx_hash = self._send(tx)
+                receipt = self._wait_for_receipt(tx, tx_hash)
+            except ValueError:
+                # Rejected by the node (e.g. a stale nonce); resync & try again
+                self.nonces.sync()
+                continue
+
+            if receipt is not None and receipt.status == 1:
+                return "calibrated"
+
+        return "failed"
+
+    def _wait_for_receipt(self, tx, tx_hash):
+        try:
+            return web3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout)
+        except TimeExhausted:
+            pass
+
+        # Dropped transactions are resent as is, stuck ones are replaced with a higher gas price
+        try:
+            web3.eth.get_transaction(tx_hash)
+            tx["gasPrice"] = max(tx["gasPrice"] * 9 // 8 + 1, self.gas_price() or 0)
+        except TransactionNotFound:
+            pass
+        try:
+            return web3.eth.wait_for_transaction_receipt(self._send(tx), timeout=self.receipt_timeout)
+        except TimeExhausted:
+            return None
+
+    ############################################################################
+    # Scheduling
+
+    def _block_time(self):
+        return web3.eth.get_block("latest").timestamp
+
+    def _window_end(self, block_time):
+        return block_time - block_time % self.cycle_period + self.cycle_length
+
+    def run_once(self):
+        """Calibrates everything that is eligible in the current window & returns a summary."""
+        summary = {"calibrated": 0, "skipped": 0, "failed": 0}
+        if not self.etf.isCalibrationOpen():
+            return summary
+
+        # Translate the window end from chain time to local time
+        block_time = self._block_time()
+        self._deadline = time.time() + self._window_end(block_time) - block_time - self.deadline_margin
+
+        self.nonces.sync()
+        work = self.find_work()
+        for result in self.pool.map(lambda job: self.calibrate(*job), work):
+            summary[result] += 1
+
+        print("Calibration run: ", summary)
+        return summary
+
+    def run(self, poll_interval=15):
+        while True:
+            if self.etf.isCalibrationOpen():
+                self.run_once()
+                time.sleep(poll_interval)
+            else:
+                # Keep the depositor set current between windows & wake up when the next one opens
+                self.refresh_users()
+                time.sleep(max(1, min(poll_interval, self.etf.nextWindowStart() - self._block_time())))
+
+
+def main(etf_address, cycle_period=24*60*60, cycle_length=60*60):
+    etf = Contract.from_abi("networkETF", etf_address, networkETF.abi)
+    keeper = Keeper(etf, get_account(0), int(cycle_period), int(cycle_length))
+    keeper.run()
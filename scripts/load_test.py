@@ -0,0 +1,267 @@
+from brownie import accounts, web3
+from scripts.gas_benchmark import CYCLE_LENGTH, CYCLE_PERIOD, deploy_etf, deploy_token
+from scripts.utils import CycleClock, decode_etf_error, fund_accounts
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, defaultdict
+import asyncio, csv, os, random, re, statistics, time
+
+# Many senders hitting one ETF in a calibration window, on a local dev chain:
+#   brownie run scripts/load_test.py main                                    defaults below
+#   brownie run scripts/load_test.py main 200 60 deposit=5,withdraw=1,calibrateToken=4 2 30000000 v2
+#   (senders, seconds, mix, seconds per block (0: a block per transaction), block gas limit, label)
+#
+# Appends one summary row per operation to reports/load_test.csv & writes every transaction to
+# reports/load_test_<label>.csv, so runs against different contract versions can be compared.
+
+SUMMARY_PATH = os.path.join("reports", "load_test.csv")
+DEFAULT_MIX = "deposit=4,withdraw=1,calibrateToken=5"
+SUMMARY_FIELDS = [
+    "label", "started", "operation", "senders", "duration", "block_interval", "block_gas_limit",
+    "sent", "confirmed", "reverted", "tps", "latency_p50", "latency_p90", "latency_p99",
+    "gas_mean", "gas_max", "txs_per_block_mean", "txs_per_block_max", "reverts_by_reason",
+]
+
+SENDER_FUNDS = 10**18
+DEPOSIT_RANGE = (10**12, 10**15)
+TOKENS = 3
+TOKEN_SUBMISSION = 10**24
+GAS_MARGIN = 1.25
+
+
+def parse_mix(mix):
+    """"deposit=4,withdraw=1" -> {"deposit": 4, "withdraw": 1}"""
+    weights = {}
+    for part in mix.split(","):
+        operation, weight = part.split("=")
+        weights[operation.strip()] = float(weight)
+    return weights
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def revert_reason(error):
+    """Short revert reason of a node error: the ETF's revert string (custom errors mapped back) or "unknown"."""
+    text = str(error.args[0] if error.args else error)
+    decoded = decode_etf_error(text)
+    if decoded != text:
+        return decoded
+    found = re.search(r"(\d{3}: [^'\"]+)", text) or re.search(r"reverted:? ([^'\"]+)", text)
+    return found.group(1).strip() if found else "unknown"
+
+
+def _rpc(method, params=None):
+    # Dev chain extensions differ between nodes; None when this one does not know the method
+    response = web3.provider.make_request(method, params or [])
+    return None if "error" in response else response.get("result", True)
+
+
+################################################################################
+# Chain setup
+
+
+def setup(n_senders, owner=None):
+    """ETF, tokens & senders that deposited before the previous cycle, in an open calibration window."""
+    owner = owner or accounts[0]
+    clock = CycleClock(CYCLE_PERIOD, CYCLE_LENGTH)
+    funders = accounts[1:9]
+
+    etf = deploy_etf(owner)
+    tokens = [deploy_token(owner) for _ in range(TOKENS)]
+    for token in tokens:
+        fund_accounts(token, owner, [owner], TOKEN_SUBMISSION, spender=etf)
+        etf.submitToken(token, TOKEN_SUBMISSION, {"from": owner})
+
+    senders = []
+    for i in range(n_senders):
+        sender = accounts.add()
+        funders[i % len(funders)].transfer(sender, SENDER_FUNDS)
+        etf.deposit({"from": sender, "value": DEPOSIT_RANGE[1]})
+        senders.append(sender)
+
+    # Two windows later every deposit predates the previous cycle
+    clock.next_window()
+    clock.next_window(offset=0)
+    return etf, tokens, senders
+
+
+class BlockProducer:
+    """Mines a block every `interval` seconds instead of one per transaction, so transactions compete for blocks."""
+
+    def __init__(self, interval, gas_limit=None):
+        self.interval = interval
+        self.gas_limit = gas_limit
+        self._task = None
+
+    async def __aenter__(self):
+        if self.gas_limit and _rpc("evm_setBlockGasLimit", [hex(int(self.gas_limit))]) is None:
+            print(f"This node cannot change its block gas limit; launch it with a {self.gas_limit} gas limit instead")
+        if self.interval > 0:
+            if _rpc("evm_setAutomine", [False]) is None:
+                _rpc("miner_stop")
+            self._task = asyncio.ensure_future(self._mine())
+        return self
+
+    async def _mine(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            _rpc("evm_mine")
+
+    async def __aexit__(self, *exc):
+        if self._task is not None:
+            self._task.cancel()
+            _rpc("evm_mine")
+            if _rpc("evm_setAutomine", [True]) is None:
+                _rpc("miner_start")
+
+
+################################################################################
+# Load
+
+
+class LoadGenerator:
+
+    def __init__(self, etf, tokens, senders, mix, seed=0):
+        self.etf = etf
+        self.tokens = tokens
+        self.senders = senders
+        self.operations, self.weights = zip(*parse_mix(mix).items())
+        self.rng = random.Random(seed)
+        self.results = []
+        self.chain_id = web3.eth.chain_id
+        self.pool = ThreadPoolExecutor(max_workers=len(senders))
+
+    def build(self, operation, sender):
+        if operation == "deposit":
+            value = self.rng.randint(*DEPOSIT_RANGE)
+            return self.etf.deposit.encode_input(), value
+        if operation == "withdraw":
+            return self.etf.withdraw.encode_input(DEPOSIT_RANGE[0]), 0
+        if operation == "calibrateToken":
+            return self.etf.calibrateToken.encode_input(sender, self.rng.choice(self.tokens)), 0
+        raise ValueError(f"Unknown operation {operation}")
+
+    def send(self, operation, sender, nonce):
+        """Sends one transaction & waits for it; returns the result row & whether the nonce was used."""
+        data, value = self.build(operation, sender)
+        tx = {"from": sender.address, "to": self.etf.address, "data": data, "value": value,
+              "nonce": nonce, "chainId": self.chain_id, "gasPrice": web3.eth.gas_price}
+        row = {"operation": operation, "sender": sender.address, "sent": time.time(), "latency": None,
+               "status": None, "reason": "", "gas": None, "block": None}
+
+        # Calls that would revert are counted without being sent
+        try:
+            tx["gas"] = int(web3.eth.estimate_gas(tx) * GAS_MARGIN)
+        except ValueError as e:
+            row.update(status=0, reason=revert_reason(e))
+            return row, False
+
+        signed = web3.eth.account.sign_transaction(tx, sender.private_key)
+        receipt = web3.eth.wait_for_transaction_receipt(web3.eth.send_raw_transaction(signed.rawTransaction), poll_latency=0.05)
+        row.update(latency=time.time() - row["sent"], status=receipt.status, gas=receipt.gasUsed, block=receipt.blockNumber)
+
+        if receipt.status == 0:
+            # Included but reverted, e.g. by a transaction earlier in the block; replay for the reason
+            try:
+                web3.eth.call({k: tx[k] for k in ("from", "to", "data", "value")}, receipt.blockNumber - 1)
+                row["reason"] = "unknown"
+            except ValueError as e:
+                row["reason"] = revert_reason(e)
+        return row, True
+
+    async def _sender(self, sender, until):
+        loop = asyncio.get_running_loop()
+        nonce = web3.eth.get_transaction_count(sender.address)
+        while time.time() < until:
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            row, used = await loop.run_in_executor(self.pool, self.send, operation, sender, nonce)
+            nonce += used
+            self.results.append(row)
+
+    async def run(self, duration, block_interval=0, block_gas_limit=None):
+        until = time.time() + duration
+        async with BlockProducer(block_interval, block_gas_limit):
+            await asyncio.gather(*(self._sender(sender, until) for sender in self.senders))
+        return self.results
+
+
+################################################################################
+# Report
+
+
+def summarize(results, duration):
+    """One summary dict per operation & one for all of them."""
+    per_block = Counter(row["block"] for row in results if row["block"] is not None)
+    groups = defaultdict(list)
+    for row in results:
+        groups[row["operation"]].append(row)
+        groups["all"].append(row)
+
+    summaries = []
+    for operation, rows in sorted(groups.items()):
+        confirmed = [row for row in rows if row["status"] == 1]
+        latencies = [row["latency"] for row in rows if row["latency"] is not None]
+        gas = [row["gas"] for row in confirmed]
+        blocks = per_block if operation == "all" else Counter(row["block"] for row in rows if row["block"] is not None)
+        reverts = Counter(row["reason"] for row in rows if row["status"] == 0)
+        summaries.append({
+            "operation": operation,
+            "sent": len(rows),
+            "confirmed": len(confirmed),
+            "reverted": sum(reverts.values()),
+            "tps": len(confirmed) / duration,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p90": percentile(latencies, 90),
+            "latency_p99": percentile(latencies, 99),
+            "gas_mean": statistics.mean(gas) if gas else None,
+            "gas_max": max(gas) if gas else None,
+            "txs_per_block_mean": statistics.mean(blocks.values()) if blocks else None,
+            "txs_per_block_max": max(blocks.values()) if blocks else None,
+            "reverts_by_reason": "; ".join(f"{reason}: {count / len(rows):.1%}" for reason, count in reverts.most_common()),
+        })
+    return summaries
+
+
+def write_csv(summaries, results, context, summary_path=SUMMARY_PATH):
+    exists = os.path.exists(summary_path)
+    with open(summary_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, SUMMARY_FIELDS)
+        if not exists:
+            writer.writeheader()
+        for summary in summaries:
+            writer.writerow({**context, **summary})
+
+    path = os.path.join(os.path.dirname(summary_path), f"load_test_{context['label']}.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, list(results[0]) if results else ["operation"])
+        writer.writeheader()
+        writer.writerows(results)
+    return path
+
+
+def main(senders=50, duration=30, mix=DEFAULT_MIX, block_interval=1, block_gas_limit=0, label="local"):
+    senders, duration, block_interval, block_gas_limit = int(senders), float(duration), float(block_interval), int(block_gas_limit)
+    etf, tokens, sender_accounts = setup(senders)
+
+    started = time.time()
+    results = asyncio.run(LoadGenerator(etf, tokens, sender_accounts, mix).run(duration, block_interval, block_gas_limit))
+    elapsed = time.time() - started
+
+    summaries = summarize(results, elapsed)
+    context = {
+        "label": label, "started": int(started), "senders": senders, "duration": round(elapsed, 2),
+        "block_interval": block_interval, "block_gas_limit": web3.eth.get_block("latest").gasLimit,
+    }
+    path = write_csv(summaries, results, context)
+
+    print(f"{'operation':<16}{'sent':>8}{'ok':>8}{'tps':>8}{'p50 s':>8}{'p99 s':>8}{'gas':>10}  reverts")
+    for s in summaries:
+        p50, p99 = (f"{s[k]:.2f}" if s[k] is not None else "-" for k in ("latency_p50", "latency_p99"))
+        gas = f"{s['gas_mean']:.0f}" if s["gas_mean"] is not None else "-"
+        print(f"{s['operation']:<16}{s['sent']:>8}{s['confirmed']:>8}{s['tps']:>8.1f}{p50:>8}{p99:>8}{gas:>10}  {s['reverts_by_reason']}")
+    print("\nResults appended to", SUMMARY_PATH, "& written to", path)
+    return summaries
@@ -0,0 +1,104 @@
+from brownie import web3, networkETF, Contract
+from scripts.utils import get_depositors
+import json
+
+# Builds the allocation tree of a Merkle distribution from the ETF's bonds & writes the root & every proof:
+#   brownie run scripts/merkle.py main <etf address> <token amount> [out path]
+#
+# Leaves & pair hashing match networkETF.claimMerkle (OpenZeppelin MerkleProof: sorted pairs).
+
+USER_BATCH_SIZE = 500
+
+
+def leaf(index, user, amount):
+    encoded = web3.codec.encode_abi(["uint256", "address", "uint256"], [index, user, amount])
+    return web3.keccak(web3.keccak(encoded))
+
+
+def hash_pair(a, b):
+    return web3.keccak(a + b) if a < b else web3.keccak(b + a)
+
+
+class MerkleTree:
+    """Merkle tree over leaf hashes; a node without a sibling is carried up to the next layer unchanged."""
+
+    def __init__(self, leaves):
+        if not leaves:
+            raise ValueError("A Merkle tree needs at least one leaf")
+        self.layers = [list(leaves)]
+        while len(self.layers[-1]) > 1:
+            layer = self.layers[-1]
+            self.layers.append([
+                hash_pair(layer[i], layer[i + 1]) if i + 1 < len(layer) else layer[i]
+                for i in range(0, len(layer), 2)
+            ])
+
+    @property
+    def root(self):
+        return self.layers[-1][0]
+
+    def proof(self, index):
+        proof = []
+        for layer in self.layers[:-1]:
+            sibling = index ^ 1
+            if sibling < len(layer):
+                proof.append(layer[sibling])
+            index //= 2
+        return proof
+
+    def proofs(self):
+        """Every proof at once, in leaf order."""
+        return [self.proof(i) for i in range(len(self.layers[0]))]
+
+
+def verify(proof, root, leaf_hash):
+    for node in proof:
+        leaf_hash = hash_pair(leaf_hash, node)
+    return leaf_hash == root
+
+
+def get_bonds(etf, users, batch_size=USER_BATCH_SIZE, block_identifier=None):
+    """Returns {user: bond} for users with a bond, reading the bonds a page at a time."""
+    users = sorted(users)
+    bonds = {}
+    for i in range(0, len(users), batch_size):
+        page = users[i:i + batch_size]
+        deposits, _ = etf.getUsersData(page, block_identifier=block_identifier)
+        bonds.update((user, deposit) for user, deposit in zip(page, deposits) if deposit > 0)
+    return bonds
+
+
+def build_allocations(bonds, amount):
+    """Splits amount pro-rata over the bonds, rounding down like the calibrations; the dust stays unclaimed."""
+    total = sum(bonds.values())
+    allocations = {user: amount * bond // total for user, bond in bonds.items()}
+    return {user: allocation for user, allocation in allocations.items() if allocation > 0}
+
+
+def build_distribution(allocations):
+    """Returns the root, total & per-user {index, amount, proof} of a distribution as hex strings."""
+    users = sorted(allocations)
+    tree = MerkleTree([leaf(i, user, allocations[user]) for i, user in enumerate(users)])
+    proofs = tree.proofs()
+    return {
+        "root": web3.toHex(tree.root),
+        "total": sum(allocations.values()),
+        "claims": {
+            user: {"index": i, "amount": allocations[user], "proof": [web3.toHex(node) for node in proofs[i]]}
+            for i, user in enumerate(users)
+        },
+    }
+
+
+def build_from_chain(etf, amount, from_block=0, block_identifier=None):
+    """Distribution of `amount` over the bonds held at `block_identifier` (default: latest)."""
+    users = get_depositors(etf, from_block, block_identifier)
+    return build_distribution(build_allocations(get_bonds(etf, users, block_identifier=block_identifier), amount))
+
+
+def main(etf_address, amount, out_path="reports/merkle_distribution.json"):
+    etf = Contract.from_abi("networkETF", etf_address, networkETF.abi)
+    distribution = build_from_chain(etf, int(amount))
+    with open(out_path, "w") as f:
+        json.dump(distribution, f, indent=2)
+    print(f"Root {distribution['root']} for {len(distribution['claims'])} claims, written to {out_path}")
@@ -0,0 +1,235 @@
+from brownie import accounts, networkETF, Token, chain
+from scripts.utils import CycleClock
+import numpy as np
+import random
+
+# Off-chain model of networkETF's calibrations with the contract's UD60x18 rounding:
+#   brownie run scripts/simulator.py main [rounds] [seed]   (replays random scenarios against a local deploy)
+#
+# Amounts are kept in object arrays of Python ints: bonds * balances need up to 224 bits, so int64/float64 would
+# lose the wei the differential mode compares. Each block is computed over all users at once. Timestamps fit in int64.
+
+SCALE = 10**18
+HALF_SCALE = SCALE // 2
+MYNT = -1  # MYNT is the last asset column
+
+
+def mul(x, y):
+    # fMath.mulDivFixedPoint: x * y / SCALE, rounding half up
+    product = x * y
+    return product // SCALE + (product % SCALE >= HALF_SCALE)
+
+
+def div(x, y):
+    # fMath.mulDiv(x, SCALE, y): rounds down
+    return x * SCALE // y
+
+
+class CalibrationSimulator:
+    """Mirrors the ETF's bonds, asset balances & per-cycle bond usage for `n_users` users & `n_tokens` tokens + MYNT.
+
+    Users & assets are indices; every method is vectorized over users & assets.
+    """
+
+    def __init__(self, n_users, n_tokens, cycle_period, cycle_length):
+        self.cycle_period = cycle_period
+        self.cycle_length = cycle_length
+        n_assets = n_tokens + 1
+
+        self.deposits = np.zeros(n_users, dtype=object)
+        self.last_updated = np.zeros(n_users, dtype=np.int64)
+        self.allocated_epoch = np.zeros((n_users, n_assets), dtype=np.int64)
+
+        self.balances = np.zeros(n_assets, dtype=object)
+        self.bonds_used = np.zeros(n_assets, dtype=object)
+        self.asset_epoch = np.zeros(n_assets, dtype=np.int64)
+
+    @property
+    def mynt_deposited(self):
+        return self.deposits.sum()
+
+    ############################################################################
+    # Deposits & submissions
+
+    def deposit(self, users, amounts, timestamp):
+        np.add.at(self.deposits, users, np.asarray(amounts, dtype=object))
+        self.last_updated[users] = timestamp
+
+    def withdraw(self, users, amounts, timestamp):
+        np.subtract.at(self.deposits, users, np.asarray(amounts, dtype=object))
+        assert (self.deposits >= 0).all(), "Withdrawal larger than the deposit"
+        self.last_updated[users] = timestamp
+
+    def submit(self, asset, amount):
+        self.balances[asset] += amount
+
+    ############################################################################
+    # Calibration
+
+    def is_open(self, timestamp):
+        return timestamp % self.cycle_period < self.cycle_length
+
+    def epoch(self, timestamp):
+        return timestamp // self.cycle_period
+
+    def reasons(self, users, timestamp):
+        """Reason codes of getCalibrationMatrix for users x assets: 0 if eligible, else 401-404."""
+        users = np.asarray(users)
+        reasons = np.zeros((len(users), len(self.balances)), dtype=np.int64)
+        if not self.is_open(timestamp):
+            reasons[:] = 401
+        reasons[self.last_updated[users] > timestamp - self.cycle_period] = 403
+        reasons[self.allocated_epoch[users] == self.epoch(timestamp)] = 402
+        reasons[self.deposits[users] == 0] = 404
+        return reasons
+
+    def _available(self, timestamp):
+        # Bonds used in an earlier epoch no longer count
+        bonds_used = np.where(self.asset_epoch == self.epoch(timestamp), self.bonds_used, 0).astype(object)
+        return bonds_used, self.mynt_deposited - bonds_used
+
+    def expected(self, users, timestamp):
+        """Expected calibration of users x assets, as the single-asset views return it (nothing is spent)."""
+        _, total_bonds = self._available(timestamp)
+        bonds = self.deposits[np.asarray(users)][:, None]
+        return div(mul(bonds, self.balances[None, :]), total_bonds[None, :])
+
+    def calibrate(self, users, timestamp, assets=None):
+        """Calibrates users in order at one timestamp (a block), each for every eligible asset.
+
+        A calibration depends on the balance the ones before it left, so the block is solved as a whole: starting
+        from the unrounded pro-rata balances, every payout is recomputed from the balances the payouts before it
+        leave until nothing changes. Each pass fixes at least the next user in order, so the result is exactly the
+        sequential one; rounding only moves a few wei, so it takes a handful of passes. Returns users x assets.
+        """
+        users = np.asarray(users)
+        mask = np.zeros(len(self.balances), dtype=bool)
+        mask[slice(None) if assets is None else assets] = True
+
+        bonds_used, total_bonds = self._available(timestamp)
+        eligible = mask[None, :] & (self.reasons(users, timestamp) == 0)
+        bonds = np.where(eligible, self.deposits[users][:, None], 0).astype(object)
+
+        # Bonds not yet used when each user calibrates; ineligible users divide by 1 & get nothing
+        unused = total_bonds[None, :] - (np.cumsum(bonds, axis=0) - bonds)
+        divisor = np.where(eligible, unused, 1).astype(object)
+        balances = self.balances[None, :]
+        before = np.where(eligible, balances * unused // np.where(total_bonds > 0, total_bonds, 1)[None, :], 0).astype(object)
+
+        for _ in range(len(users) + 1):
+            amounts = np.where(eligible, div(mul(bonds, before), divisor), 0).astype(object)
+            spent = balances - (np.cumsum(amounts, axis=0) - amounts)
+            if (spent == before)[eligible].all():
+                break
+            before = spent
+
+        epoch = self.epoch(timestamp)
+        self.balances = self.balances - amounts.sum(axis=0)
+        self.bonds_used = bonds_used + bonds.sum(axis=0)
+        self.asset_epoch[eligible.any(axis=0)] = epoch
+        allocated = self.allocated_epoch[users]
+        allocated[eligible] = epoch
+        self.allocated_epoch[users] = allocated
+        return amounts
+
+    def run_cycles(self, cycles, order=None, offset=None, rng=None):
+        """Runs whole cycles in which every eligible user calibrates every asset.
+
+        `order` is "index" or "random" (a new permutation per cycle); returns the assets x cycles amounts allocated.
+        """
+        rng = rng or np.random.default_rng()
+        offset = self.cycle_length // 2 if offset is None else offset
+        start = int(max(self.asset_epoch.max(), self.epoch(self.last_updated.max())) + 1)
+        allocated = np.zeros((len(self.balances), cycles), dtype=object)
+
+        for c in range(cycles):
+            timestamp = (start + c) * self.cycle_period + offset
+            users = np.arange(len(self.deposits)) if order != "random" else rng.permutation(len(self.deposits))
+            allocated[:, c] = self.calibrate(users, timestamp).sum(axis=0)
+        return allocated
+
+
+################################################################################
+# Differential mode
+
+
+def differential(etf, tokens, users, clock, rounds=3, seed=0):
+    """Replays random deposits, withdrawals, submissions & calibrations against a deployed ETF & the simulator.
+
+    `etf` must be freshly initialized by accounts[0] & `users` must not include it. Returns a list of
+    (round, what, contract value, simulated value) for every wei of difference.
+    """
+    rng = random.Random(seed)
+    actors = [accounts[0]] + list(users)
+    index = {a.address: i for i, a in enumerate(actors)}
+    sim = CalibrationSimulator(len(actors), len(tokens), clock.cycle_period, clock.cycle_length)
+    sim.deposit([0], [etf.getUserData(accounts[0])[0]], etf.getUserData(accounts[0])[1])
+    differences = []
+
+    def check(r, what, contract_value, simulated_value):
+        if contract_value != simulated_value:
+            differences.append((r, what, contract_value, int(simulated_value)))
+
+    for r in range(rounds):
+        clock.next_window(offset=0)
+
+        # Deposits, withdrawals & submissions
+        for user in users:
+            if rng.random() < 0.6:
+                amount = rng.randint(1, 10**6) * 10**rng.randint(9, 13)
+                tx = etf.deposit({"from": user, "value": amount})
+                sim.deposit([index[user.address]], [amount], tx.timestamp)
+            elif rng.random() < 0.2 and sim.deposits[index[user.address]] > 0:
+                amount = rng.randint(1, sim.deposits[index[user.address]])
+                tx = etf.withdraw(amount, {"from": user})
+                sim.withdraw([index[user.address]], [amount], tx.timestamp)
+        for a, token in enumerate(tokens):
+            amount = rng.randint(1, 10**9) * 10**rng.randint(0, 12)
+            token.mint(accounts[0], amount, {"from": accounts[0]})
+            token.approve(etf, amount, {"from": accounts[0]})
+            etf.submitToken(token, amount, {"from": accounts[0]})
+            sim.submit(a, amount)
+        amount = rng.randint(1, 10**7) * 10**rng.randint(6, 10)
+        etf.submitMynt({"from": accounts[0], "value": amount})
+        sim.submit(MYNT, amount)
+
+        # Calibrate in a random order in the next window; every call is a block of its own
+        clock.next_window()
+        order = list(actors)
+        rng.shuffle(order)
+        for user in order:
+            # Every asset was submitted this round, so a user is eligible for all or none of them
+            if sim.reasons([index[user.address]], chain.time())[0][MYNT] != 0:
+                continue
+            tx = etf.calibrateMany(user, list(tokens), True, {"from": user})
+            amounts = sim.calibrate([index[user.address]], tx.timestamp)[0]
+
+            for event in tx.events["CalibrateToken"]:
+                a = [t.address for t in tokens].index(event["tokenAddress"])
+                check(r, f"CalibrateToken {user} {tokens[a]}", event["amount"], amounts[a])
+            if "CalibrateMynt" in tx.events:
+                check(r, f"CalibrateMynt {user}", tx.events["CalibrateMynt"]["amount"], amounts[MYNT])
+
+        for a, token in enumerate(tokens):
+            check(r, f"balance {token}", etf.getTokenBalance(token), sim.balances[a])
+        check(r, "MYNT balance", etf.getMyntBalance(), sim.balances[MYNT])
+        check(r, "MYNT deposited", etf.getTotalMyntDeposit(), sim.mynt_deposited)
+
+    return differences
+
+
+def main(rounds=3, seed=0):
+    cycle_period, cycle_length = 24*60*60, 60*60
+    etf = networkETF.deploy({"from": accounts[0]})
+    etf.initialize(cycle_period, cycle_length, {"from": accounts[0], "value": 5*10**18})
+    tokens = []
+    for _ in range(2):
+        token = Token.deploy({"from": accounts[0]})
+        token.initialize({"from": accounts[0]})
+        tokens.append(token)
+
+    differences = differential(etf, tokens, accounts[1:8], CycleClock(cycle_period, cycle_length), int(rounds), int(seed))
+    for difference in differences:
+        print("Round {}: {}: contract {} != simulated {}".format(*difference))
+    print(f"{len(differences)} differences")
+    return differences
@@ -1,37 +1,102 @@
-from brownie import networkETF, Contract
-from scripts.utils import  get_account, upgrade
-from scripts.deploy import deploy_etf_proxy,  deploy_etf
-import time
+from brownie import networkETF, Contract, network
+from scripts.utils import  get_account, get_depositors
+from scripts.deploy import DeploymentPipeline
 
-# Get deployment account & transacting account
-deployment_owner_account = get_account(1)
-test_account = get_account(0)
+# Upgrades the ETF proxy recorded in deployments/<network>.json when networkETF changed:
+#   brownie run scripts/upgrade.py main --network goerli
+#   brownie run scripts/upgrade.py main true true --network mainnet-fork     dry run, with storage migration
 
+MIGRATION_BATCH_SIZE = 200
 
-def deploy_updates(deployment_account, proxy_admin, existing_proxy_address):
 
-    #Step 1: Deploy logic contracts
-    new_token =  deploy_etf(deployment_account)
-    print("Update new token: ", new_token)
+def migrate_storage(owner_account, etf_proxy, users, batch_size=MIGRATION_BATCH_SIZE, unpause=True):
+    """Moves an upgraded v1 proxy into the packed storage layout.
 
-    #Get proxies
-    existing_etf_proxy = Contract.from_abi("networkETF", existing_proxy_address, networkETF.abi) 
+    The proxy must have been paused before the upgrade (see deploy_updates): v2 code must not run on v1 storage.
+    Must run outside a calibration cycle; the ETF is only unpaused once every bond has been copied.
+    """
+    if not etf_proxy.paused():
+        raise Exception("Pause the ETF before upgrading it, then migrate its storage")
 
-    #Step 2: upgrade bridge
-    upgrade(
-        deployment_account,
-        existing_etf_proxy,
-        new_token,
-        proxy_admin_contract=proxy_admin
-        )
+    # Step 1: fund-wide data, then tokens & users in batches
+    etf_proxy.migrateStorage({"from": owner_account})
 
-    pass
+    total_tokens = etf_proxy.getTotalTokens()
+    for offset in range(0, total_tokens, batch_size):
+        etf_proxy.migrateTokens(offset, batch_size, {"from": owner_account})
 
+    users = sorted(users)
+    for i in range(0, len(users), batch_size):
+        etf_proxy.migrateUsers(users[i:i + batch_size], {"from": owner_account})
 
-def main():
+    # Step 2: every bond must have been copied before the ETF is used again
+    migrated = sum(etf_proxy.getUserData(user)[0] for user in users)
+    if migrated != etf_proxy.getTotalMyntDeposit():
+        raise Exception("Migrated bonds do not add up to the total deposit")
 
-    etf, admin = deploy_etf_proxy(deployment_owner_account)
- 
-    deploy_updates(deployment_owner_account, admin, etf)
+    if unpause:
+        etf_proxy.unpause({"from": owner_account})
 
-    time.sleep(1)
+
+def enable_accumulator(owner_account, etf_proxy, tokens=None):
+    """Switches the ETF from calibration cycles to accumulator distribution of MYNT & `tokens`.
+
+    `tokens` defaults to every registered token (at most MAX_ACCUMULATOR_ASSETS); others are no longer distributed.
+    Must run outside a calibration cycle; balances not yet calibrated become claimable by the current bond holders.
+    """
+    if tokens is None:
+        tokens = etf_proxy.getTokens(0, etf_proxy.getTotalTokens())
+    for token in tokens:
+        etf_proxy.addAccumulatorAsset(token, {"from": owner_account})
+
+    was_paused = etf_proxy.paused()
+    if not was_paused:
+        etf_proxy.pause({"from": owner_account})
+
+    etf_proxy.enableAccumulator({"from": owner_account})
+
+    if not was_paused:
+        etf_proxy.unpause({"from": owner_account})
+
+
+def deploy_updates(deployment_account, migrate=False, accumulator=False, dry_run=False, path=None):
+    """Upgrades the ETF proxy to the current implementation (deployed only if its bytecode is new), then migrates."""
+
+    pipeline = DeploymentPipeline(deployment_account, path, dry_run)
+    record = pipeline.manifest["proxies"].get("networkETF")
+
+    #Step 1: pause a v1 proxy before upgrading it, so no call runs v2 code on v1 storage
+    was_paused = True
+    if migrate:
+        if record is None:
+            raise Exception(f"No ETF proxy in {pipeline.path} to migrate")
+        legacy_proxy = Contract.from_abi("networkETF", record["address"], networkETF.abi)
+        if legacy_proxy.isCalibrationOpen():
+            raise Exception("Cannot migrate during a calibration cycle")
+        was_paused = legacy_proxy.paused()
+        if not was_paused:
+            legacy_proxy.pause({"from": deployment_account})
+
+    #Step 2: Deploy the implementation if it changed & upgrade the proxy
+    _, existing_etf_proxy = pipeline.release(factory=False)
+
+    #Step 3: migrate proxies still on the v1 storage layout
+    if migrate:
+        migrate_storage(deployment_account, existing_etf_proxy, get_depositors(existing_etf_proxy), unpause=False)
+
+    #Step 4: move to accumulator distribution
+    if accumulator:
+        enable_accumulator(deployment_account, existing_etf_proxy)
+
+    #Step 5: reopen the ETF only once every step succeeded
+    if not was_paused:
+        existing_etf_proxy.unpause({"from": deployment_account})
+
+    pipeline.report()
+    return existing_etf_proxy
+
+
+def main(dry_run="false", migrate="false", accumulator="false"):
+    print("Network: ", network.show_active())
+    flags = [str(flag).lower() == "true" for flag in (dry_run, migrate, accumulator)]
+    deploy_updates(get_account(1), migrate=flags[1], accumulator=flags[2], dry_run=flags[0])
@@ -1,7 +1,9 @@
-from brownie import accounts, config,  network, Contract
+from brownie import accounts, chain, config,  network, web3, Contract
+from brownie.exceptions import VirtualMachineError
+from contextlib import contextmanager
+import re
 
 def get_account(num =0 ):
-    print("Network: ",  network.show_active())
     if network.show_active() == "development" or network.show_active() == None:
         return accounts[num]
     else:
@@ -15,14 +17,126 @@ def get_account(num =0 ):
 def get_current_balance(token, account):
     return token.balanceOf(account)/10**18
 
+def fund_accounts(token, owner, holders, amount, spender=None, allowance=2**256-1, batch_size=200):
+    """Mints `amount` to every holder & (with a spender) sets their allowance, `batch_size` holders per transaction.
+
+    `token` must be the test Token owned by `owner`.
+    """
+    holders = list(holders)
+    for i in range(0, len(holders), batch_size):
+        batch = holders[i:i + batch_size]
+        token.mintBatch(batch, [amount] * len(batch), {"from": owner})
+        if spender is not None:
+            token.approveBatch(batch, spender, allowance, {"from": owner})
+
 def give_tokens(token, owner, skip = 1, account_range = 9):
-    for i in range(skip, account_range):
-        token.mintTo(get_account(i), 10_000*10**18, {"from": owner})
-        
+    fund_accounts(token, owner, [get_account(i) for i in range(skip, account_range)], 10_000*10**18)
+
 def approve_tokens(token, exchange, owner, skip = 1, account_range=9):
-    for i in range(skip, account_range):
-        token.mintTo(get_account(i), 1_000_000*10**18, {"from": owner})
-        token.approve(exchange, 2**256-1, {"from": get_account(i)})
+    fund_accounts(token, owner, [get_account(i) for i in range(skip, account_range)], 1_000_000*10**18, spender=exchange)
+
+
+class CycleClock:
+    """Moves the dev chain clock relative to an ETF calibration cycle.
+
+    A cycle starts every `cycle_period` seconds and calibration is open for the
+    first `cycle_length` seconds of it, matching `networkETF.isCalibrationOpen`.
+    """
+
+    def __init__(self, cycle_period, cycle_length):
+        self.cycle_period = cycle_period
+        self.cycle_length = cycle_length
+
+    def now(self):
+        return chain.time()
+
+    def cycle_start(self):
+        return self.now() - self.now() % self.cycle_period
+
+    def is_open(self):
+        return self.now() % self.cycle_period < self.cycle_length
+
+    def warp(self, timestamp):
+        # Move the clock forward (never backwards) and mine a block at the new time
+        delta = timestamp - self.now()
+        if delta > 0:
+            chain.sleep(delta)
+        chain.mine()
+
+    def next_window(self, offset=None):
+        # Advance to the next calibration window, `offset` seconds after it opens (default: halfway)
+        if offset is None:
+            offset = self.cycle_length // 2
+        self.warp(self.cycle_start() + self.cycle_period + offset)
+
+    def close_window(self):
+        # Advance to the moment the current calibration window closes
+        self.warp(self.cycle_start() + self.cycle_length)
+
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def get_depositors(etf, from_block=0, to_block=None):
+    """Returns every address that has held a bond in the ETF between the given blocks."""
+    depositors = set()
+    for event in etf.events.get_sequence(from_block, to_block, "Deposit"):
+        depositors.add(event.args.user)
+
+    # The initial bond is set in initialize(), which only emits the first OwnershipTransferred
+    for event in etf.events.get_sequence(from_block, to_block, "OwnershipTransferred"):
+        if event.args.previousOwner == ZERO_ADDRESS:
+            depositors.add(event.args.newOwner)
+
+    return depositors
+
+
+# networkETF's calibration errors & the revert strings they replaced
+ETF_ERRORS = {
+    "CalibrationClosed()": "401: Calibration cycle is closed",
+    "AlreadyAllocated(address)": "402: User has allocated tokens before in this calibration cycle",
+    "DepositTooRecent()": "403: User has not deposited before the previous calibration cycle",
+    "NoDeposit()": "404: User has not deposited any MYNT",
+}
+ALREADY_ALLOCATED_MYNT = "402: User has allocated MYNT before in this calibration cycle"
+
+
+def decode_etf_error(revert_msg):
+    """Maps a networkETF custom error back to the revert string it replaced.
+
+    Accepts the raw revert data or brownie's revert message (decoded by name, or as "typed error: 0x...");
+    anything else is returned unchanged.
+    """
+    if not isinstance(revert_msg, str):
+        return revert_msg
+
+    for signature, message in ETF_ERRORS.items():
+        name = signature.split("(")[0]
+        selector = web3.toHex(web3.keccak(text=signature))[2:10]
+        found = re.search(f"0x{selector}([0-9a-fA-F]{{64}})?", revert_msg) or re.match(rf"{name}\b\W*(0x[0-9a-fA-F]+)?", revert_msg)
+        if not found:
+            continue
+
+        # AlreadyAllocated's asset is address(0) for MYNT
+        if name == "AlreadyAllocated" and int(found.group(1) or "0", 16) == 0:
+            return ALREADY_ALLOCATED_MYNT
+        return message
+
+    return revert_msg
+
+
+@contextmanager
+def etf_reverts(revert_msg):
+    """Like brownie.reverts, but compares networkETF custom errors by the revert string they replaced."""
+    try:
+        yield
+    except VirtualMachineError as e:
+        decoded = decode_etf_error(e.revert_msg)
+        if decoded != revert_msg:
+            raise AssertionError(f"Unexpected revert string '{decoded}'") from e
+    else:
+        raise AssertionError("Transaction did not revert")
+
 
 def encode_function_data(initializer=None, *args):
     """Encodes the function call so we can work with an initializer.
@@ -0,0 +1,58 @@
+import pytest
+from brownie import accounts, networkETF, Token
+from scripts.utils import CycleClock
+
+
+# Cycle configuration used by the shared ETF fixture
+CYCLE_PERIOD = 24*60*60
+CYCLE_LENGTH = 60*60
+INITIAL_BOND = 5*10**18
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Under pytest-xdist (brownie test -n auto) every worker launches its own dev chain on port + worker id &
+    # loads the artifacts the master compiled. Fixtures deploy once per module, so hand out whole files unless
+    # another --dist mode was asked for
+    if getattr(config.option, "numprocesses", None) and config.option.dist in ("no", "load"):
+        if not any(arg.startswith(("--dist", "-d")) for arg in config.invocation_params.args):
+            config.option.dist = "loadfile"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def shared_setup(module_isolation):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture(scope="module")
+def clock():
+    return CycleClock(CYCLE_PERIOD, CYCLE_LENGTH)
+
+
+@pytest.fixture(scope="module")
+def etf():
+    # deploy etf once per module; every test starts from this snapshot
+    etf_contract = networkETF.deploy({'from': accounts[0]})
+    etf_contract.initialize(CYCLE_PERIOD, CYCLE_LENGTH, {'from': accounts[0], 'value': INITIAL_BOND})
+    return etf_contract
+
+
+def _deploy_token():
+    token_contract = Token.deploy({'from': accounts[0]})
+    token_contract.initialize({'from': accounts[0]})
+    return token_contract
+
+
+@pytest.fixture(scope="module")
+def token():
+    return _deploy_token()
+
+
+@pytest.fixture(scope="module")
+def second_token():
+    return _deploy_token()
@@ -0,0 +1,172 @@
+import pytest, brownie
+from brownie import accounts, networkETF, Token
+from scripts.utils import ZERO_ADDRESS
+
+
+def submit_token(etf, token, amount):
+    token.mint(accounts[9], amount, {'from': accounts[0]})
+    token.approve(etf.address, amount, {'from': accounts[9]})
+    etf.submitToken(token, amount, {'from': accounts[9]})
+
+
+def enable_accumulator(etf, clock, tokens=()):
+    for token in tokens:
+        etf.addAccumulatorAsset(token, {'from': accounts[0]})
+    clock.close_window()
+    etf.pause({'from': accounts[0]})
+    etf.enableAccumulator({'from': accounts[0]})
+    etf.unpause({'from': accounts[0]})
+
+
+def test_enable_accumulator_guards(etf, clock):
+
+    # Only the owner, while paused & outside a calibration window
+    clock.next_window()
+    with brownie.reverts("Ownable: caller is not the owner"):
+        etf.enableAccumulator({'from': accounts[1]})
+    with brownie.reverts("Pausable: not paused"):
+        etf.enableAccumulator({'from': accounts[0]})
+    etf.pause({'from': accounts[0]})
+    with brownie.reverts("406: Cannot migrate during a calibration cycle"):
+        etf.enableAccumulator({'from': accounts[0]})
+
+    clock.close_window()
+    etf.enableAccumulator({'from': accounts[0]})
+    assert etf.getDistributionMode() == 1
+    with brownie.reverts("410: Accumulator distribution is already enabled"):
+        etf.enableAccumulator({'from': accounts[0]})
+
+
+def test_accumulator_distribution(etf, token, clock):
+
+    # Users 1 & 2 hold bonds next to the initial 5 MYNT bond
+    etf.deposit({"from": accounts[1], "value": 5*10**18})
+    etf.deposit({"from": accounts[2], "value": 10*10**18})
+    submit_token(etf, token, 4*10**18)
+    etf.submitMynt({'from': accounts[9], 'value': 2*10**18})
+
+    # Claims are only available in accumulator mode
+    with brownie.reverts("408: Accumulator distribution is not enabled"):
+        etf.claimToken(accounts[1], token, {'from': accounts[1]})
+
+    # Balances submitted in cycle mode are spread over the bonds held when switching
+    enable_accumulator(etf, clock, [token])
+    assert etf.getAccrued(accounts[1], token) == 10**18
+    assert etf.getAccrued(accounts[2], token) == 2*10**18
+    assert etf.getAccrued(accounts[1], ZERO_ADDRESS) == 2*10**18 // 4
+
+    # Cycle calibration is disabled
+    clock.next_window()
+    with brownie.reverts("409: Calibration cycles are disabled in accumulator mode"):
+        etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
+
+    # A new depositor only accrues from later submissions
+    etf.deposit({"from": accounts[3], "value": 20*10**18})
+    assert etf.getAccrued(accounts[3], token) == 0
+    submit_token(etf, token, 4*10**18)
+    assert etf.getAccrued(accounts[3], token) == 2*10**18
+    assert etf.getAccrued(accounts[1], token) == 10**18 + 10**18 // 2
+
+    # Withdrawing settles what the bond accrued so far
+    etf.withdraw(5*10**18, {"from": accounts[1]})
+    submit_token(etf, token, 10**18)
+    assert etf.getAccrued(accounts[1], token) == 10**18 + 10**18 // 2
+
+    # Claiming pays out the accrued amount at any time
+    tx = etf.claimToken(accounts[1], token, {'from': accounts[1]})
+    assert token.balanceOf(accounts[1]) == 10**18 + 10**18 // 2
+    assert tx.events["Claim"]["amount"] == 10**18 + 10**18 // 2 and "CalibrateToken" not in tx.events
+    assert etf.getAccrued(accounts[1], token) == 0
+
+    mynt_before = accounts[2].balance()
+    etf.claimMynt(accounts[2], {'from': accounts[2]})
+    assert accounts[2].balance() == mynt_before + 2*10**18 // 2
+
+    # Every claim together never exceeds what was submitted
+    for user in accounts[:4]:
+        etf.claimToken(user, token, {'from': user})
+    assert etf.getTokenBalance(token) == token.balanceOf(etf) >= 0
+
+
+def test_claim_gas_is_flat(etf, token, clock):
+
+    etf.deposit({"from": accounts[1], "value": 5*10**18})
+    enable_accumulator(etf, clock, [token])
+    submit_token(etf, token, 10**18)
+
+    # The claim costs the same however many submissions or holders came before
+    gas_first = etf.claimToken.estimate_gas(accounts[1], token, {'from': accounts[1]})
+    for i in range(20):
+        etf.deposit({"from": accounts[2 + i % 7], "value": 10**18})
+        submit_token(etf, token, 10**18)
+    assert abs(etf.claimToken.estimate_gas(accounts[1], token, {'from': accounts[1]}) - gas_first) < 100
+
+
+def test_accumulator_assets(etf, token, second_token, clock):
+
+    # Only the owner lists assets; listing registers the token once
+    with brownie.reverts("Ownable: caller is not the owner"):
+        etf.addAccumulatorAsset(token, {'from': accounts[1]})
+    etf.addAccumulatorAsset(token, {'from': accounts[0]})
+    etf.addAccumulatorAsset(token, {'from': accounts[0]})
+    assert etf.getAccumulatorAssets() == [token] and etf.getTotalTokens() == 1
+
+    # Unlisted tokens are not distributed: their submissions revert in accumulator mode
+    submit_token(etf, second_token, 10**18)
+    enable_accumulator(etf, clock)
+    with brownie.reverts("416: Token is not distributed by the accumulator"):
+        submit_token(etf, second_token, 10**18)
+    assert etf.getAccrued(accounts[0], second_token) == 0
+
+    # Listing it later spreads its balance over the current bonds
+    etf.addAccumulatorAsset(second_token, {'from': accounts[0]})
+    assert etf.getAccrued(accounts[0], second_token) == 10**18
+    submit_token(etf, second_token, 10**18)
+
+    # The list is capped
+    for _ in range(etf.MAX_ACCUMULATOR_ASSETS() - 2):
+        junk = Token.deploy({'from': accounts[0]})
+        etf.addAccumulatorAsset(junk, {'from': accounts[0]})
+    with brownie.reverts("415: Too many accumulator assets"):
+        etf.addAccumulatorAsset(Token.deploy({'from': accounts[0]}), {'from': accounts[0]})
+
+
+def test_submissions_without_bonds(etf, token, clock):
+
+    # Everyone withdrew: submissions are kept instead of reverting
+    enable_accumulator(etf, clock, [token])
+    etf.withdraw(etf.getUserData(accounts[0])[0], {"from": accounts[0]})
+    assert etf.getTotalMyntDeposit() == 0
+    submit_token(etf, token, 3*10**18)
+    etf.submitMynt({'from': accounts[9], 'value': 10**18})
+    assert etf.getTokenBalance(token) == 3*10**18 and etf.getMyntBalance() == 10**18
+
+    # The next submission of each asset spreads them over the bonds held by then
+    etf.deposit({"from": accounts[1], "value": 2*10**18})
+    assert etf.getAccrued(accounts[1], token) == 0
+    submit_token(etf, token, 10**18)
+    etf.submitMynt({'from': accounts[9], 'value': 10**18})
+    assert etf.getAccrued(accounts[1], token) == 4*10**18
+    assert etf.getAccrued(accounts[1], ZERO_ADDRESS) == 2*10**18
+
+    etf.claimToken(accounts[1], token, {'from': accounts[1]})
+    assert token.balanceOf(accounts[1]) == 4*10**18 and etf.getTokenBalance(token) == 0
+
+
+def test_withdraw_gas_ignores_registered_tokens(token, clock):
+
+    def withdraw_gas(junk_tokens):
+        # A fresh ETF where anyone registered junk_tokens tokens before the accumulator was enabled
+        etf = networkETF.deploy({'from': accounts[0]})
+        etf.initialize(clock.cycle_period, clock.cycle_length, {'from': accounts[0], 'value': 5*10**18})
+        for _ in range(junk_tokens):
+            junk = Token.deploy({'from': accounts[8]})
+            junk.initialize({'from': accounts[8]})
+            junk.mint(accounts[8], 1, {'from': accounts[8]})
+            junk.approve(etf, 1, {'from': accounts[8]})
+            etf.submitToken(junk, 1, {'from': accounts[8]})
+        etf.deposit({"from": accounts[1], "value": 5*10**18})
+        enable_accumulator(etf, clock, [token])
+        return etf.withdraw.estimate_gas(10**18, {"from": accounts[1]})
+
+    assert abs(withdraw_gas(30) - withdraw_gas(0)) < 100
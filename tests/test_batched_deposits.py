@@ -0,0 +1,75 @@
+import pytest, brownie
+from brownie import accounts
+from scripts.utils import etf_reverts
+
+
+def test_deposit_for(etf, token, clock):
+
+    # A custodian credits three clients in one transaction
+    clients = accounts[1:4]
+    amounts = [10**18, 2*10**18, 3*10**18]
+    total_before = etf.getTotalMyntDeposit()
+    tx = etf.depositFor(clients, amounts, {'from': accounts[5], 'value': sum(amounts)})
+
+    for client, amount in zip(clients, amounts):
+        assert etf.getUserData(client)[0] == amount
+    assert etf.getUserData(accounts[5])[0] == 0
+    assert etf.getTotalMyntDeposit() == total_before + sum(amounts)
+    assert [(e["user"], e["amount"]) for e in tx.events["Deposit"]] == list(zip(clients, amounts))
+
+    # Clients hold the bonds: they wait a cycle to calibrate & withdraw themselves
+    token.mint(accounts[9], 10**18, {'from': accounts[0]})
+    token.approve(etf, 10**18, {'from': accounts[9]})
+    etf.submitToken(token, 10**18, {'from': accounts[9]})
+    clock.next_window(offset=0)
+    with etf_reverts("403: User has not deposited before the previous calibration cycle"):
+        etf.calibrateToken(clients[0], token, {'from': clients[0]})
+    clock.next_window()
+    etf.calibrateToken(clients[0], token, {'from': clients[0]})
+    etf.withdraw(amounts[0], {'from': clients[0]})
+    assert etf.getUserData(clients[0])[0] == 0
+
+    # The value must match the amounts
+    with brownie.reverts("400: Invalid amount"):
+        etf.depositFor(clients, amounts, {'from': accounts[5], 'value': sum(amounts) - 1})
+    with brownie.reverts("400: Invalid amount"):
+        etf.depositFor([clients[0]], [0], {'from': accounts[5]})
+
+    # An empty batch would only write a checkpoint of the unchanged total
+    with brownie.reverts("400: Invalid amount"):
+        etf.depositFor([], [], {'from': accounts[5]})
+    with brownie.reverts("400: Length mismatch"):
+        etf.depositFor(clients, amounts[:2], {'from': accounts[5], 'value': sum(amounts[:2])})
+
+
+def test_withdraw_to(etf):
+
+    # A custodian pays out three clients from its own bonds in one transaction
+    etf.deposit({'from': accounts[5], 'value': 10*10**18})
+    recipients = accounts[1:4]
+    amounts = [10**18, 2*10**18, 3*10**18]
+    balances = [r.balance() for r in recipients]
+    total_before = etf.getTotalMyntDeposit()
+
+    tx = etf.withdrawTo(recipients, amounts, {'from': accounts[5]})
+    assert etf.getUserData(accounts[5])[0] == 4*10**18
+    assert etf.getTotalMyntDeposit() == total_before - sum(amounts)
+    assert [r.balance() - b for r, b in zip(recipients, balances)] == amounts
+    assert [(e["user"], e["amount"]) for e in tx.events["Withdraw"]] == [(accounts[5], sum(amounts))]
+
+    # Nobody else's bonds can be debited
+    with brownie.reverts("401: Insufficient amount deposited"):
+        etf.withdrawTo(recipients, amounts, {'from': accounts[5]})
+    with brownie.reverts("401: Insufficient amount deposited"):
+        etf.withdrawTo([accounts[6]], [1], {'from': accounts[6]})
+    with brownie.reverts("400: Length mismatch"):
+        etf.withdrawTo(recipients, amounts[:1], {'from': accounts[5]})
+
+
+def test_batched_deposit_gas(etf):
+
+    # Crediting 50 clients in one call costs less than 50 deposits
+    clients = [accounts.add() for _ in range(50)]
+    batched = etf.depositFor(clients, [10**15] * 50, {'from': accounts[5], 'value': 50 * 10**15}).gas_used
+    single = etf.deposit({'from': accounts[6], 'value': 10**15}).gas_used
+    assert batched < single * 50
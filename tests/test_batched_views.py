@@ -0,0 +1,74 @@
+import pytest, brownie
+from brownie import accounts
+
+REASON_CODES = {"": 0, "401": 401, "402": 402, "403": 403, "404": 404}
+
+
+def reason_code(reason):
+    return REASON_CODES[reason[:3]]
+
+
+def test_get_tokens(etf, token, second_token):
+
+    # Register both tokens
+    for token_contract in [token, second_token]:
+        token_contract.mint(accounts[9], 10**18, {'from': accounts[0]})
+        token_contract.approve(etf.address, 10**18, {'from': accounts[9]})
+        etf.submitToken(token_contract, 10**18, {'from': accounts[9]})
+
+    # Pages are clamped to the registered tokens
+    assert etf.getTokens(0, 10) == [token, second_token]
+    assert etf.getTokens(1, 1) == [second_token]
+    assert etf.getTokens(1, 10) == [second_token]
+    assert etf.getTokens(2, 10) == []
+    assert etf.getTokenBalances([token, second_token]) == [10**18, 10**18]
+
+
+def test_calibration_matrix(etf, token, second_token, clock):
+
+    # Move to the start of a calibration window
+    clock.next_window(offset=0)
+
+    # Deposit as users 1-3, submit two tokens & MYNT
+    for user in accounts[1:4]:
+        etf.deposit({"from": user, "value": 5*10**18})
+    for token_contract in [token, second_token]:
+        token_contract.mint(accounts[9], 2*10**18, {'from': accounts[0]})
+        token_contract.approve(etf.address, 2*10**18, {'from': accounts[9]})
+        etf.submitToken(token_contract, 2*10**18, {'from': accounts[9]})
+    etf.submitMynt({'from': accounts[9], 'value': 3*10**18})
+
+    # Move to the next calibration window; user 1 calibrates a token & user 3 deposits again
+    clock.next_window()
+    etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
+    etf.deposit({"from": accounts[3], "value": 10**18})
+
+    users = [accounts[0], accounts[1], accounts[2], accounts[3], accounts[4]]
+    tokens = [token, second_token]
+    amounts, reasons, mynt_amounts, mynt_reasons = etf.getCalibrationMatrix(users, tokens)
+
+    # Every cell matches the single (user, asset) views
+    for i, user in enumerate(users):
+        for j, token_contract in enumerate(tokens):
+            amount, can_withdraw, reason = etf.getUserExpectedTokenCalibration(user, token_contract)
+            assert reasons[i][j] == reason_code(reason)
+            assert (reasons[i][j] == 0) == can_withdraw
+            assert amounts[i][j] == (0 if reasons[i][j] in (402, 404) else amount)
+
+        amount, can_withdraw, reason = etf.getUserExpectedMyntCalibration(user)
+        assert mynt_reasons[i] == reason_code(reason)
+        assert mynt_amounts[i] == (0 if mynt_reasons[i] in (402, 404) else amount)
+
+    assert reasons[1] == [402, 0]
+    assert reasons[3] == [403, 403]
+    assert reasons[4] == [404, 404]
+
+    # User data comes back in one call as well
+    deposits, last_updated = etf.getUsersData(users)
+    assert [deposits, last_updated] == [list(x) for x in zip(*(etf.getUserData(user) for user in users))]
+
+    # Once the window closes every depositor gets 401
+    clock.close_window()
+    _, reasons, _, mynt_reasons = etf.getCalibrationMatrix([accounts[2]], tokens)
+    assert reasons[0] == [401, 401]
+    assert mynt_reasons[0] == 401
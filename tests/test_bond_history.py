@@ -0,0 +1,51 @@
+import pytest, brownie
+from brownie import accounts, chain
+
+INITIAL_BOND = 5*10**18
+
+
+def test_bond_history(etf, clock):
+
+    # Deposits & withdrawals over several cycles
+    history = []
+    for amount in [10**18, 2*10**18, -5*10**17, 4*10**18]:
+        clock.next_window()
+        if amount > 0:
+            tx = etf.deposit({"from": accounts[1], "value": amount})
+        else:
+            tx = etf.withdraw(-amount, {"from": accounts[1]})
+        history.append((tx.timestamp, etf.getUserData(accounts[1])[0], etf.getTotalMyntDeposit()))
+    clock.next_window()
+
+    # Every past timestamp reads the bonds of the last change at or before it
+    assert etf.getBondAt(accounts[1], history[0][0] - 1) == 0
+    assert etf.getTotalBondAt(history[0][0] - 1) == INITIAL_BOND
+    for (timestamp, bond, total), (next_timestamp, _, _) in zip(history, history[1:] + [(chain[-1].timestamp, None, None)]):
+        for t in (timestamp, (timestamp + next_timestamp) // 2, next_timestamp - 1):
+            assert etf.getBondAt(accounts[1], t) == bond
+            assert etf.getTotalBondAt(t) == total
+
+    # Bonds at the start of an epoch
+    epoch = history[2][0] // clock.cycle_period
+    assert etf.getBondAt(accounts[1], epoch * clock.cycle_period - 1) == history[1][1]
+
+    # The initial bond is checkpointed at initialization & the future is unknown
+    assert etf.getBondAt(accounts[0], chain[-1].timestamp) == INITIAL_BOND
+    with brownie.reverts("414: Timestamp is in the future"):
+        etf.getBondAt(accounts[1], chain[-1].timestamp + 100)
+
+
+def test_batched_calls_are_checkpointed(etf, clock):
+
+    # One total checkpoint per batch, one per beneficiary
+    tx = etf.depositFor(accounts[1:3], [10**18, 2*10**18], {"from": accounts[5], "value": 3*10**18})
+    clock.next_window()
+    assert etf.getBondAt(accounts[1], tx.timestamp) == 10**18
+    assert etf.getBondAt(accounts[2], tx.timestamp) == 2*10**18
+    assert etf.getTotalBondAt(tx.timestamp) == INITIAL_BOND + 3*10**18
+
+    tx = etf.withdrawTo(accounts[3:5], [10**17, 10**17], {"from": accounts[2]})
+    clock.next_window()
+    assert etf.getBondAt(accounts[2], tx.timestamp) == 18*10**17
+    assert etf.getBondAt(accounts[2], tx.timestamp - 1) == 2*10**18
+    assert etf.getTotalBondAt(tx.timestamp) == INITIAL_BOND + 28*10**17
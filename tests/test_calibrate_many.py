@@ -0,0 +1,66 @@
+import pytest, brownie
+from brownie import accounts
+from scripts.utils import etf_reverts
+
+
+def test_calibrate_many(etf, token, second_token, clock):
+
+    # Move to the start of a calibration window
+    clock.next_window(offset=0)
+
+    # Define variables
+    deposit_amount = 5*10**18
+    token_amount = 2*10**18
+    mynt_submission = 3*10**18
+
+    # Deposit as user 1 & user 2
+    etf.deposit({"from": accounts[1], "value": deposit_amount})
+    etf.deposit({"from": accounts[2], "value": deposit_amount})
+
+    # Submit two tokens & MYNT to the ETF
+    for token_contract in [token, second_token]:
+        token_contract.mint(accounts[9], token_amount, {'from': accounts[0]})
+        token_contract.approve(etf.address, token_amount, {'from': accounts[9]})
+        etf.submitToken(token_contract, token_amount, {'from': accounts[9]})
+    etf.submitMynt({'from': accounts[9], 'value': mynt_submission})
+
+    # Calibrating before the next cycle fails like the single-asset calls
+    with etf_reverts("403: User has not deposited before the previous calibration cycle"):
+        etf.calibrateMany(accounts[1], [token, second_token], True, {'from': accounts[1]})
+
+    # Move to the next calibration window
+    clock.next_window()
+
+    # Expected amounts match the single-asset views
+    expected_token_1 = etf.getUserExpectedTokenCalibration(accounts[1], token)[0]
+    expected_token_2 = etf.getUserExpectedTokenCalibration(accounts[1], second_token)[0]
+    expected_mynt = etf.getUserExpectedMyntCalibration(accounts[1])[0]
+    mynt_balance_before = accounts[1].balance()
+
+    # Calibrate every asset for user 1 in one transaction
+    tx = etf.calibrateMany(accounts[1], [token, second_token], True, {'from': accounts[1]})
+    assert token.balanceOf(accounts[1]) == expected_token_1 == token_amount//3
+    assert second_token.balanceOf(accounts[1]) == expected_token_2 == token_amount//3
+    assert accounts[1].balance() == mynt_balance_before + expected_mynt
+    assert len(tx.events["CalibrateToken"]) == 2
+    assert len(tx.events["CalibrateMynt"]) == 1
+
+    # Calibrating again in the same cycle fails
+    with etf_reverts("402: User has allocated tokens before in this calibration cycle"):
+        etf.calibrateMany(accounts[1], [second_token], False, {'from': accounts[1]})
+    with etf_reverts("402: User has allocated MYNT before in this calibration cycle"):
+        etf.calibrateMany(accounts[1], [], True, {'from': accounts[1]})
+
+    # User 2 gets the same amounts as with single-asset calls
+    expected_token_1 = etf.getUserExpectedTokenCalibration(accounts[2], token)[0]
+    etf.calibrateMany(accounts[2], [token], False, {'from': accounts[2]})
+    assert token.balanceOf(accounts[2]) == expected_token_1
+
+    # A user without deposits cannot calibrate
+    with etf_reverts("404: User has not deposited any MYNT"):
+        etf.calibrateMany(accounts[3], [token], False, {'from': accounts[3]})
+
+    # Once the window closes calibration fails
+    clock.close_window()
+    with etf_reverts("401: Calibration cycle is closed"):
+        etf.calibrateMany(accounts[2], [second_token], False, {'from': accounts[2]})
@@ -0,0 +1,52 @@
+import pytest, json, os
+from brownie import accounts, history, networkETF, ProxyAdmin, Contract
+from scripts.deploy import DeploymentPipeline, bytecode_hash
+
+INITIAL_BOND = 10**18
+
+
+def test_release_reuses_unchanged_contracts(tmp_path):
+    path = str(tmp_path / "deployments.json")
+
+    # The first release deploys everything: implementation & ProxyAdmin, then factory & proxy
+    pipeline = DeploymentPipeline(accounts[0], path)
+    factory, etf = pipeline.release()
+    assert pipeline.transactions == 4
+    assert etf.owner() == accounts[0] and etf.getTotalMyntDeposit() == INITIAL_BOND
+    assert factory.implementation() == json.load(open(path))["contracts"]["networkETF"][bytecode_hash(networkETF)]
+
+    # Nothing changed: no transaction
+    sent = len(history)
+    assert DeploymentPipeline(accounts[0], path).release() == (factory, etf)
+    assert len(history) == sent
+
+
+def test_release_upgrades_changed_implementation(tmp_path):
+    path = str(tmp_path / "deployments.json")
+    _, etf = DeploymentPipeline(accounts[0], path).release()
+    etf.deposit({"from": accounts[1], "value": 10**18})
+
+    # Forgetting the implementation looks like new bytecode: it is deployed, the proxy upgraded & the factory pointed at it
+    manifest = json.load(open(path))
+    old_implementation = manifest["contracts"].pop("networkETF")[bytecode_hash(networkETF)]
+    json.dump(manifest, open(path, "w"))
+
+    pipeline = DeploymentPipeline(accounts[0], path)
+    factory, upgraded = pipeline.release()
+    assert pipeline.transactions == 3
+    implementation = json.load(open(path))["contracts"]["networkETF"][bytecode_hash(networkETF)]
+    assert implementation != old_implementation
+    assert factory.implementation() == implementation
+    admin = Contract.from_abi("ProxyAdmin", manifest["proxies"]["networkETF"]["admin"], ProxyAdmin.abi)
+    assert admin.getProxyImplementation(etf) == implementation
+
+    # The proxy keeps its state
+    assert upgraded == etf and etf.getUserData(accounts[1])[0] == 10**18
+
+
+def test_dry_run_does_not_write_the_manifest(tmp_path):
+    path = str(tmp_path / "deployments.json")
+    pipeline = DeploymentPipeline(accounts[0], path, dry_run=True)
+    pipeline.release()
+    pipeline.report()
+    assert pipeline.gas_used > 0 and not os.path.exists(path)
@@ -0,0 +1,49 @@
+import pytest, brownie
+from brownie import accounts, chain
+from scripts.utils import etf_reverts
+
+
+def test_epoch_views(etf, clock):
+
+    # Epochs count cycle periods; the next window opens at the start of the next one
+    clock.next_window()
+    epoch = chain.time() // clock.cycle_period
+    assert etf.currentEpoch() == epoch
+    assert etf.nextWindowStart() == (epoch + 1) * clock.cycle_period
+
+    clock.close_window()
+    assert etf.currentEpoch() == epoch
+    assert etf.nextWindowStart() == (epoch + 1) * clock.cycle_period
+
+    clock.next_window(offset=0)
+    assert etf.currentEpoch() == epoch + 1
+    assert etf.isCalibrationOpen()
+
+
+def test_bonds_used_reset_per_epoch(etf, token, clock):
+
+    # Users 1 & 2 hold equal bonds next to the initial bond
+    clock.next_window(offset=0)
+    for user in accounts[1:3]:
+        etf.deposit({"from": user, "value": 5*10**18})
+    token.mint(accounts[9], 12*10**18, {'from': accounts[0]})
+    token.approve(etf.address, 12*10**18, {'from': accounts[9]})
+    etf.submitToken(token, 6*10**18, {'from': accounts[9]})
+
+    # Bonds used accumulate within an epoch: user 2 gets the same share as user 1
+    clock.next_window()
+    etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
+    etf.calibrateToken(accounts[2], token, {'from': accounts[2]})
+    assert token.balanceOf(accounts[1]) == token.balanceOf(accounts[2]) == 2*10**18
+
+    # An allocation blocks the asset until the next epoch, even once the window closed
+    clock.close_window()
+    assert etf.getUserExpectedTokenCalibration(accounts[1], token)[2].startswith("402")
+
+    # The first calibration of the next epoch starts from no bonds used
+    etf.submitToken(token, 6*10**18, {'from': accounts[9]})
+    clock.next_window()
+    assert etf.getUserExpectedTokenCalibration(accounts[1], token)[0] == 8*10**18 // 3
+    etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
+    with etf_reverts("402: User has allocated tokens before in this calibration cycle"):
+        etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
@@ -0,0 +1,81 @@
+import pytest, asyncio
+from brownie import accounts, chain, Multicall3
+from scripts.etf_client import ETFClient
+
+
+@pytest.fixture
+def client(etf):
+    return ETFClient(etf, Multicall3.deploy({"from": accounts[0]}))
+
+
+def test_client_matches_direct_calls(etf, token, client):
+    for i, user in enumerate(accounts[1:5]):
+        etf.deposit({"from": user, "value": (i + 1) * 10**18})
+    token.mint(accounts[9], 10**18, {'from': accounts[0]})
+    token.approve(etf.address, 10**18, {'from': accounts[9]})
+    etf.submitToken(token, 10**18, {'from': accounts[9]})
+
+    async def read():
+        return await asyncio.gather(
+            client.many([("getUserData", (user,)) for user in accounts[:5]]),
+            client.get_token_balance(token),
+            client.get_expected_token_calibration(accounts[1], token),
+            client.is_calibration_open(),
+        )
+
+    users, balance, expected, is_open = asyncio.run(read())
+    assert users == [etf.getUserData(user) for user in accounts[:5]]
+    assert balance == etf.getTokenBalance(token)
+    assert expected == etf.getUserExpectedTokenCalibration(accounts[1], token)
+    assert is_open == etf.isCalibrationOpen()
+
+    # One block number & one multicall for the 8 views
+    assert client.stats["calls"] == 8
+    assert client.stats["multicalls"] == 1
+    assert client.stats["rpc_calls"] == 2
+
+
+def test_client_cache(etf, client):
+    user = accounts[1]
+    etf.deposit({"from": user, "value": 10**18})
+
+    async def read(block=None):
+        return await client.many([("getUserData", (user,))] * 3, block=block)
+
+    # Repeated & duplicate reads in a block are served without another multicall
+    first = asyncio.run(read())
+    assert asyncio.run(read()) == first
+    assert client.stats["multicalls"] == 1
+    assert client.stats["cache_hits"] == 3
+
+    # A new block is a new cache key, while pinned reads keep hitting the old entry
+    block = chain.height
+    etf.deposit({"from": user, "value": 10**18})
+    client.block_ttl = 0
+    assert asyncio.run(read())[0][0] == first[0][0] + 10**18
+    assert asyncio.run(read(block)) == first
+    assert client.stats["multicalls"] == 2
+
+
+def test_client_propagates_rpc_failures(etf, client):
+
+    async def failing_block_number():
+        raise ConnectionError("node unreachable")
+
+    async def read():
+        # Bounded so that a hanging call fails the test instead of blocking it
+        return await asyncio.wait_for(client.many([("getUserData", (accounts[1],)), ("isCalibrationOpen", ())]), 10)
+
+    # Every caller of the batch gets the error
+    client.latest_block = failing_block_number
+    with pytest.raises(ConnectionError, match="node unreachable"):
+        asyncio.run(read())
+    assert client._pending == [] and client._flush_task is None
+
+    # Same for a failing multicall, & the client keeps serving once the node is back
+    del client.latest_block
+    multicall, client.multicall = client.multicall, None
+    with pytest.raises(AttributeError):
+        asyncio.run(read())
+    client.multicall = multicall
+    assert asyncio.run(read())[0] == etf.getUserData(accounts[1])
@@ -0,0 +1,98 @@
+import pytest, brownie
+from brownie import accounts, history, networkETF, networkETFFactory, Contract, web3
+from scripts.deploy import deploy_factory
+from scripts.utils import ZERO_ADDRESS
+
+CYCLE_PERIOD = 24*60*60
+CYCLE_LENGTH = 60*60
+INITIAL_BOND = 5*10**18
+
+
+@pytest.fixture(scope="module")
+def factory():
+    implementation = networkETF.deploy({'from': accounts[0]})
+    return networkETFFactory.deploy(implementation, {'from': accounts[0]})
+
+
+def create(factory, creator, salt, value=INITIAL_BOND):
+    tx = factory.createETF(salt, CYCLE_PERIOD, CYCLE_LENGTH, {'from': creator, 'value': value})
+    return Contract.from_abi("networkETF", tx.events["InstanceCreated"]["instance"], networkETF.abi), tx
+
+
+def test_create_etf(factory):
+    salt = web3.keccak(text="basket-1")
+
+    # The clone lands at the predicted address, initialized for the creator in the same transaction
+    predicted = factory.predictAddress(accounts[1], salt)
+    etf, tx = create(factory, accounts[1], salt)
+    assert etf.address == predicted
+    assert etf.owner() == accounts[1]
+    assert etf.getUserData(accounts[1])[0] == INITIAL_BOND
+    assert etf.getTotalMyntDeposit() == INITIAL_BOND
+    assert etf.balance() == INITIAL_BOND
+    assert len(tx.events["OwnershipTransferred"]) == 1
+
+    # Clones have their own storage & cannot be initialized again
+    etf.deposit({'from': accounts[2], 'value': 10**18})
+    with brownie.reverts("Initializable: contract is already initialized"):
+        etf.initialize(CYCLE_PERIOD, CYCLE_LENGTH, {'from': accounts[2], 'value': 1})
+    other, _ = create(factory, accounts[2], salt)
+    assert other.getUserData(accounts[2])[0] == INITIAL_BOND and other.getTotalMyntDeposit() == INITIAL_BOND
+
+    # Registry
+    assert factory.getTotalInstances() == 2
+    assert factory.getInstances(0, 10) == [etf, other]
+    assert factory.isInstance(etf) and not factory.isInstance(accounts[1])
+
+    # A salt is used once per creator
+    with brownie.reverts():
+        create(factory, accounts[1], salt)
+
+
+def test_clone_gas(factory):
+    # A clone costs a fraction of deploying & initializing the implementation
+    deployed = networkETF.deploy({'from': accounts[0]})
+    full_gas = deployed.tx.gas_used + deployed.initialize(CYCLE_PERIOD, CYCLE_LENGTH, {'from': accounts[0], 'value': INITIAL_BOND}).gas_used
+    _, tx = create(factory, accounts[0], web3.keccak(text="gas"))
+    assert tx.gas_used * 10 < full_gas
+
+
+def test_implementation_is_locked(factory):
+    # The factory's implementation cannot be initialized, so nobody owns it
+    implementation = networkETF.at(factory.implementation())
+    assert implementation.owner() == ZERO_ADDRESS
+    with brownie.reverts("Initializable: contract is already initialized"):
+        implementation.initialize(CYCLE_PERIOD, CYCLE_LENGTH, {'from': accounts[1], 'value': 1})
+    with brownie.reverts("Initializable: contract is already initialized"):
+        implementation.initializeFor(accounts[1], CYCLE_PERIOD, CYCLE_LENGTH, {'from': accounts[1], 'value': 1})
+
+    # An implementation someone already initialized is refused; a locked one can be set again
+    owned = networkETF.deploy({'from': accounts[0]})
+    owned.initialize(CYCLE_PERIOD, CYCLE_LENGTH, {'from': accounts[1], 'value': 1})
+    with brownie.reverts("Factory: implementation is initialized"):
+        factory.setImplementation(owned, {'from': accounts[0]})
+    factory.setImplementation(implementation, {'from': accounts[0]})
+
+
+def test_set_implementation(factory):
+    with brownie.reverts("Ownable: caller is not the owner"):
+        factory.setImplementation(accounts[1], {'from': accounts[1]})
+    with brownie.reverts("Factory: implementation is not a contract"):
+        factory.setImplementation(accounts[1], {'from': accounts[0]})
+
+    # Later clones use the new implementation; existing ones keep theirs
+    etf, _ = create(factory, accounts[0], web3.keccak(text="v1"))
+    implementation = networkETF.deploy({'from': accounts[0]})
+    factory.setImplementation(implementation, {'from': accounts[0]})
+    assert factory.predictAddress(accounts[0], web3.keccak(text="v1")) != etf.address
+    assert create(factory, accounts[0], web3.keccak(text="v2"))[1].events["InstanceCreated"]["implementation"] == implementation
+
+
+def test_deploy_pipeline_skips_unchanged(tmp_path):
+    path = str(tmp_path / "deployments.json")
+    factory = deploy_factory(accounts[0], path)
+
+    # Nothing changed: the same factory & implementation are reused without a transaction
+    sent = len(history)
+    assert deploy_factory(accounts[0], path).address == factory.address
+    assert len(history) == sent
@@ -0,0 +1,29 @@
+import pytest, brownie
+from brownie import accounts, history, web3
+from scripts.utils import fund_accounts
+
+
+def test_fund_accounts(etf, token):
+
+    # 1,000 holders are funded & approved in 10 transactions instead of 2,000
+    holders = [web3.toChecksumAddress(f"0x{i + 1:040x}") for i in range(1_000)]
+    sent = len(history)
+    fund_accounts(token, accounts[0], holders, 10**18, spender=etf)
+    assert len(history) - sent == 10
+    assert token.balanceOf(holders[0]) == token.balanceOf(holders[-1]) == 10**18
+    assert token.allowance(holders[-1], etf) == 2**256 - 1
+    assert token.totalSupply() == 1_000 * 10**18
+
+    # Funded accounts can submit without approving
+    fund_accounts(token, accounts[0], [accounts[9]], 10**18, spender=etf)
+    etf.submitToken(token, 10**18, {'from': accounts[9]})
+    assert etf.getTokenBalance(token) == 10**18
+
+
+def test_batch_entry_points_are_owner_only(token):
+    with brownie.reverts("Ownable: caller is not the owner"):
+        token.mintBatch([accounts[1]], [1], {'from': accounts[1]})
+    with brownie.reverts("Ownable: caller is not the owner"):
+        token.approveBatch([accounts[0]], accounts[1], 1, {'from': accounts[1]})
+    with brownie.reverts("Token: length mismatch"):
+        token.mintBatch([accounts[1]], [1, 2], {'from': accounts[0]})
@@ -0,0 +1,18 @@
+import pytest
+from scripts.gas_benchmark import BASELINE_PATH, compare, load_baseline, main, missing_entries
+
+
+def test_missing_baseline_skips_the_check(tmp_path, capsys):
+
+    # No baseline recorded yet: nothing to compare, so the check is skipped rather than failed
+    assert load_baseline(str(tmp_path / "gas_baseline.json")) == {}
+    if not load_baseline(BASELINE_PATH):
+        assert main() is None
+        assert "check skipped" in capsys.readouterr().out
+
+
+def test_compare_reports_regressions_and_missing_entries():
+    baseline = {"deposit:first:users=1": 100, "withdraw:full:users=1": 100}
+    results = {"deposit:first:users=1": 106, "withdraw:full:users=1": 104, "submitMynt:first:users=1": 50}
+    assert compare(results, baseline, 5) == [("deposit:first:users=1", 100, 106)]
+    assert missing_entries(results, baseline) == ["submitMynt:first:users=1"]
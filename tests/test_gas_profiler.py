@@ -0,0 +1,29 @@
+import pytest
+from brownie import accounts
+from scripts.gas_profiler import collapse, step_costs, top
+
+
+def test_profile_calibrate_token(etf, token, clock):
+
+    clock.next_window(offset=0)
+    etf.deposit({"from": accounts[1], "value": 10**18})
+    token.mint(accounts[9], 10**18, {'from': accounts[0]})
+    token.approve(etf.address, 10**18, {'from': accounts[9]})
+    etf.submitToken(token, 10**18, {'from': accounts[9]})
+    clock.next_window()
+    tx = etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
+
+    # Every step is charged once: the costs add up to the gas the execution used
+    trace = tx.trace
+    assert sum(step_costs(trace)) == trace[0]["gas"] - trace[-1]["gas"] + trace[-1]["gasCost"]
+
+    # Stacks start at the entry point & include the token transfer as a call frame
+    stacks = collapse(tx)
+    assert sum(stacks.values()) == sum(step_costs(trace))
+    assert all(stack.startswith("networkETF.calibrateToken") for stack in stacks)
+    assert any(frame.endswith(".transfer") for stack in stacks for frame in stack.split(";")[1:])
+
+    # Opcode leaves split the same gas further
+    assert sum(collapse(tx, opcodes=True).values()) == sum(stacks.values())
+    report = top(stacks, 5)
+    assert len(report) == 5 and all(inclusive >= own for _, own, inclusive in report)
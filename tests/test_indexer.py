@@ -0,0 +1,104 @@
+import pytest
+from brownie import accounts
+from scripts.indexer import EventIndexer
+from scripts.utils import ZERO_ADDRESS
+
+
+def test_indexer(etf, token, clock, tmp_path):
+
+    # Move to the start of a calibration window
+    clock.next_window(offset=0)
+
+    # Deposit, withdraw & submit a token & MYNT
+    etf.deposit({"from": accounts[1], "value": 5*10**18})
+    etf.deposit({"from": accounts[2], "value": 5*10**18})
+    etf.withdraw(10**18, {"from": accounts[2]})
+    token.mint(accounts[9], 2*10**18, {'from': accounts[0]})
+    token.approve(etf.address, 2*10**18, {'from': accounts[9]})
+    etf.submitToken(token, 2*10**18, {'from': accounts[9]})
+    etf.submitMynt({'from': accounts[9], 'value': 3*10**18})
+
+    # Index in small pages
+    db_path = tmp_path / "events.sqlite"
+    indexer = EventIndexer(etf, str(db_path), clock.cycle_period, batch_size=2)
+    assert indexer.sync() > 0
+
+    # Calibrate in the next window & resume from the checkpoint with a new indexer
+    clock.next_window()
+    etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
+    tx = etf.calibrateMynt(accounts[1], {'from': accounts[1]})
+    indexer = EventIndexer(etf, str(db_path), clock.cycle_period, batch_size=2)
+    assert indexer.sync() == 2
+
+    # Indexed state matches the contract
+    for user in accounts[:3]:
+        assert indexer.get_deposit(user.address) == etf.getUserData(user)[0]
+    assert indexer.get_asset(token.address)[0] == etf.getTokenBalance(token)
+    assert indexer.get_asset(ZERO_ADDRESS)[0] == etf.getMyntBalance()
+    assert sorted(indexer.get_users()) == sorted(a.address for a in accounts[:3])
+
+    # Both calibrations used user 1's bonds in this cycle
+    cycle = tx.timestamp // clock.cycle_period
+    assert indexer.get_cycle_usage(cycle, token.address) == (5*10**18, 2*10**18 - etf.getTokenBalance(token), 1)
+    assert indexer.get_cycle_usage(cycle, ZERO_ADDRESS)[0] == 5*10**18
+
+    # Syncing again indexes nothing twice
+    assert indexer.sync() == 0
+
+
+def test_indexer_keeps_claims_out_of_cycles(etf, token, clock, tmp_path):
+
+    # Users 1 & 2 hold bonds when the accumulator is enabled & a token & MYNT are submitted
+    etf.deposit({"from": accounts[1], "value": 5*10**18})
+    etf.deposit({"from": accounts[2], "value": 10*10**18})
+    etf.addAccumulatorAsset(token, {'from': accounts[0]})
+    clock.close_window()
+    etf.pause({'from': accounts[0]})
+    etf.enableAccumulator({'from': accounts[0]})
+    etf.unpause({'from': accounts[0]})
+    token.mint(accounts[9], 4*10**18, {'from': accounts[0]})
+    token.approve(etf.address, 4*10**18, {'from': accounts[9]})
+    etf.submitToken(token, 4*10**18, {'from': accounts[9]})
+    etf.submitMynt({'from': accounts[9], 'value': 2*10**18})
+
+    # Claims inside & outside a calibration window
+    token_claim = etf.claimToken(accounts[1], token, {'from': accounts[1]}).events["Claim"]["amount"]
+    clock.next_window()
+    tx = etf.claimMynt(accounts[2], {'from': accounts[2]})
+    etf.claimToken(accounts[1], token, {'from': accounts[1]})
+
+    indexer = EventIndexer(etf, str(tmp_path / "events.sqlite"), clock.cycle_period)
+    indexer.sync()
+
+    # Claims have their own table & still move the asset balances
+    assert indexer.get_claims(accounts[1].address, token.address) == (token_claim, 2)
+    assert indexer.get_claims(accounts[2].address, ZERO_ADDRESS) == (tx.events["Claim"]["amount"], 1)
+    assert indexer.get_asset(token.address)[0] == etf.getTokenBalance(token)
+    assert indexer.get_asset(ZERO_ADDRESS)[0] == etf.getMyntBalance()
+
+    # They are not calibrations: no cycle usage & no allocation
+    cycle = tx.timestamp // clock.cycle_period
+    assert indexer.get_cycle_usage(cycle, ZERO_ADDRESS) == (0, 0, 0)
+    assert indexer.get_cycle_usage(cycle, token.address) == (0, 0, 0)
+    assert indexer.db.execute("SELECT COUNT(*) FROM allocations").fetchone()[0] == 0
+    assert indexer.db.execute("SELECT COUNT(*) FROM events WHERE event = 'Claim'").fetchone()[0] == 3
+
+
+def test_indexer_batched_withdrawals(etf, tmp_path):
+
+    # A custodian pays out three clients in one call, & a client credited by depositFor withdraws itself
+    etf.depositFor(accounts[1:3], [10**18, 2*10**18], {"from": accounts[5], "value": 3*10**18})
+    etf.deposit({"from": accounts[5], "value": 10*10**18})
+    tx = etf.withdrawTo(accounts[6:9], [10**18, 2*10**18, 3*10**18], {"from": accounts[5]})
+    etf.withdraw(10**18, {"from": accounts[2]})
+
+    indexer = EventIndexer(etf, str(tmp_path / "events.sqlite"))
+    indexer.sync()
+
+    # Only the custodian is debited, once, by the total; recipients hold no bonds
+    rows = indexer.db.execute("SELECT user, amount FROM events WHERE event = 'Withdraw' AND block = ?", (tx.block_number,)).fetchall()
+    assert rows == [(accounts[5].address, str(6*10**18))]
+    for user in [accounts[0], accounts[1], accounts[2], accounts[5]] + list(accounts[6:9]):
+        assert indexer.get_deposit(user.address) == etf.getUserData(user)[0]
+    assert indexer.get_deposit(accounts[5].address) == 4*10**18
+    assert sorted(indexer.get_users()) == sorted(a.address for a in [accounts[0], accounts[1], accounts[2], accounts[5]])
@@ -0,0 +1,49 @@
+import pytest, brownie
+from brownie import accounts
+from scripts.keeper import Keeper
+
+
+def test_keeper_calibrates_eligible_users(etf, token, clock):
+
+    # Move to the start of a calibration window
+    clock.next_window(offset=0)
+
+    # Define variables
+    deposit_amount = 5*10**18
+    token_amount = 3*10**18
+    mynt_submission = 3*10**18
+
+    # Deposit as users 1-4 & submit a token and MYNT
+    for i in range(1, 5):
+        etf.deposit({"from": accounts[i], "value": deposit_amount})
+    token.mint(accounts[9], token_amount, {'from': accounts[0]})
+    token.approve(etf.address, token_amount, {'from': accounts[9]})
+    etf.submitToken(token, token_amount, {'from': accounts[9]})
+    etf.submitMynt({'from': accounts[9], 'value': mynt_submission})
+
+    # Nobody is eligible in the window they deposited in; pages of 2 users split the 5 depositors across pages
+    keeper = Keeper(etf, accounts[8], clock.cycle_period, clock.cycle_length, workers=4, page_size=2)
+    assert keeper.run_once()["calibrated"] == 0
+
+    # Every depositor (including the initial bond) is calibrated in the next window
+    clock.next_window()
+    summary = keeper.run_once()
+    assert summary == {"calibrated": 5, "skipped": 0, "failed": 0}
+    for i in range(1, 5):
+        assert token.balanceOf(accounts[i]) > 0
+    assert token.balanceOf(accounts[0]) > 0
+
+    # Nothing is left to calibrate in the same window
+    assert keeper.run_once()["calibrated"] == 0
+
+    # A user who deposits again loses eligibility for the next window only
+    etf.deposit({"from": accounts[1], "value": deposit_amount})
+    token.mint(accounts[9], token_amount, {'from': accounts[0]})
+    token.approve(etf.address, token_amount, {'from': accounts[9]})
+    etf.submitToken(token, token_amount, {'from': accounts[9]})
+    clock.next_window()
+    assert keeper.run_once()["calibrated"] == 4
+
+    # Outside the window nothing is sent
+    clock.close_window()
+    assert keeper.run_once()["calibrated"] == 0
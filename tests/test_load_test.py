@@ -0,0 +1,29 @@
+import pytest, asyncio
+from scripts.load_test import LoadGenerator, parse_mix, percentile, setup, summarize
+
+
+def test_summarize():
+    assert parse_mix("deposit=4, withdraw=1") == {"deposit": 4, "withdraw": 1}
+    assert percentile([3, 1, 2], 50) == 2 and percentile([], 99) is None
+
+    row = {"sender": "0x0", "sent": 0, "reason": ""}
+    results = [
+        {**row, "operation": "deposit", "latency": 1.0, "status": 1, "gas": 50_000, "block": 1},
+        {**row, "operation": "deposit", "latency": 3.0, "status": 1, "gas": 70_000, "block": 1},
+        {**row, "operation": "withdraw", "latency": 2.0, "status": 0, "gas": 30_000, "block": 2, "reason": "400: Insufficient balance"},
+        {**row, "operation": "withdraw", "latency": None, "status": 0, "gas": None, "block": None, "reason": "CalibrationClosed"},
+    ]
+    summaries = {s["operation"]: s for s in summarize(results, 2)}
+    assert summaries["deposit"]["tps"] == 1 and summaries["deposit"]["gas_mean"] == 60_000
+    assert summaries["deposit"]["txs_per_block_max"] == 2
+    assert summaries["withdraw"]["confirmed"] == 0 and summaries["withdraw"]["reverted"] == 2
+    assert summaries["withdraw"]["reverts_by_reason"] == "400: Insufficient balance: 50.0%; CalibrationClosed: 50.0%"
+    assert summaries["all"]["sent"] == 4 and summaries["all"]["latency_p50"] == 2.0
+
+
+def test_load_run():
+    # A short run with a block per transaction exercises every operation end to end
+    etf, tokens, senders = setup(3)
+    rows = asyncio.run(LoadGenerator(etf, tokens, senders, "deposit=1,calibrateToken=1").run(2))
+    assert rows and {row["operation"] for row in rows} <= {"deposit", "calibrateToken"}
+    assert any(row["status"] == 1 for row in rows)
@@ -0,0 +1,127 @@
+import pytest, brownie
+from brownie import accounts, MathHarness
+from brownie.test import given, strategy
+from scripts.generate_space_table import SCALE, max_space, mul_div_fixed_point, price
+
+# The value-type math must round exactly like the struct based math it replaced, for less gas
+
+MAX_WHOLE = (2**256 - 1) // 10**18
+
+
+@pytest.fixture(scope="module")
+def harness():
+    return MathHarness.deploy({"from": accounts[0]})
+
+
+def assert_same(new, legacy, *args):
+    result = new(*args)
+    assert result == legacy(*args)
+
+    new_gas, legacy_gas = new.estimate_gas(*args), legacy.estimate_gas(*args)
+    assert new_gas <= legacy_gas
+    return result, legacy_gas - new_gas
+
+
+@given(
+    user_bonds=strategy("uint96", min_value=1),
+    balance=strategy("uint128"),
+    others=strategy("uint96"),
+    bonds_used=strategy("uint96"),
+)
+def test_calibration_amount(harness, user_bonds, balance, others, bonds_used):
+    # Same bounds as the packed storage: bonds used never exceed the deposit minus the calibrating user
+    deposited = user_bonds + others + bonds_used
+    assert_same(harness.calibrationAmount, harness.legacyCalibrationAmount, user_bonds, balance, deposited, bonds_used)
+
+
+@pytest.mark.parametrize("number", [0, 1, 10**18 - 1, 10**18, 123456789 * 10**18 + 7, MAX_WHOLE])
+def test_from_base(harness, number):
+    result, _ = assert_same(harness.fromBase, harness.legacyFromBase, number)
+    assert result == number
+
+
+def test_from_base_overflow(harness):
+    # The identity fast path keeps the bound fromUint used to enforce
+    with brownie.reverts():
+        harness.fromBase(MAX_WHOLE + 1)
+    with brownie.reverts():
+        harness.legacyFromBase(MAX_WHOLE + 1)
+
+
+@pytest.mark.parametrize("decimals", [0, 6, 8, 17, 18, 24, 36])
+@pytest.mark.parametrize("number", [0, 1, 999_999, 10**24 + 3, MAX_WHOLE])
+def test_from_decimal(harness, number, decimals):
+    assert_same(harness.fromDecimal, harness.legacyFromDecimal, number, decimals)
+
+
+MAX_SPACE = max_space()
+BIT_EDGES = sorted({s for i in range(21) for s in (2**i - 1, 2**i, 2**i + 1) if s <= MAX_SPACE} | {MAX_SPACE})
+
+
+@pytest.mark.parametrize("space", BIT_EDGES + [-s for s in BIT_EDGES])
+def test_price_from_space(harness, space):
+    # The table gives powu's result to the wei, with the same inversion of negative spaces
+    result = harness.priceFromSpace(space)
+    assert result == harness.legacyPriceFromSpace(space) == price(space)
+
+    # The table is cheaper once powu needs more than a few squarings
+    if abs(space) >= 2**8:
+        assert harness.priceFromSpace.estimate_gas(space) < harness.legacyPriceFromSpace.estimate_gas(space)
+
+
+@given(space=strategy("int256", min_value=-MAX_SPACE, max_value=MAX_SPACE))
+def test_price_from_space_fuzz(harness, space):
+    assert harness.priceFromSpace(space) == harness.legacyPriceFromSpace(space)
+
+
+def test_price_from_space_bounds(harness):
+    # Out of range spaces revert up front, where powu would overflow
+    for space in [MAX_SPACE + 1, -MAX_SPACE - 1]:
+        with brownie.reverts():
+            harness.priceFromSpace(space)
+        with brownie.reverts():
+            harness.legacyPriceFromSpace(space)
+
+    # Gas is bounded by the all-bits-set case instead of growing with |space|
+    worst = harness.priceFromSpace.estimate_gas(-(2**20 - 1))
+    assert all(harness.priceFromSpace.estimate_gas(space) <= worst for space in BIT_EDGES)
+
+
+def calibration_amount(bonds, balance, deposited, bonds_used):
+    # bonds * balance / (deposited - bonds_used) in 60.18: mul rounds half up, div rounds down
+    return mul_div_fixed_point(bonds, balance) * SCALE // (deposited - bonds_used)
+
+
+def test_calibrations_match_model(etf, token, clock):
+    # Odd amounts so every calibration rounds, & each one uses the bonds the ones before it used
+    deposits = {accounts[1]: 123456789012345678, accounts[2]: 3*10**18 + 1, accounts[3]: 10**15 + 7}
+    token_balance, mynt_balance = 10**21 + 3, 777777777777777777
+
+    clock.next_window(offset=0)
+    for user, amount in deposits.items():
+        etf.deposit({"from": user, "value": amount})
+    token.mint(accounts[9], token_balance, {'from': accounts[0]})
+    token.approve(etf, token_balance, {'from': accounts[9]})
+    etf.submitToken(token, token_balance, {'from': accounts[9]})
+    etf.submitMynt({'from': accounts[9], 'value': mynt_balance})
+    deposits[accounts[0]] = etf.getUserData(accounts[0])[0]
+    deposited = etf.getTotalMyntDeposit()
+    assert deposited == sum(deposits.values())
+
+    clock.next_window()
+    bonds_used = 0
+    for user in [accounts[2], accounts[0], accounts[3], accounts[1]]:
+        bonds = deposits[user]
+        expected_token = calibration_amount(bonds, token_balance, deposited, bonds_used)
+        expected_mynt = calibration_amount(bonds, mynt_balance, deposited, bonds_used)
+
+        tx = etf.calibrateToken(user, token, {'from': user})
+        assert tx.events["CalibrateToken"]["amount"] == expected_token
+        tx = etf.calibrateMynt(user, {'from': user})
+        assert tx.events["CalibrateMynt"]["amount"] == expected_mynt
+
+        token_balance -= expected_token
+        mynt_balance -= expected_mynt
+        bonds_used += bonds
+        assert etf.getTokenBalance(token) == token_balance
+        assert etf.getMyntBalance() == mynt_balance
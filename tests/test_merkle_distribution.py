@@ -0,0 +1,50 @@
+import pytest, brownie
+from brownie import accounts
+from scripts.merkle import MerkleTree, build_from_chain, leaf, verify
+
+
+def test_merkle_tree():
+    # Proofs verify for every leaf, including the unpaired last one
+    leaves = [leaf(i, accounts[i].address, 10**18 * i) for i in range(5)]
+    tree = MerkleTree(leaves)
+    for i, proof in enumerate(tree.proofs()):
+        assert verify(proof, tree.root, leaves[i])
+    assert not verify(tree.proof(0), tree.root, leaves[1])
+
+
+def test_merkle_distribution(etf, token, clock):
+
+    # Users 1-3 hold bonds next to the initial 5 MYNT bond
+    for i, user in enumerate(accounts[1:4]):
+        etf.deposit({"from": user, "value": (i + 1) * 5*10**18})
+    token.mint(accounts[9], 9*10**18, {'from': accounts[0]})
+    token.approve(etf.address, 9*10**18, {'from': accounts[9]})
+    etf.submitToken(token, 9*10**18, {'from': accounts[9]})
+
+    # Build the allocations from on-chain bonds & reserve them
+    distribution = build_from_chain(etf, 6*10**18)
+    assert 6*10**18 - 4 <= distribution["total"] <= 6*10**18
+    with brownie.reverts("Ownable: caller is not the owner"):
+        etf.publishMerkleRoot(token, 1, distribution["total"], distribution["root"], {'from': accounts[1]})
+    with brownie.reverts("413: Distribution exceeds the token balance"):
+        etf.publishMerkleRoot(token, 1, 10*10**18, distribution["root"], {'from': accounts[0]})
+    tx = etf.publishMerkleRoot(token, 1, distribution["total"], distribution["root"], {'from': accounts[0]})
+    distribution_id = tx.events["MerkleRootPublished"]["distributionId"]
+    assert etf.getTokenBalance(token) == 9*10**18 - distribution["total"]
+
+    # A proof only pays the allocation it was built for
+    claim = distribution["claims"][accounts[1].address]
+    with brownie.reverts("412: Invalid Merkle proof"):
+        etf.claimMerkle(distribution_id, claim["index"], accounts[1], claim["amount"] + 1, claim["proof"], {'from': accounts[1]})
+
+    # Everyone claims their share of the bonds, once
+    for user in accounts[:4]:
+        claim = distribution["claims"][user.address]
+        etf.claimMerkle(distribution_id, claim["index"], user, claim["amount"], claim["proof"], {'from': accounts[8]})
+        assert token.balanceOf(user) == claim["amount"]
+        assert etf.isMerkleClaimed(distribution_id, claim["index"])
+    assert token.balanceOf(accounts[3]) == 6*10**18 * 15 // 35
+
+    with brownie.reverts("411: Allocation has already been claimed"):
+        etf.claimMerkle(distribution_id, claim["index"], user, claim["amount"], claim["proof"], {'from': accounts[8]})
+    assert etf.getMerkleDistribution(distribution_id)[2] == 0
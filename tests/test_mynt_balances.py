@@ -1,24 +1,12 @@
-import pytest, brownie, time 
-from brownie import accounts, networkETF, Token
+import pytest, brownie
+from brownie import accounts
+from scripts.utils import etf_reverts
 
 
-def deploy_etf(cycle_period = 24*60*60, cycle_length = 60*60, bond_amount =100):
-    # deploy etf
-    etf_contract = networkETF.deploy({'from': accounts[0]})
-    etf_contract.initialize(cycle_period, cycle_length, {'from': accounts[0], 'value':bond_amount})
-    return etf_contract
+def test_multi_user_mynt_interactions(etf, clock):
 
-def deploy_token():
-    # deploy token
-    token_contract = Token.deploy({'from': accounts[0]})
-    token_contract.initialize({'from': accounts[0]})
-    return token_contract
-
-def test_multi_user_mynt_interactions():
-
-    # Wait for the start of a 10 second period so that the calibrate function can be called
-    while int(time.time()%10) != 0:
-        time.sleep(0.1)
+    # Move to the start of a calibration window so that the calibrate function can be called
+    clock.next_window(offset=0)
 
     # Define variables
     initial_deposit = 5*10**18
@@ -27,8 +15,7 @@ def test_multi_user_mynt_interactions():
     user_2_deposit_amount = 2*10**18
 
     # Define contracts
-    etf_contract = deploy_etf(10, 5, initial_deposit)
-    token_1_contract = deploy_token()
+    etf_contract = etf
 
     # Deposit as user 1
     assert accounts[1].balance() == 100*10**18
@@ -42,9 +29,8 @@ def test_multi_user_mynt_interactions():
     # Submit MYNT to the ETF
     etf_contract.submitMynt({'from':accounts[9], 'value':mynt_submission})
 
-    # Wait for 5 seconds as this calibration cycle ends
-    time.sleep(5)
-    token_1_contract.setTest(True)
+    # Move past the end of this calibration window
+    clock.close_window()
     
     # Deposit as user 2
     assert accounts[2].balance() == 100*10**18
@@ -55,9 +41,8 @@ def test_multi_user_mynt_interactions():
     user_2_deposit_by_contract, user_2_last_updated_by_contract = etf_contract.getUserData(accounts[2])
     assert user_2_deposit_by_contract == user_2_deposit_amount
 
-    # Wait for 5 seconds as this calibration cycle starts
-    time.sleep(5)
-    token_1_contract.setTest(False)
+    # Move to the next calibration window
+    clock.next_window()
 
     # Calibrate as user 1
     amount_withdrawable_1, can_withdraw_1, reason = etf_contract.getUserExpectedMyntCalibration(accounts[1])
@@ -67,7 +52,7 @@ def test_multi_user_mynt_interactions():
     assert accounts[1].balance() == 100*10**18 - user_1_deposit_amount + amount_withdrawable_1 
 
     # Attempt to calibrate as user 2 fails
-    with brownie.reverts("403: User has not deposited before the previous calibration cycle"):
+    with etf_reverts("403: User has not deposited before the previous calibration cycle"):
         etf_contract.calibrateMynt(accounts[2], {'from': accounts[2]})
     
     # Check how much user 2 is expected to withdraw in the next calibration cycle
@@ -76,17 +61,15 @@ def test_multi_user_mynt_interactions():
     assert amount_withdrawable_2 == (mynt_submission)*2/(5+5+2)
 
     # User 1 should not be able to calibrate again
-    with brownie.reverts("402: User has allocated MYNT before in this calibration cycle"):
+    with etf_reverts("402: User has allocated MYNT before in this calibration cycle"):
         etf_contract.calibrateMynt(accounts[1], {'from': accounts[1]})
 
-    # Wait for 5 seconds and then isCalibrateOpen should return false
-    time.sleep(5)
-    token_1_contract.setTest(True)
+    # Once the window closes isCalibrateOpen should return false
+    clock.close_window()
     assert etf_contract.isCalibrationOpen() == False
 
-    # Wait for an additional 5 seconds and then isCalibrateOpen should return true
-    time.sleep(5)
-    token_1_contract.setTest(False)
+    # In the next calibration window isCalibrateOpen should return true
+    clock.next_window()
     assert etf_contract.isCalibrationOpen() == True
 
     # User 2 should be able to calibrate; add leeway for check due to accuracy loss
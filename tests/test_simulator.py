@@ -0,0 +1,65 @@
+import pytest
+from brownie import accounts
+
+np = pytest.importorskip("numpy")
+from scripts.simulator import CalibrationSimulator, differential, div, mul, MYNT
+
+
+def test_simulator_matches_contract(etf, token, second_token, clock):
+    # Random scenarios replayed on the contract & the simulator agree to the wei
+    assert differential(etf, [token, second_token], accounts[1:6], clock, rounds=3, seed=1) == []
+
+
+def test_pro_rata_cycles():
+    sim = CalibrationSimulator(3, 1, 24*60*60, 60*60)
+    sim.deposit([0, 1, 2], [10**18, 2*10**18, 3*10**18], 0)
+    sim.submit(0, 6*10**18)
+    sim.submit(MYNT, 7)
+
+    # Every user gets their share of the token; the order only moves rounding wei around
+    allocated = sim.run_cycles(2, order="random", rng=np.random.default_rng(0))
+    assert allocated[0, 0] == 6*10**18 and allocated[0, 1] == 0
+    assert sum(allocated[MYNT]) <= 7
+    assert (sim.balances >= 0).all()
+
+    # Everyone already calibrated in the last cycle, until the next epoch starts
+    last_window = sim.asset_epoch.max() * sim.cycle_period
+    assert (sim.reasons([0, 1, 2], last_window + sim.cycle_length // 2)[:, 0] == 402).all()
+    assert (sim.reasons([0, 1, 2], last_window + sim.cycle_period - 1)[:, 0] == 402).all()
+    assert (sim.reasons([0, 1, 2], last_window + sim.cycle_period)[:, 0] == 0).all()
+
+
+def sequential_calibrations(bonds, balance, unused):
+    # The contract's arithmetic, one calibration at a time
+    amounts = []
+    for b in bonds:
+        amount = div(mul(b, balance), unused) if b else 0
+        amounts.append(amount)
+        balance, unused = balance - amount, unused - b
+    return amounts
+
+
+def test_vectorized_block_matches_sequential_calibrations():
+    # Users deposit over several epochs & some calibrate MYNT first, so eligibility differs per user & asset
+    rng = np.random.default_rng(0)
+    n_users, cycle_period, cycle_length = 500, 24*60*60, 60*60
+    sim = CalibrationSimulator(n_users, 2, cycle_period, cycle_length)
+    for user in range(n_users):
+        sim.deposit([user], [int(rng.integers(1, 10**6)) * 10**int(rng.integers(9, 16))], int(rng.integers(0, 3)) * cycle_period)
+    sim.submit(0, 10**24 + 12345)
+    sim.submit(1, 3*10**21 + 7)
+    sim.submit(MYNT, 5*10**20 + 1)
+    window = 4 * cycle_period + cycle_length // 2
+    sim.calibrate(np.flatnonzero(rng.random(n_users) < 0.2), window, assets=[MYNT])
+
+    # Every user of the block in a random order, checked to the wei against the calibrations one by one
+    order = rng.permutation(n_users)
+    bonds_used, unused = sim._available(window + 1)
+    eligible = sim.reasons(order, window + 1) == 0
+    balances = sim.balances.copy()
+    amounts = sim.calibrate(order, window + 1)
+    for a in range(len(balances)):
+        bonds = [sim.deposits[user] if eligible[i, a] else 0 for i, user in enumerate(order)]
+        assert list(amounts[:, a]) == sequential_calibrations(bonds, balances[a], unused[a])
+        assert sim.balances[a] == balances[a] - sum(amounts[:, a])
+        assert sim.bonds_used[a] == bonds_used[a] + sum(bonds)
@@ -0,0 +1,173 @@
+import pytest, brownie, csv, os
+from brownie import accounts, Token
+from brownie.test import state_machine, strategy
+from scripts.utils import etf_reverts, fund_accounts
+
+# Random sequences of deposits, withdrawals, submissions & calibrations over time-warped cycles, with invariants
+# checked after every step & gas recorded as the population grows. The defaults keep CI fast; scale with e.g.
+#   ETF_STRESS_USERS=2000 ETF_STRESS_TOKENS=200 ETF_STRESS_STEPS=400 brownie test tests/test_stateful_stress.py -s
+# ETF_STRESS_REPORT=<path> writes every (call, users, tokens, gas) row as CSV & prints the gas growth per call.
+
+MAX_USERS = int(os.environ.get("ETF_STRESS_USERS", 100))
+MAX_TOKENS = int(os.environ.get("ETF_STRESS_TOKENS", 10))
+USERS_PER_STEP = int(os.environ.get("ETF_STRESS_GROWTH", 20))
+SETTINGS = {
+    "stateful_step_count": int(os.environ.get("ETF_STRESS_STEPS", 40)),
+    "max_examples": int(os.environ.get("ETF_STRESS_EXAMPLES", 3)),
+}
+
+USER_FUNDS = 10**17
+PROVIDER_FUNDS = 10**30
+
+# Per call gas may not grow by more than this between the smallest & the largest population
+GAS_GROWTH_TOLERANCE = 1.1
+GAS_GROWTH_SLACK = 5_000
+
+
+class StressMachine:
+
+    st_index = strategy("uint16")
+    st_amount = strategy("uint", min_value=10**12, max_value=10**16)
+    st_fraction = strategy("uint8", min_value=1)
+
+    def __init__(cls, etf, clock, gas):
+        cls.etf, cls.clock, cls.gas = etf, clock, gas
+        cls.owner, cls.provider, cls.funders = accounts[0], accounts[9], accounts[1:9]
+
+    def setup(self):
+        self.users = []
+        self.tokens = []
+
+    def _record(self, fn, tx):
+        self.gas.append((fn, len(self.users), len(self.tokens), tx.gas_used))
+
+    def _user(self, index):
+        return self.users[index % len(self.users)] if self.users else None
+
+    def _token(self, index):
+        return self.tokens[index % len(self.tokens)] if self.tokens else None
+
+    ############################################################################
+    # Population & time
+
+    def rule_add_users(self, st_amount):
+        for _ in range(min(USERS_PER_STEP, MAX_USERS - len(self.users))):
+            user = accounts.add()
+            self.funders[len(self.users) % len(self.funders)].transfer(user, USER_FUNDS)
+            self.etf.deposit({"from": user, "value": st_amount})
+            self.users.append(user)
+
+    def rule_add_token(self, st_amount):
+        if len(self.tokens) >= MAX_TOKENS:
+            return
+        token = Token.deploy({"from": self.owner})
+        token.initialize({"from": self.owner})
+        fund_accounts(token, self.owner, [self.provider], PROVIDER_FUNDS, spender=self.etf)
+        self._record("submitToken:first", self.etf.submitToken(token, st_amount, {"from": self.provider}))
+        self.tokens.append(token)
+
+    def rule_next_window(self):
+        self.clock.next_window()
+
+    def rule_close_window(self):
+        self.clock.close_window()
+
+    ############################################################################
+    # ETF calls
+
+    def rule_deposit(self, st_index, st_amount):
+        user = self._user(st_index)
+        if user is None or user.balance() < st_amount:
+            return
+        self._record("deposit", self.etf.deposit({"from": user, "value": st_amount}))
+
+    def rule_withdraw(self, st_index, st_fraction):
+        user = self._user(st_index)
+        amount = self.etf.getUserData(user)[0] * st_fraction // 255 if user else 0
+        if amount == 0:
+            return
+        self._record("withdraw", self.etf.withdraw(amount, {"from": user}))
+
+    def rule_submit_token(self, st_index, st_amount):
+        token = self._token(st_index)
+        if token is not None:
+            self._record("submitToken", self.etf.submitToken(token, st_amount, {"from": self.provider}))
+
+    def rule_submit_mynt(self, st_amount):
+        self._record("submitMynt", self.etf.submitMynt({"from": self.provider, "value": st_amount}))
+
+    def rule_calibrate_token(self, st_index):
+        user, token = self._user(st_index), self._token(st_index // 7)
+        if user is None or token is None:
+            return
+
+        # Calibrations pay what the view promised, or revert with the reason it gave
+        amount, can_calibrate, reason = self.etf.getUserExpectedTokenCalibration(user, token)
+        if not can_calibrate:
+            with etf_reverts(reason):
+                self.etf.calibrateToken(user, token, {"from": user})
+            return
+        before = token.balanceOf(user)
+        self._record("calibrateToken", self.etf.calibrateToken(user, token, {"from": user}))
+        assert token.balanceOf(user) - before == amount
+
+    def rule_calibrate_mynt(self, st_index):
+        user = self._user(st_index)
+        if user is None:
+            return
+
+        amount, can_calibrate, reason = self.etf.getUserExpectedMyntCalibration(user)
+        if not can_calibrate:
+            with etf_reverts(reason):
+                self.etf.calibrateMynt(user, {"from": user})
+            return
+        tx = self.etf.calibrateMynt(user, {"from": user})
+        self._record("calibrateMynt", tx)
+        assert tx.events["CalibrateMynt"]["amount"] == amount
+
+    ############################################################################
+    # Invariants
+
+    def invariant_balances_are_covered(self):
+        assert self.etf.balance() >= self.etf.getMyntBalance() + self.etf.getTotalMyntDeposit()
+        if self.tokens:
+            for token, balance in zip(self.tokens, self.etf.getTokenBalances(self.tokens)):
+                assert token.balanceOf(self.etf) >= balance
+
+    def invariant_deposits_add_up(self):
+        deposits, _ = self.etf.getUsersData([self.owner] + self.users)
+        assert self.etf.getTotalMyntDeposit() == sum(deposits)
+
+
+def gas_growth(rows, dimension):
+    """{call: (max gas in the smallest third, max gas in the largest third)} of the population `dimension` (1 users, 2 tokens)."""
+    growth = {}
+    for fn in sorted({row[0] for row in rows}):
+        sizes = sorted(row[dimension] for row in rows if row[0] == fn)
+        low, high = sizes[len(sizes) // 3], sizes[-(len(sizes) // 3) - 1]
+        if low == high:
+            continue
+        growth[fn] = (
+            max(row[3] for row in rows if row[0] == fn and row[dimension] <= low),
+            max(row[3] for row in rows if row[0] == fn and row[dimension] >= high),
+        )
+    return growth
+
+
+def test_stateful_stress(etf, clock):
+    gas = []
+    state_machine(StressMachine, etf, clock, gas, settings=SETTINGS)
+
+    report = os.environ.get("ETF_STRESS_REPORT")
+    if report:
+        with open(report, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["call", "users", "tokens", "gas"])
+            writer.writerows(gas)
+
+    # No call gets more expensive as users or tokens are added
+    for dimension, name in [(1, "users"), (2, "tokens")]:
+        for fn, (small, large) in gas_growth(gas, dimension).items():
+            if report:
+                print(f"{fn} by {name}: {small} -> {large}")
+            assert large <= small * GAS_GROWTH_TOLERANCE + GAS_GROWTH_SLACK, f"{fn} gas grows with {name}"
@@ -0,0 +1,112 @@
+import pytest, brownie
+from brownie import accounts, chain, networkETF, networkETFv1, ProxyAdmin, TransparentUpgradeableProxy, Contract
+from scripts.upgrade import migrate_storage
+from scripts.utils import ZERO_ADDRESS, get_depositors
+
+
+def test_migration_requires_owner_and_pause(etf):
+
+    # Migration is only possible while paused
+    with brownie.reverts("Pausable: not paused"):
+        etf.migrateStorage({'from': accounts[0]})
+
+    # Only the owner can migrate
+    etf.pause({'from': accounts[0]})
+    with brownie.reverts("Ownable: caller is not the owner"):
+        etf.migrateUsers([accounts[0]], {'from': accounts[1]})
+
+
+def test_migration_of_a_fresh_deployment_is_a_no_op(etf):
+
+    # Deposit as user 1
+    etf.deposit({"from": accounts[1], "value": 5*10**18})
+    total_deposit = etf.getTotalMyntDeposit()
+
+    # A fresh deployment already uses the packed layout
+    etf.pause({'from': accounts[0]})
+    with brownie.reverts("405: Storage has already been migrated"):
+        etf.migrateStorage({'from': accounts[0]})
+
+    # Users without v1 data are skipped and keep their bonds
+    etf.migrateUsers([accounts[0], accounts[1]], {'from': accounts[0]})
+    etf.migrateTokens(0, 10, {'from': accounts[0]})
+    assert etf.getUserData(accounts[1])[0] == 5*10**18
+    assert etf.getTotalMyntDeposit() == total_deposit
+
+
+def test_upgrade_and_migrate_v1_proxy(token, second_token, clock):
+    # A v1 ETF behind a proxy, with bonds, tokens, MYNT & allocations
+    period, length = clock.cycle_period, clock.cycle_length
+    admin = ProxyAdmin.deploy({'from': accounts[0]})
+    implementation = networkETFv1.deploy({'from': accounts[0]})
+    proxy = TransparentUpgradeableProxy.deploy(implementation, admin, implementation.initialize.encode_input(period, length), {'from': accounts[0], 'value': 5*10**18})
+    legacy = Contract.from_abi("networkETFv1", proxy.address, networkETFv1.abi)
+
+    legacy.deposit({"from": accounts[1], "value": 5*10**18})
+    legacy.deposit({"from": accounts[2], "value": 3*10**18})
+    for token_contract in [token, second_token]:
+        token_contract.mint(accounts[9], 4*10**18, {'from': accounts[0]})
+        token_contract.approve(legacy, 4*10**18, {'from': accounts[9]})
+        legacy.submitToken(token_contract, 4*10**18, {'from': accounts[9]})
+    legacy.submitMynt({'from': accounts[9], 'value': 2*10**18})
+
+    clock.next_window()
+    clock.next_window()
+    legacy.calibrateToken(accounts[1], token, {'from': accounts[1]})
+    legacy.calibrateMynt(accounts[1], {'from': accounts[1]})
+    legacy.calibrateToken(accounts[2], second_token, {'from': accounts[2]})
+    legacy.withdraw(10**18, {"from": accounts[2]})
+    legacy.deposit({"from": accounts[3], "value": 10**18})
+    clock.close_window()
+
+    users = [accounts[i] for i in range(4)]
+    tokens = [token, second_token]
+    user_data = {user: legacy.getUserData(user) for user in users}
+    mynt_allocations = {user: legacy.getAllocationTimes(user, token)[0] for user in users}
+    assets = {asset: (legacy.getTokenBalance(asset), *legacy.getBondsUsed(asset)) for asset in tokens}
+    assets[ZERO_ADDRESS] = (legacy.getMyntBalance(), *legacy.getBondsUsed(ZERO_ADDRESS))
+    total = legacy.getTotalMyntDeposit()
+    assert total == sum(deposit for deposit, _ in user_data.values()) == 13*10**18
+
+    # Paused before the upgrade, migrated, then unpaused once the bonds add up
+    legacy.pause({'from': accounts[0]})
+    admin.upgrade(proxy, networkETF.deploy({'from': accounts[0]}), {'from': accounts[0]})
+    etf = Contract.from_abi("networkETF", proxy.address, networkETF.abi)
+    assert set(get_depositors(etf)) == set(users)
+    migrate_storage(accounts[0], etf, get_depositors(etf), batch_size=1)
+    assert not etf.paused()
+
+    # Every user, token & MYNT record is copied, timestamps becoming epochs. Per token allocations are not copied:
+    # migrations run after the window closed, so they could only block calibrations that can no longer happen
+    epoch = lambda timestamp: timestamp // period if timestamp else 0
+    for user in users:
+        assert etf.getUserData(user) == user_data[user]
+        mynt_epoch, token_epochs = etf.getUserAllocations(user, tokens)
+        assert mynt_epoch == epoch(mynt_allocations[user]) and list(token_epochs) == [0, 0]
+    for asset, (balance, bonds_used, last_updated) in assets.items():
+        assert etf.getAssetState(asset) == (balance, bonds_used, epoch(last_updated))
+        assert bonds_used == 0 or epoch(last_updated) == etf.currentEpoch()
+    assert etf.getTokens(0, 10) == tokens
+    assert etf.getTotalMyntDeposit() == total
+
+    # Bond history starts from the migrated records: users at their last update, the total as its base
+    for user in users:
+        assert etf.getBondAt(user, user_data[user][1]) == user_data[user][0]
+    assert etf.getTotalBondAt(0) == etf.getTotalBondAt(chain[-1].timestamp) == total
+
+    # Migration runs once
+    etf.pause({'from': accounts[0]})
+    with brownie.reverts("405: Storage has already been migrated"):
+        etf.migrateStorage({'from': accounts[0]})
+    etf.unpause({'from': accounts[0]})
+
+    # v1 allocations belong to a closed window: the next epoch starts from no bonds used
+    clock.next_window()
+    amount, can_calibrate, _ = etf.getUserExpectedTokenCalibration(accounts[1], token)
+    assert can_calibrate and amount == assets[token][0] * 5 // 13
+    etf.calibrateToken(accounts[1], token, {'from': accounts[1]})
+    tx = etf.withdraw(10**18, {"from": accounts[3]})
+    assert etf.getTotalMyntDeposit() == total - 10**18
+    clock.next_window()
+    assert etf.getTotalBondAt(tx.timestamp - 1) == total
+    assert etf.getTotalBondAt(tx.timestamp) == total - 10**18
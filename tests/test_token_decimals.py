@@ -0,0 +1,62 @@
+import pytest, brownie
+from brownie import accounts, DecimalsToken
+
+
+def deploy_token(decimals):
+    token_contract = DecimalsToken.deploy({'from': accounts[0]})
+    token_contract.initialize({'from': accounts[0]})
+    token_contract.setDecimals(decimals, {'from': accounts[0]})
+    return token_contract
+
+
+def submit(etf, token_contract, amount):
+    token_contract.mint(accounts[9], amount, {'from': accounts[0]})
+    token_contract.approve(etf.address, amount, {'from': accounts[9]})
+    return etf.submitToken(token_contract, amount, {'from': accounts[9]})
+
+
+@pytest.mark.parametrize("decimals", [6, 8])
+def test_calibrate_token_with_decimals(etf, clock, decimals):
+    usdc = deploy_token(decimals)
+    unit = 10**decimals
+
+    # Users 1 & 2 hold equal bonds next to the initial bond
+    clock.next_window(offset=0)
+    for user in accounts[1:3]:
+        etf.deposit({"from": user, "value": 5*10**18})
+    submit(etf, usdc, 10 * unit)
+    assert etf.getTokenDecimals(usdc) == decimals
+    assert etf.getTokenBalance(usdc) == 10 * unit
+
+    # Calibrations pay token units, rounded down like the 18 decimal tokens
+    clock.next_window()
+    for user in accounts[1:3]:
+        expected = etf.getUserExpectedTokenCalibration(user, usdc)[0]
+        tx = etf.calibrateToken(user, usdc, {'from': user})
+        assert usdc.balanceOf(user) == expected == tx.events["CalibrateToken"]["amount"]
+    assert usdc.balanceOf(accounts[1]) == 10 * unit // 3
+
+    # Only what was paid out left the balance
+    paid = usdc.balanceOf(accounts[1]) + usdc.balanceOf(accounts[2])
+    assert etf.getTokenBalance(usdc) == usdc.balanceOf(etf) == 10 * unit - paid
+    assert etf.getTokenBalances([usdc]) == [10 * unit - paid]
+
+
+def test_decimals_read_once(etf, token):
+
+    # The first submission registers the token & caches its decimals; later ones make no decimals() call
+    usdc = deploy_token(6)
+    first = submit(etf, usdc, 10**6)
+    second = submit(etf, usdc, 10**6)
+    assert [call["op"] for call in first.subcalls if call["to"] == usdc.address] == ["STATICCALL", "CALL"]
+    assert [call["op"] for call in second.subcalls if call["to"] == usdc.address] == ["CALL"]
+
+    # 18 decimal tokens keep their balances as before
+    submit(etf, token, 10**18)
+    assert etf.getTokenDecimals(token) == 18
+    assert etf.getTokenBalance(token) == 10**18
+
+
+def test_too_many_decimals(etf):
+    with brownie.reverts("402: Token must have at most 18 decimals"):
+        submit(etf, deploy_token(24), 10**24)